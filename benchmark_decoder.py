@@ -0,0 +1,49 @@
+import copy
+import json
+import os
+import time
+
+import pandas as pd
+from boto3.dynamodb.types import TypeDeserializer
+
+from dynamodb_decoder import items_to_frame
+
+SAMPLE_FILE = "test.json"
+ITEM_COUNT = int(os.getenv("BENCHMARK_ITEMS", "100000"))
+
+
+def load_scaled_items(path: str, count: int) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        samples = [entry["M"] for entry in json.load(f)]
+
+    items = []
+    for idx in range(count):
+        item = copy.copy(samples[idx % len(samples)])
+        item["messageId"] = {"S": f"benchmark-{idx}"}
+        item["point"] = {"N": str(idx % 11)}
+        items.append(item)
+    return items
+
+
+def generic_frame(raw_items: list[dict]) -> pd.DataFrame:
+    deserializer = TypeDeserializer()
+    items = [{k: deserializer.deserialize(v) for k, v in raw_item.items()} for raw_item in raw_items]
+    return pd.json_normalize(items)
+
+
+def main() -> None:
+    raw_items = load_scaled_items(SAMPLE_FILE, ITEM_COUNT)
+    print(f"Decoding {len(raw_items)} items scaled from {SAMPLE_FILE}")
+
+    timings = {}
+    for name, decode in (("generic", generic_frame), ("specialized", items_to_frame)):
+        started = time.perf_counter()
+        df = decode(raw_items)
+        timings[name] = time.perf_counter() - started
+        print(f"{name:>12}: {timings[name]:.2f}s ({len(df)} rows, {len(df.columns)} columns)")
+
+    print(f"Speedup: {timings['generic'] / timings['specialized']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+# Where the resolved chromedriver path is remembered between runs.
+DRIVER_CACHE_FILE = os.getenv(
+    "CHROMEDRIVER_CACHE_FILE", os.path.join(os.path.expanduser("~"), ".cache", "meb_ttkb", "chromedriver.json")
+)
+
+_driver_path: Optional[str] = None
+_driver_path_lock = threading.Lock()
+
+
+def resolve_driver_path(stale: Optional[str] = None) -> str:
+    """
+    chromedriver path, resolved once per process and cached on disk.
+
+    CHROMEDRIVER_PATH wins; otherwise a cached path that still exists is used
+    without touching the network. Only a cold cache calls
+    ChromeDriverManager().install(), which checks for and downloads drivers.
+    Passing the path that failed as `stale` skips the cache and installs
+    again (a Chrome upgrade leaves the cached driver incompatible); threads
+    that hit the same failure share one reinstall.
+    """
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path and _driver_path != stale:
+            return _driver_path
+        path = os.getenv("CHROMEDRIVER_PATH")
+        if not path and stale is None:
+            try:
+                with open(DRIVER_CACHE_FILE, "r", encoding="utf-8") as f:
+                    cached = json.load(f).get("path")
+                if cached and os.path.exists(cached):
+                    path = cached
+            except (OSError, ValueError):
+                pass
+        if not path:
+            from webdriver_manager.chrome import ChromeDriverManager
+
+            path = ChromeDriverManager().install()
+            os.makedirs(os.path.dirname(DRIVER_CACHE_FILE), exist_ok=True)
+            with open(DRIVER_CACHE_FILE, "w", encoding="utf-8") as f:
+                json.dump({"path": path, "resolved_at": time.time()}, f)
+        _driver_path = path
+        return path
+
+
+def chrome_options(headless: bool = True) -> Options:
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument(f"user-agent={USER_AGENT}")
+    return options
+
+
+def new_driver(headless: bool = True) -> webdriver.Chrome:
+    path = resolve_driver_path()
+    try:
+        return webdriver.Chrome(service=Service(path), options=chrome_options(headless))
+    except WebDriverException:
+        fresh = resolve_driver_path(stale=path)
+        if fresh == path:
+            raise
+        return webdriver.Chrome(service=Service(fresh), options=chrome_options(headless))
+
+
+class BrowserPool:
+    """
+    A fixed set of warm headless Chrome instances.
+
+    Instances start in parallel when the pool is created (if one fails to
+    start, the others are quit before the error propagates); `map` runs
+    fn(driver, item) for each item with every instance working on its own
+    item, so independent menu branches can be explored side by side.
+    """
+
+    def __init__(self, size: int = 3, headless: bool = True):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=size) as executor:
+            futures = [executor.submit(new_driver, headless) for _ in range(size)]
+        self.drivers = [future.result() for future in futures if future.exception() is None]
+        failed = [future.exception() for future in futures if future.exception() is not None]
+        if failed:
+            self.close()
+            raise failed[0]
+        self.startup_seconds = time.perf_counter() - started
+        self._idle: queue.Queue = queue.Queue()
+        for driver in self.drivers:
+            self._idle.put(driver)
+
+    def map(self, fn: Callable, items: Iterable) -> list:
+        """Results in input order; an item whose call raises yields the exception."""
+
+        def run(item):
+            driver = self._idle.get()
+            try:
+                return fn(driver, item)
+            except Exception as exc:
+                return exc
+            finally:
+                self._idle.put(driver)
+
+        with ThreadPoolExecutor(max_workers=len(self.drivers)) as executor:
+            return list(executor.map(run, items))
+
+    def close(self) -> None:
+        for driver in self.drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def __enter__(self) -> "BrowserPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,384 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from http_cache import HttpCache
+from http_fetcher import PoliteFetcher
+from manifest_diff import delta_key_for
+# Silver keys are named by the chunker's rule, so the chunker and the scrape
+# manifest map every downloaded object back to its URL.
+from ttkb_common.naming import silver_name_for_url
+
+DEFAULT_MANIFEST_PATH = "ttkb_mevzuat_full_data.json"
+DEFAULT_TYPES = ("PDF", "DOC")
+DEFAULT_REPORT_KEY = "manifests/silver_download_report.json"
+DEFAULT_PART_SIZE_MB = 8
+DEFAULT_MAX_SIZE_MB = 100
+STATE_DIR = ".download_runs"
+
+# File signatures of what prepare_for_gold.py can parse; a 200 that is none
+# of these is usually an HTML error or login page.
+SIGNATURES = {
+    "PDF": (b"%PDF",),
+    "DOC": (b"\xd0\xcf\x11\xe0", b"PK\x03\x04"),
+}
+CONTENT_TYPES = {
+    b"%PDF": "application/pdf",
+    b"\xd0\xcf\x11\xe0": "application/msword",
+    b"PK\x03\x04": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+def load_link_manifest(path: Optional[str], s3_client=None, bucket: str = "", key: str = "") -> list[dict]:
+    """Scraper output from a local file, or from S3 when `key` is given."""
+    if key:
+        response = s3_client.get_object(Bucket=bucket, Key=key)
+        return json.loads(response["Body"].read())
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def select_documents(entries: list[dict], types: tuple[str, ...]) -> list[dict]:
+    """One entry per URL among the wanted types, in manifest order."""
+    seen: set[str] = set()
+    documents = []
+    for entry in entries:
+        if entry.get("data_type") in types and entry["url"] not in seen:
+            seen.add(entry["url"])
+            documents.append(entry)
+    return documents
+
+
+def select_from_delta(entries: list[dict], delta: dict, types: tuple[str, ...]) -> tuple[list[dict], list[dict]]:
+    """
+    (documents to fetch, documents to remove) for the crawl's manifest delta.
+
+    Added URLs and pages whose content hash changed are fetched; removed URLs
+    are taken out of silver. Moved and retitled documents keep their silver
+    object, since prepare_for_gold.py rebuilds their metadata on its own.
+    """
+    wanted = {record["url"] for record in delta.get("added", [])}
+    wanted |= {change["url"] for change in delta.get("content_changed", [])}
+    fetch = select_documents([entry for entry in entries if entry["url"] in wanted], types)
+    remove = select_documents(delta.get("removed", []), types)
+    return fetch, remove
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def verify_document(response, data_type: str, max_bytes: int) -> tuple[Optional[str], str]:
+    """
+    Return (problem, content_type). A document passes when its signature
+    matches the manifest type, it is non-empty and under `max_bytes`, and
+    the body is as long as the server's Content-Length.
+    """
+    if response.size == 0:
+        return "empty body", ""
+    if response.size > max_bytes:
+        return f"{response.size} bytes exceeds limit of {max_bytes}", ""
+    declared = response.headers.get("Content-Length")
+    # Content-Length counts encoded bytes; the cache stores the decoded body.
+    if declared and not response.headers.get("Content-Encoding") and int(declared) != response.size:
+        return f"truncated: {response.size} of {declared} bytes", ""
+    with response.open() as f:
+        head = f.read(8)
+    for signature in SIGNATURES.get(data_type, ()):
+        if head.startswith(signature):
+            return None, CONTENT_TYPES[signature]
+    server_type = response.headers.get("Content-Type", "unknown")
+    return f"not a {data_type} (Content-Type {server_type}, starts {head[:4]!r})", ""
+
+
+class RunState:
+    """
+    Append-only JSONL ledger of documents completed in a run. Resuming a run
+    skips a completed URL without contacting the server when the destination
+    still holds the recorded body.
+    """
+
+    def __init__(self, state_dir: str, run_id: str):
+        os.makedirs(state_dir, exist_ok=True)
+        self.path = os.path.join(state_dir, f"{run_id}.jsonl")
+        self.completed: dict[str, dict] = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.completed[record["url"]] = record
+        self._lock = threading.Lock()
+
+    def record(self, entry: dict) -> None:
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.completed[entry["url"]] = entry
+
+
+class S3Destination:
+    def __init__(self, s3_client, bucket: str, prefix: str, transfer_config: TransferConfig):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.transfer_config = transfer_config
+
+    def location(self, name: str) -> str:
+        return f"s3://{self.bucket}/{self.prefix}{name}"
+
+    def is_current(self, name: str, sha256: str) -> bool:
+        try:
+            head = self.s3_client.head_object(Bucket=self.bucket, Key=f"{self.prefix}{name}")
+        except ClientError:
+            return False
+        return head.get("Metadata", {}).get("sha256") == sha256
+
+    def delete(self, name: str) -> None:
+        self.s3_client.delete_object(Bucket=self.bucket, Key=f"{self.prefix}{name}")
+
+    def write(self, name: str, path: str, content_type: str, sha256: str, source_url: str) -> None:
+        # upload_file streams the cached body from disk; bodies above the
+        # threshold go up as parallel multipart parts.
+        self.s3_client.upload_file(
+            path,
+            self.bucket,
+            f"{self.prefix}{name}",
+            ExtraArgs={
+                "ContentType": content_type,
+                "Metadata": {"sha256": sha256, "source-url": source_url},
+            },
+            Config=self.transfer_config,
+        )
+
+
+class LocalDestination:
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def location(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def is_current(self, name: str, sha256: str) -> bool:
+        path = self.location(name)
+        return os.path.exists(path) and sha256_file(path) == sha256
+
+    def delete(self, name: str) -> None:
+        if os.path.exists(self.location(name)):
+            os.remove(self.location(name))
+
+    def write(self, name: str, path: str, content_type: str, sha256: str, source_url: str) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        os.close(fd)
+        try:
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, self.location(name))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+def download_documents(
+    documents: list[dict],
+    destination,
+    fetcher: PoliteFetcher,
+    cache: HttpCache,
+    state: RunState,
+    workers: int = 8,
+    max_bytes: int = DEFAULT_MAX_SIZE_MB * 1024 * 1024,
+) -> dict:
+    """
+    Fetch documents concurrently into `destination` and return a run summary.
+
+    Every URL is revalidated through the on-disk cache; a document is written
+    only when it is new, changed, or missing at the destination. Completed
+    URLs go to the run ledger as they finish; on resume a ledger entry counts
+    only if the destination still holds its sha256 (a HEAD for S3). Bodies
+    are abandoned as soon as they pass `max_bytes`.
+    """
+    counts = {"downloaded": 0, "unchanged": 0, "resumed": 0, "failed": 0}
+    totals = {"bytes_downloaded": 0, "bytes_written": 0}
+    failures: dict[str, str] = {}
+    lock = threading.Lock()
+
+    def handle(document: dict) -> None:
+        url = document["url"]
+        name = silver_name_for_url(url, document.get("data_type", ""))
+        completed = state.completed.get(url)
+        if completed and destination.is_current(name, completed["sha256"]):
+            with lock:
+                counts["resumed"] += 1
+            return
+        try:
+            response = cache.fetch(fetcher, url, max_bytes=max_bytes)
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code}")
+            problem, content_type = verify_document(response, document.get("data_type", ""), max_bytes)
+            if problem:
+                raise ValueError(problem)
+            written = 0
+            if not (response.unchanged and destination.is_current(name, response.sha256)):
+                destination.write(name, response.path, content_type, response.sha256, url)
+                written = response.size
+        except Exception as exc:
+            logging.error("Failed %s: %s", url, exc)
+            with lock:
+                counts["failed"] += 1
+                failures[url] = str(exc)
+            return
+
+        with lock:
+            counts["unchanged" if not written else "downloaded"] += 1
+            totals["bytes_downloaded"] += 0 if response.from_cache else response.size
+            totals["bytes_written"] += written
+        state.record(
+            {
+                "url": url,
+                "location": destination.location(name),
+                "sha256": response.sha256,
+                "size": response.size,
+                "content_type": content_type,
+                "unchanged": not written,
+            }
+        )
+        logging.info("%s %s (%d bytes)", "Unchanged" if not written else "Stored", name, response.size)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(handle, documents))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "documents": len(documents),
+        **counts,
+        **totals,
+        "elapsed_seconds": round(elapsed, 2),
+        "throughput_mb_per_second": round(totals["bytes_downloaded"] / 1024 / 1024 / elapsed, 3) if elapsed else 0.0,
+        "http": dict(fetcher.stats),
+        "cache": dict(cache.stats),
+        "failures": failures,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Download scraped documents into silver.")
+    parser.add_argument("--manifest-path", default=DEFAULT_MANIFEST_PATH, help="Local link scraper output.")
+    parser.add_argument(
+        "--manifest-key", default="", help="Read the scraper output from this key in the bucket instead."
+    )
+    parser.add_argument("--bucket", default="goaltech-poc-ai-assistant", help="S3 bucket name.")
+    parser.add_argument("--silver-prefix", default="silver/", help="Target prefix in bucket.")
+    parser.add_argument("--local-dir", default=None, help="Write to this directory instead of S3.")
+    parser.add_argument("--types", default=",".join(DEFAULT_TYPES), help="Comma-separated manifest data types.")
+    parser.add_argument("--workers", type=int, default=8, help="Parallel documents.")
+    parser.add_argument("--per-host", type=int, default=4, help="Concurrent requests per host.")
+    parser.add_argument("--rate-per-host", type=float, default=5.0, help="Request starts per second per host.")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for each read.")
+    parser.add_argument("--max-size-mb", type=int, default=DEFAULT_MAX_SIZE_MB, help="Reject larger documents.")
+    parser.add_argument(
+        "--part-size-mb", type=int, default=DEFAULT_PART_SIZE_MB, help="Multipart part size and threshold (S3 parts are at least 5 MB)."
+    )
+    parser.add_argument("--part-concurrency", type=int, default=4, help="Parallel parts per object.")
+    parser.add_argument("--cache-dir", default=os.getenv("HTTP_CACHE_DIR", ".http_cache"), help="Conditional-request cache.")
+    parser.add_argument("--run-id", default=None, help="Run ledger name (default: a new id).")
+    parser.add_argument("--resume", action="store_true", help="Skip URLs already completed under --run-id.")
+    parser.add_argument(
+        "--report-key", default=DEFAULT_REPORT_KEY, help="Run summary key in the bucket; empty to skip (S3 only)."
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="Only fetch what the crawl's manifest delta lists as added or changed, and remove what it lists as removed.",
+    )
+    parser.add_argument("--endpoint-url", default=None, help="S3 endpoint override, e.g. a local MinIO.")
+    args = parser.parse_args()
+    if args.resume and not args.run_id:
+        parser.error("--resume needs the --run-id of the run to continue")
+    return args
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    args = parse_args()
+    run_id = args.run_id or time.strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+    state_path = os.path.join(STATE_DIR, f"{run_id}.jsonl")
+    if os.path.exists(state_path) and not args.resume:
+        os.remove(state_path)
+
+    s3_client = None
+    if args.manifest_key or not args.local_dir:
+        s3_client = boto3.client(
+            "s3",
+            endpoint_url=args.endpoint_url,
+            config=Config(max_pool_connections=max(10, args.workers * args.part_concurrency)),
+        )
+    entries = load_link_manifest(args.manifest_path, s3_client, args.bucket, args.manifest_key)
+    types = tuple(t.strip().upper() for t in args.types.split(",") if t.strip())
+    removed: list[dict] = []
+    if args.delta:
+        # Published by the link scrapers next to the manifest (manifest_diff.publish_incremental).
+        delta_key = delta_key_for(args.manifest_key) if args.manifest_key else ""
+        delta = load_link_manifest(delta_key_for(args.manifest_path), s3_client, args.bucket, delta_key)
+        documents, removed = select_from_delta(entries, delta, types)
+        logging.info("Run %s: %d documents to fetch, %d to remove from the delta", run_id, len(documents), len(removed))
+    else:
+        documents = select_documents(entries, types)
+        logging.info("Run %s: %d documents from %d manifest entries", run_id, len(documents), len(entries))
+
+    if args.local_dir:
+        destination = LocalDestination(args.local_dir)
+    else:
+        part_size = args.part_size_mb * 1024 * 1024
+        transfer_config = TransferConfig(
+            multipart_threshold=part_size, multipart_chunksize=part_size, max_concurrency=args.part_concurrency
+        )
+        destination = S3Destination(s3_client, args.bucket, args.silver_prefix, transfer_config)
+
+    fetcher = PoliteFetcher(max_per_host=args.per_host, rate_per_host=args.rate_per_host, timeout=args.timeout)
+    try:
+        summary = download_documents(
+            documents,
+            destination,
+            fetcher,
+            HttpCache(args.cache_dir),
+            RunState(STATE_DIR, run_id),
+            workers=args.workers,
+            max_bytes=args.max_size_mb * 1024 * 1024,
+        )
+    finally:
+        fetcher.close()
+    for document in removed:
+        destination.delete(silver_name_for_url(document["url"], document.get("data_type", "")))
+    summary = {"run_id": run_id, **summary, "removed": len(removed)}
+
+    if not args.local_dir and args.report_key:
+        s3_client.put_object(
+            Bucket=args.bucket,
+            Key=args.report_key,
+            Body=json.dumps(summary, ensure_ascii=False, indent=2).encode("utf-8"),
+            ContentType="application/json; charset=utf-8",
+        )
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
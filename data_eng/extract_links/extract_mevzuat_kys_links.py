@@ -1,15 +1,14 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 import time
 import json
 from urllib.parse import urljoin
 
+from browser_pool import new_driver
+from selenium_waits import STATS as WAIT_STATS, hover, wait_for_dom_quiet, wait_for_page_load
+
 TARGET_TEXT = "Mevzuat - KYS"
 
 
@@ -18,18 +17,10 @@ def scrape_mevzuat_kys_links():
     Scrapes all links from the TARGET_TEXT dropdown menu.
     Returns a list of dictionaries containing link text and URLs.
     """
-    # Setup Chrome options - NOT headless so we can see hover effects
-    chrome_options = Options()
-    # Remove headless mode to allow hover interactions
-    chrome_options.add_argument('--no-sandbox')
-    chrome_options.add_argument('--disable-dev-shm-usage')
-    chrome_options.add_argument('--disable-gpu')
-    chrome_options.add_argument('--window-size=1920,1080')
-    chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-    
-    # Initialize the driver
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    # NOT headless so we can see hover effects; the driver path is cached between runs
+    started = time.perf_counter()
+    driver = new_driver(headless=False)
+    print(f"Browser started in {time.perf_counter() - started:.2f}s")
     actions = ActionChains(driver)
     
     links_found = []
@@ -40,8 +31,8 @@ def scrape_mevzuat_kys_links():
         print(f"Navigating to {base_url}...")
         driver.get(base_url)
         
-        # Wait for page to load
-        time.sleep(3)
+        # Wait for the page to load and settle
+        wait_for_page_load(driver, fixed_sleep=3)
         
         # Find the TARGET_TEXT navbar item
         print(f"Looking for '{TARGET_TEXT}' navbar item...")
@@ -93,21 +84,17 @@ def scrape_mevzuat_kys_links():
         try:
             # Scroll to the element
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", mevzuat_item)
-            time.sleep(0.5)
+            wait_for_dom_quiet(driver, fixed_sleep=0.5)
             
             # Hover over TARGET_TEXT to open dropdown
             print(f"Hovering over '{TARGET_TEXT}'...")
             try:
-                actions.move_to_element(mevzuat_item).perform()
-                time.sleep(1.5)  # Wait for dropdown to appear
+                hover(actions, driver, mevzuat_item, fixed_sleep=3.0)  # Wait for dropdown to open and settle
                 print("  Dropdown opened")
             except Exception as e:
                 print(f"  Could not hover: {e}")
                 return []
             
-            # Wait a bit for dropdown animations
-            time.sleep(1.5)
-            
             # Find dropdown menus that appeared after hovering
             # Filter out common navbar links that shouldn't be included
             excluded_texts = ['Anasayfa', 'RSS', 'S.S.S', 'İletişim', 'Home', 'Contact', 'EN', 'TR']
@@ -238,8 +225,7 @@ def scrape_mevzuat_kys_links():
                                         print(f"  [{idx}/{len(nested_items)}] Processing nested item: {nested_text[:60]}...")
                                         
                                         # Hover over nested item to open submenu
-                                        actions.move_to_element(nested_item).perform()
-                                        time.sleep(2)  # Wait longer for submenu to appear
+                                        hover(actions, driver, nested_item, fixed_sleep=2)  # Wait for submenu to settle
                                         
                                         # Find all visible submenus that appeared after hovering
                                         # Look for submenus that are siblings or children of the nested item
@@ -313,8 +299,7 @@ def scrape_mevzuat_kys_links():
                                                 continue
                                         
                                         # Move back to parent item to keep dropdown open for next nested item
-                                        actions.move_to_element(mevzuat_item).perform()
-                                        time.sleep(0.8)
+                                        hover(actions, driver, mevzuat_item, timeout=1.0, fixed_sleep=0.8)
                                         
                                     except Exception as e:
                                         print(f"    Error processing nested item: {e}")
@@ -322,8 +307,7 @@ def scrape_mevzuat_kys_links():
                                         traceback.print_exc()
                                         # Move back to parent on error too
                                         try:
-                                            actions.move_to_element(mevzuat_item).perform()
-                                            time.sleep(0.5)
+                                            hover(actions, driver, mevzuat_item, timeout=1.0, fixed_sleep=0.5)
                                         except:
                                             pass
                                         continue
@@ -575,8 +559,7 @@ def scrape_mevzuat_kys_links():
                             print(f"  [{idx}/{len(nested_items_to_hover)}] Hovering over nested item: {nested_text[:50]}...")
                             
                             # Hover over nested item
-                            actions.move_to_element(nested_item).perform()
-                            time.sleep(2)  # Wait for submenu to appear
+                            hover(actions, driver, nested_item, fixed_sleep=2)  # Wait for submenu to settle
                             
                             # Find all newly visible links after hovering
                             # Specifically look for links in sub-dropdown-container and alt-menu items
@@ -616,13 +599,11 @@ def scrape_mevzuat_kys_links():
                                     continue
                             
                             # Move back to parent
-                            actions.move_to_element(mevzuat_item).perform()
-                            time.sleep(0.8)
+                            hover(actions, driver, mevzuat_item, timeout=1.0, fixed_sleep=0.8)
                         except Exception as e:
                             print(f"    Error hovering over nested item: {e}")
                             try:
-                                actions.move_to_element(mevzuat_item).perform()
-                                time.sleep(0.5)
+                                hover(actions, driver, mevzuat_item, timeout=1.0, fixed_sleep=0.5)
                             except:
                                 pass
                             continue
@@ -683,10 +664,13 @@ if __name__ == "__main__":
     print(f"Starting scraper for MEB TTKB '{TARGET_TEXT}' dropdown links...")
     print("=" * 60)
     
+    started = time.perf_counter()
     links = scrape_mevzuat_kys_links()
+    elapsed = time.perf_counter() - started
     
     print("\n" + "=" * 60)
     print(f"Total links found: {len(links)}")
+    print(f"Crawl took {elapsed:.2f}s; {WAIT_STATS.summary()}")
     
     # Save to JSON file
     output_file = "mevzuat_kys_links.json"
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import BinaryIO, Optional
+
+CHUNK_SIZE = 64 * 1024
+# Response headers kept with a cached body; validators plus what callers check.
+STORED_HEADERS = (
+    "ETag",
+    "Last-Modified",
+    "Content-Type",
+    "Content-Length",
+    "Content-Encoding",
+    "Content-Disposition",
+)
+
+
+class ResponseTooLarge(ValueError):
+    """Raised when a body passes the `max_bytes` given to `HttpCache.fetch`."""
+
+
+class CachedResponse:
+    """
+    Result of `HttpCache.fetch`, shaped like the parts of `requests.Response`
+    the scrapers use (`status_code`, `headers`, `content`, `url`).
+
+    `unchanged` is True when the server answered 304 to a conditional request,
+    or returned a body identical to the cached one; downstream stages can skip
+    re-processing such URLs. `from_cache` is True when the body was read from
+    disk. For 200/304 the body lives at `path` and can be streamed with `open()`.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        headers: dict,
+        path: Optional[str] = None,
+        body: Optional[bytes] = None,
+        sha256: str = "",
+        size: int = 0,
+        unchanged: bool = False,
+        from_cache: bool = False,
+    ):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.path = path
+        self._body = body
+        self.sha256 = sha256
+        self.size = size
+        self.unchanged = unchanged
+        self.from_cache = from_cache
+
+    @property
+    def content(self) -> bytes:
+        if self._body is None:
+            with open(self.path, "rb") as f:
+                self._body = f.read()
+        return self._body
+
+    def open(self) -> BinaryIO:
+        return open(self.path, "rb")
+
+
+class HttpCache:
+    """
+    Persistent conditional-request cache on local disk.
+
+    Each URL keeps its last 200 body and validators (ETag, Last-Modified).
+    Later fetches send If-None-Match / If-Modified-Since; a 304 serves the
+    stored body and marks the response unchanged. Bodies are streamed to disk
+    while being hashed, so large documents are never held in memory, and are
+    swapped in atomically so concurrent workers and interrupted runs never
+    leave a half-written entry.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.stats = {"requests": 0, "not_modified": 0, "unchanged": 0, "changed": 0, "new": 0, "uncached": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _paths(self, url: str) -> tuple[str, str]:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        folder = os.path.join(self.directory, digest[:2])
+        return os.path.join(folder, f"{digest}.body"), os.path.join(folder, f"{digest}.json")
+
+    def lookup(self, url: str) -> Optional[dict]:
+        """Stored metadata for `url`, or None if there is no complete entry."""
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(body_path) or os.path.getsize(body_path) != meta.get("size"):
+            return None
+        meta["path"] = body_path
+        return meta
+
+    @staticmethod
+    def conditional_headers(meta: Optional[dict]) -> dict:
+        if not meta:
+            return {}
+        headers = {}
+        stored = meta.get("headers", {})
+        if stored.get("ETag"):
+            headers["If-None-Match"] = stored["ETag"]
+        if stored.get("Last-Modified"):
+            headers["If-Modified-Since"] = stored["Last-Modified"]
+        return headers
+
+    def _store(self, url: str, response, previous: Optional[dict], max_bytes: Optional[int]) -> CachedResponse:
+        body_path, meta_path = self._paths(url)
+        folder = os.path.dirname(body_path)
+        os.makedirs(folder, exist_ok=True)
+
+        digest = hashlib.sha256()
+        size = 0
+        tmp_meta = None
+        fd, tmp_body = tempfile.mkstemp(dir=folder, suffix=".part")
+        try:
+            declared = response.headers.get("Content-Length")
+            if max_bytes is not None and declared and declared.isdigit() and int(declared) > max_bytes:
+                raise ResponseTooLarge(f"{declared} bytes exceeds limit of {max_bytes}")
+            with os.fdopen(fd, "wb") as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    if chunk:
+                        size += len(chunk)
+                        if max_bytes is not None and size > max_bytes:
+                            raise ResponseTooLarge(f"more than {max_bytes} bytes")
+                        f.write(chunk)
+                        digest.update(chunk)
+            headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+            meta = {
+                "url": url,
+                "headers": headers,
+                "sha256": digest.hexdigest(),
+                "size": size,
+                "fetched_at": time.time(),
+            }
+            fd, tmp_meta = tempfile.mkstemp(dir=folder, suffix=".part")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(tmp_body, body_path)
+            os.replace(tmp_meta, meta_path)
+        except BaseException:
+            for leftover in (tmp_body, tmp_meta):
+                if leftover and os.path.exists(leftover):
+                    os.remove(leftover)
+            raise
+        finally:
+            response.close()
+
+        unchanged = previous is not None and previous.get("sha256") == meta["sha256"]
+        self._count("unchanged" if unchanged else "changed" if previous else "new")
+        return CachedResponse(
+            url, 200, headers, path=body_path, sha256=meta["sha256"], size=size, unchanged=unchanged
+        )
+
+    def fetch(self, client, url: str, max_bytes: Optional[int] = None, **kwargs) -> CachedResponse:
+        """
+        GET `url` through `client` (a PoliteFetcher, requests.Session or the
+        requests module) with conditional headers from the cached entry.
+
+        A 304 is returned as status 200 with the stored body and `unchanged`
+        set. Other statuses are returned uncached with their body in memory.
+        With `max_bytes`, a 200 whose Content-Length or streamed body passes
+        the limit raises ResponseTooLarge and leaves the cached entry as it was.
+        """
+        previous = self.lookup(url)
+        headers = {**kwargs.pop("headers", {}), **self.conditional_headers(previous)}
+        self._count("requests")
+        response = client.get(url, headers=headers, stream=True, **kwargs)
+
+        if response.status_code == 304 and previous is not None:
+            response.close()
+            self._count("not_modified")
+            return CachedResponse(
+                url,
+                200,
+                previous.get("headers", {}),
+                path=previous["path"],
+                sha256=previous["sha256"],
+                size=previous["size"],
+                unchanged=True,
+                from_cache=True,
+            )
+        if response.status_code == 200:
+            return self._store(url, response, previous, max_bytes)
+
+        self._count("uncached")
+        try:
+            body = response.content
+        finally:
+            response.close()
+        return CachedResponse(url, response.status_code, dict(response.headers), body=body, size=len(body))
@@ -0,0 +1,212 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Iterable, Iterator, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without a request while a host's circuit breaker is open."""
+
+
+class _HostState:
+    def __init__(self, max_concurrency: int):
+        self.slots = threading.Semaphore(max_concurrency)
+        self.lock = threading.Lock()
+        self.next_start = 0.0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        # Set while the single half-open probe is in flight.
+        self.probing = False
+
+
+class PoliteFetcher:
+    """
+    Thread-safe HTTP fetcher for crawling a handful of government hosts.
+
+    One pooled `requests.Session` is shared by all workers. Each host gets a
+    concurrency cap, a minimum interval between request starts
+    (`rate_per_host` requests per second), retries with exponential backoff
+    and jitter on connection errors, timeouts, 429 and 5xx (honouring
+    Retry-After), and a circuit breaker that fails fast for
+    `breaker_cooldown` seconds after `breaker_threshold` consecutive failures
+    and then lets a single probe through before closing again.
+    """
+
+    def __init__(
+        self,
+        max_per_host: int = 4,
+        rate_per_host: float = 5.0,
+        max_attempts: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 10.0,
+        breaker_threshold: int = 5,
+        breaker_cooldown: float = 60.0,
+        pool_size: int = 32,
+        user_agent: str = DEFAULT_USER_AGENT,
+    ):
+        self.max_per_host = max_per_host
+        self.min_interval = 1.0 / rate_per_host if rate_per_host > 0 else 0.0
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.timeout = timeout
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._hosts: dict[str, _HostState] = {}
+        self._hosts_lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "short_circuited": 0}
+        self._stats_lock = threading.Lock()
+
+    def _host(self, url: str) -> _HostState:
+        host = urlparse(url).netloc
+        with self._hosts_lock:
+            if host not in self._hosts:
+                self._hosts[host] = _HostState(self.max_per_host)
+            return self._hosts[host]
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _wait_for_turn(self, state: _HostState) -> None:
+        with state.lock:
+            now = time.monotonic()
+            start = max(now, state.next_start)
+            state.next_start = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+
+    def _admit(self, state: _HostState, url: str) -> bool:
+        """
+        Raise CircuitOpenError unless the host's breaker lets this attempt
+        through; True if the attempt is the half-open probe.
+        """
+        with state.lock:
+            if not state.open_until:
+                return False
+            # Half-open: after the cooldown exactly one attempt probes the
+            # host; everyone else fails fast until it has succeeded.
+            if state.open_until > time.monotonic() or state.probing:
+                self._count("short_circuited")
+                raise CircuitOpenError(f"Circuit open for {urlparse(url).netloc}")
+            state.probing = True
+            return True
+
+    def _record(self, state: _HostState, ok: Optional[bool], probe: bool = False) -> None:
+        """Close the breaker on success or count a failure; None only ends a probe."""
+        with state.lock:
+            if probe:
+                state.probing = False
+            if ok:
+                state.consecutive_failures = 0
+                state.open_until = 0.0
+            elif ok is not None:
+                # A failed probe finds the count still at the threshold and reopens at once.
+                state.consecutive_failures += 1
+                if state.consecutive_failures >= self.breaker_threshold:
+                    state.open_until = time.monotonic() + self.breaker_cooldown
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+        return self.backoff * 2 ** (attempt - 1) * (1 + random.random())
+
+    @staticmethod
+    def _release_on_close(response: requests.Response, state: _HostState) -> requests.Response:
+        close = response.close
+        released = threading.Lock()
+
+        def close_and_release() -> None:
+            try:
+                close()
+            finally:
+                if released.acquire(blocking=False):
+                    state.slots.release()
+
+        response.close = close_and_release
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        GET `url` under the host's limits. Returns the final response (any
+        status); raises CircuitOpenError or the last request exception.
+
+        With stream=True the body is read after this returns, so the host
+        slot is held until the response is closed (`with response:`,
+        `response.close()`, or HttpCache.fetch, which always closes).
+        """
+        state = self._host(url)
+        kwargs.setdefault("timeout", self.timeout)
+        streamed = bool(kwargs.get("stream"))
+        for attempt in range(1, max(1, self.max_attempts) + 1):
+            probe = self._admit(state, url)
+
+            response = None
+            error: Optional[Exception] = None
+            state.slots.acquire()
+            try:
+                self._wait_for_turn(state)
+                self._count("requests")
+                response = self.session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                error = exc
+            except BaseException:
+                state.slots.release()
+                self._record(state, None, probe)
+                raise
+            if response is None or not streamed:
+                state.slots.release()
+
+            if error is None and response.status_code not in RETRY_STATUSES:
+                self._record(state, True, probe)
+                return self._release_on_close(response, state) if streamed else response
+            self._record(state, False, probe)
+            if attempt >= self.max_attempts:
+                break
+            if response is not None and streamed:
+                response.close()
+                state.slots.release()
+            self._count("retries")
+            time.sleep(self._retry_delay(attempt, response))
+
+        self._count("failures")
+        if error is None:
+            return self._release_on_close(response, state) if streamed else response
+        raise error
+
+    def get_many(
+        self, urls: Iterable[str], workers: int = 8, **kwargs
+    ) -> Iterator[Tuple[str, Union[requests.Response, Exception]]]:
+        """Fetch URLs concurrently; yields (url, response or exception) in input order."""
+
+        def fetch(url: str):
+            try:
+                return url, self.get(url, **kwargs)
+            except Exception as exc:
+                return url, exc
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(fetch, urls)
+
+    def close(self) -> None:
+        self.session.close()
@@ -0,0 +1,204 @@
+import argparse
+import json
+import os
+import time
+from typing import Callable, Optional
+
+# Compared per URL; anything else in a record is not a change to the
+# document. Records carry no run-dependent fields (scraper_ec2.py keeps the
+# cache's per-run "unchanged" flag out of them).
+DIFF_CATEGORIES = ("added", "removed", "moved", "content_changed", "retitled")
+# A crawl that keeps less than this share of the previous manifest's records
+# is treated as failed (menu not rendered, site down) and not published.
+MIN_RETAINED_FRACTION = 0.5
+
+
+def record_paths(record: dict) -> tuple:
+    """Menu path of a record; MENU records carry path_list, others path."""
+    return tuple(record.get("path_list") or record.get("path") or [])
+
+
+def index_manifest(records: list[dict]) -> dict[str, dict]:
+    """Group records by URL: the same document can hang under several menu paths."""
+    index: dict[str, dict] = {}
+    for record in records:
+        entry = index.setdefault(
+            record["url"], {"records": [], "paths": set(), "titles": set(), "content_sha256": None}
+        )
+        entry["records"].append(record)
+        entry["paths"].add(record_paths(record))
+        entry["titles"].add(record.get("text", ""))
+        if record.get("content_sha256"):
+            entry["content_sha256"] = record["content_sha256"]
+    return index
+
+
+def _sorted_paths(paths: set) -> list[list[str]]:
+    return [list(path) for path in sorted(paths)]
+
+
+def diff_manifests(previous: list[dict], current: list[dict]) -> dict:
+    """
+    Structured diff of two link manifests keyed by URL.
+
+    moved: the set of menu paths changed. content_changed: both runs hashed
+    the page (content_sha256) and the hashes differ. retitled: link texts
+    changed. Added/removed entries carry the full records.
+
+    Only pages the crawler fetched carry content_sha256; linked PDF/DOC files
+    are not downloaded during a crawl, so a changed document under an
+    unchanged URL is not reported here. download_documents.py hashes those
+    bodies and rewrites the silver object when they change.
+    """
+    old = index_manifest(previous)
+    new = index_manifest(current)
+    delta = {category: [] for category in DIFF_CATEGORIES}
+    unchanged = 0
+
+    for url, entry in new.items():
+        before = old.get(url)
+        if before is None:
+            delta["added"].extend(entry["records"])
+            continue
+        changes = sum(len(delta[category]) for category in DIFF_CATEGORIES)
+        if entry["paths"] != before["paths"]:
+            delta["moved"].append(
+                {
+                    "url": url,
+                    "text": entry["records"][0].get("text", ""),
+                    "old_paths": _sorted_paths(before["paths"]),
+                    "new_paths": _sorted_paths(entry["paths"]),
+                }
+            )
+        if entry["content_sha256"] and before["content_sha256"] and entry["content_sha256"] != before["content_sha256"]:
+            delta["content_changed"].append(
+                {
+                    "url": url,
+                    "text": entry["records"][0].get("text", ""),
+                    "old_sha256": before["content_sha256"],
+                    "new_sha256": entry["content_sha256"],
+                }
+            )
+        if entry["titles"] != before["titles"]:
+            delta["retitled"].append(
+                {"url": url, "old_titles": sorted(before["titles"]), "new_titles": sorted(entry["titles"])}
+            )
+        if sum(len(delta[category]) for category in DIFF_CATEGORIES) == changes:
+            unchanged += 1
+
+    for url, entry in old.items():
+        if url not in new:
+            delta["removed"].extend(entry["records"])
+    delta["summary"] = {category: len(delta[category]) for category in DIFF_CATEGORIES}
+    delta["summary"]["unchanged"] = unchanged
+    delta["previous_count"] = len(previous)
+    delta["current_count"] = len(current)
+    return delta
+
+
+def has_changes(delta: dict) -> bool:
+    return any(delta["summary"][category] for category in DIFF_CATEGORIES)
+
+
+def delta_key_for(key: str) -> str:
+    """extract-links/x.json -> extract-links/x_delta.json"""
+    root, ext = os.path.splitext(key)
+    return f"{root}_delta{ext or '.json'}"
+
+
+def load_previous_manifest(local_path: str, bucket: str = "", key: str = "") -> tuple[Optional[list], str]:
+    """
+    The last published manifest from S3, or the local output file when S3 is
+    unavailable. Returns (records or None, where they came from).
+    """
+    if bucket and key:
+        try:
+            import boto3
+
+            response = boto3.client("s3").get_object(Bucket=bucket, Key=key)
+            return json.loads(response["Body"].read()), f"s3://{bucket}/{key}"
+        except ModuleNotFoundError:
+            print("boto3 is not installed; diffing against the local manifest.")
+        except Exception as exc:
+            print(f"Could not read s3://{bucket}/{key} ({exc}); diffing against the local manifest.")
+    if os.path.exists(local_path):
+        with open(local_path, "r", encoding="utf-8") as f:
+            return json.load(f), local_path
+    return None, ""
+
+
+def withhold_reason(previous: Optional[list], records: list[dict]) -> str:
+    """Why `records` should not replace `previous` as the published manifest ("" if it may)."""
+    if not records:
+        return "the crawl returned no records"
+    if previous and len(records) < MIN_RETAINED_FRACTION * len(previous):
+        return f"the crawl returned {len(records)} records against {len(previous)} in the previous manifest"
+    return ""
+
+
+def publish_incremental(
+    records: list[dict],
+    output_file: str,
+    bucket: str,
+    key: str,
+    upload: Callable[[object, str, str], bool],
+    force: bool = False,
+) -> dict:
+    """
+    Diff `records` against the previous manifest and publish only on change.
+
+    The full manifest is always written to `output_file`; the delta goes next
+    to it. S3 gets the delta (read by `download_documents.py --delta`) and
+    the new snapshot (the baseline for the next diff) only when something
+    changed, so a no-change run uploads nothing and triggers no re-ingestion.
+
+    An empty crawl, or one far smaller than the previous manifest, is
+    treated as a failed run: nothing is written or uploaded, so the baseline
+    survives for the next run. `force` publishes it anyway.
+    """
+    previous, source = load_previous_manifest(output_file, bucket, key)
+    reason = withhold_reason(previous, records)
+    if reason and not force:
+        print(f"Not publishing: {reason}. Set force to publish it anyway.")
+        return {}
+    delta = diff_manifests(previous or [], records)
+    delta = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "previous_source": source,
+        "baseline": previous is None,
+        **delta,
+    }
+    print(f"Manifest diff against {source or 'nothing (first run)'}: {delta['summary']}")
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(records, f, ensure_ascii=False, indent=2)
+    local_delta = delta_key_for(output_file)
+    with open(local_delta, "w", encoding="utf-8") as f:
+        json.dump(delta, f, ensure_ascii=False, indent=2)
+
+    if previous is not None and not has_changes(delta) and not force:
+        print("No changes since the last published manifest; nothing uploaded.")
+        return delta
+    upload(delta, bucket, delta_key_for(key))
+    upload(records, bucket, key)
+    return delta
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Diff two link scraper manifests.")
+    parser.add_argument("previous", help="Earlier manifest JSON.")
+    parser.add_argument("current", help="Later manifest JSON.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    with open(args.previous, "r", encoding="utf-8") as f:
+        previous = json.load(f)
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)
+    print(json.dumps(diff_manifests(previous, current), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
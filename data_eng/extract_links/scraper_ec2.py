@@ -1,16 +1,15 @@
 import time
 import json
 import os
+import sys
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from bs4 import BeautifulSoup, SoupStrainer
+
+from http_cache import HttpCache
+from http_fetcher import PoliteFetcher
+from manifest_diff import publish_incremental
 
 # --- AYARLAR ---
 TARGET_KEYWORD = "Mevzuat"
@@ -18,25 +17,40 @@ BASE_URL = "https://ttkb.meb.gov.tr/"
 OUTPUT_FILE = "ttkb_mevzuat_full_data.json"
 S3_BUCKET_NAME = "goaltech-poc-ai-assistant"
 S3_OUTPUT_KEY = os.getenv("S3_OUTPUT_KEY", "extract-links/ttkb_mevzuat_full_data.json")
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+# Menü sunucudan gelen HTML'in içinde; Selenium sadece kapsayıcı bulunamazsa kullanılır.
+MENU_PARITY_CHECK = os.getenv("MENU_PARITY_CHECK") == "1"
+# Verilirse parite, Selenium yerine bu dosyadaki (önceki çıktı) MENU kayıtlarıyla yapılır.
+MENU_PARITY_REFERENCE = os.getenv("MENU_PARITY_REFERENCE")
+# Aşama 2: eşzamanlı sayfa sayısı, host başına eşzamanlı istek ve saniyedeki istek sınırı.
+CRAWL_WORKERS = int(os.getenv("CRAWL_WORKERS", "8"))
+CRAWL_PER_HOST = int(os.getenv("CRAWL_PER_HOST", "4"))
+CRAWL_RATE_PER_HOST = float(os.getenv("CRAWL_RATE_PER_HOST", "5"))
+# Koşullu istek (ETag/Last-Modified) önbelleği; boş bırakılırsa kapatılır.
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", ".http_cache")
+# Değişiklik olmasa da manifest ve farkı S3'e yükle.
+FORCE_PUBLISH = os.getenv("MANIFEST_FORCE_PUBLISH") == "1"
+
+try:
+    import lxml  # noqa: F401
+
+    HTML_PARSER = "lxml"
+except ModuleNotFoundError:
+    HTML_PARSER = "html.parser"
+# Menü kapsayıcısı bir li; sayfanın geri kalanı ağaca hiç alınmaz.
+MENU_STRAINER = SoupStrainer('li')
 
 # --- YARDIMCI FONKSİYONLAR ---
 
 def setup_driver():
-    # Setup Chrome options - run headless for EC2
-    chrome_options = Options()
-    chrome_options.add_argument("--headless=new")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    )
+    # Selenium sadece yedek yol için gerekli; HTTP yolu onsuz da çalışır.
+    # Sürücü yolu diskte önbelleklenir, her çalıştırmada yeniden kurulmaz.
+    from browser_pool import new_driver
 
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    return driver
+    return new_driver()
 
 def clean_text(text):
     if not text: return ""
@@ -55,106 +69,143 @@ def get_data_type(url):
     # Uzantı yoksa HTML kabul et
     return 'HTML'
 
-def get_breadcrumb_path_list(element, root_element):
+def menu_label(node):
     """
-    Elementten yukarı çıkarak hiyerarşiyi LİSTE olarak döndürür.
+    Bir ul/li düğümünün menü yoluna katkısı (yoksa ""):
+    ul için başlık genelde önceki kardeştir (span/a/div),
+    li için kendi içindeki linksiz (veya '#') span/a metnidir.
     """
-    path = []
-    current = element.parent
-    
-    # Kök elemente kadar tırman
-    while current and current != root_element:
-        # Strateji 1: Ebeveyn 'ul' ise başlık genelde önceki kardeştir
-        if current.name == 'ul':
-            prev = current.find_previous_sibling()
-            if prev and prev.name in ['span', 'a', 'div']:
-                text = clean_text(prev.get_text())
-                if text and text not in path:
-                    path.insert(0, text)
+    if node.name == 'ul':
+        prev = node.find_previous_sibling()
+        if prev and prev.name in ['span', 'a', 'div']:
+            return clean_text(prev.get_text())
+    elif node.name == 'li':
+        for child in node.find_all(['span', 'a'], recursive=False):
+            if not child.has_attr('href') or child['href'] in ['#', '']:
+                return clean_text(child.get_text())
+    return ""
+
+def iter_menu_links(root_element):
+    """
+    Kapsayıcıyı tek seferde yukarıdan aşağı dolaşır ve her linki
+    (link, path_list) olarak belge sırasıyla verir. Her ul/li başlığı bir kez
+    hesaplanır; aynı başlık yolda tekrar ederse en derindeki tutulur.
+    """
+    # Yığında (düğüm, o düğüme kadarki başlıklar) tutulur; özyineleme yok.
+    stack = [(child, ()) for child in reversed(root_element.find_all(True, recursive=False))]
+    while stack:
+        node, labels = stack.pop()
+        if node.name == 'a' and node.has_attr('href'):
+            path = []
+            for label in reversed(labels):
+                if label not in path:
+                    path.insert(0, label)
+            # En başa ana kategoriyi ekleyelim (Eğer yoksa)
+            if not path or path[0] != "Mevzuat - KYS":
+                path.insert(0, "Mevzuat - KYS")
+            yield node, path
         
-        # Strateji 2: Ebeveyn 'li' ise başlık kendi içindeki text olabilir
-        if current.name == 'li':
-            # Link olmayan doğrudan metinleri veya spanları kontrol et
-            direct_text = ""
-            for child in current.find_all(['span', 'a'], recursive=False):
-                # Kendi href'i yoksa veya # ise başlıktır
-                if child != element and (not child.has_attr('href') or child['href'] in ['#', '']):
-                    direct_text = clean_text(child.get_text())
-                    break
-            
-            if direct_text and direct_text not in path:
-                path.insert(0, direct_text)
+        label = menu_label(node) if node.name in ('ul', 'li') else ""
+        child_labels = labels + (label,) if label else labels
+        stack.extend((child, child_labels) for child in reversed(node.find_all(True, recursive=False)))
+
+def find_menu_container(soup):
+    """'Mevzuat' ve 'KYS' geçen ilk li elementini döndürür."""
+    for li in soup.find_all('li'):
+        txt = clean_text(li.get_text())
+        if TARGET_KEYWORD in txt and "KYS" in txt:
+            print(f"   -> Kapsayıcı bulundu! (Text: {txt[:30]}...)")
+            return li
+    return None
 
-        current = current.parent
+def extract_menu_items(target_li):
+    """Kapsayıcı içindeki linkleri path_list/data_type kayıtlarına çevirir."""
+    menu_items = []
+    seen_urls = set()
     
-    # En başa ana kategoriyi ekleyelim (Eğer yoksa)
-    if not path or path[0] != "Mevzuat - KYS":
-        path.insert(0, "Mevzuat - KYS")
+    for link, path_list in iter_menu_links(target_li):
+        href = link['href']
+        text = clean_text(link.get_text())
+        
+        # Temel filtreler
+        if not text: continue
+        if href in ['#', 'javascript:void(0)', '']: continue
+        if "Mevzuat - KYS" in text: continue 
+        
+        full_url = urljoin(BASE_URL, href)
         
-    return path
+        # Tekrarı önle
+        if full_url in seen_urls: continue
+        seen_urls.add(full_url)
+        
+        data_type = get_data_type(full_url)
+        menu_items.append({
+            "text": text,
+            "url": full_url,
+            "path_list": path_list,             # Liste formatı
+            "path_string": " > ".join(path_list), # Okunabilir format
+            "data_type": data_type,
+            "source": "MENU"
+        })
+        print(f"  [MENÜ] {data_type} | {text}")
+    
+    return menu_items
 
-# --- PHASE 1: MENÜ TARAMA (SELENIUM) ---
+def scrape_menu_links_http(cache=None):
+    """
+    Menüyü doğrudan HTTP ile çeker. Kapsayıcı bulunamazsa None döner
+    (ör. menü ileride JavaScript ile oluşturulursa).
+    """
+    print(f"1. Siteye gidiliyor (HTTP): {BASE_URL}")
+    try:
+        if cache is not None:
+            resp = cache.fetch(requests, BASE_URL, headers={'User-Agent': USER_AGENT}, timeout=10)
+            if resp.status_code != 200:
+                raise requests.HTTPError(f"HTTP {resp.status_code}")
+            if resp.unchanged:
+                print("   Ana sayfa değişmemiş (önbellekten).")
+        else:
+            resp = requests.get(BASE_URL, headers={'User-Agent': USER_AGENT}, timeout=10)
+            resp.raise_for_status()
+    except requests.RequestException as e:
+        print(f"HTTP hatası: {e}")
+        return None
+    
+    soup = BeautifulSoup(resp.content, HTML_PARSER, parse_only=MENU_STRAINER)
+    print("2. Ana menü kapsayıcısı aranıyor...")
+    target_li = find_menu_container(soup)
+    if not target_li:
+        print("Mevzuat kapsayıcısı HTML içinde bulunamadı.")
+        return None
+    
+    print("3. Linkler ve Hiyerarşi Ayrıştırılıyor...")
+    return extract_menu_items(target_li)
+
+def scrape_menu_links_selenium():
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
 
-def scrape_menu_links():
     driver = setup_driver()
     menu_items = []
     
     try:
-        print(f"1. Siteye gidiliyor: {BASE_URL}")
+        print(f"1. Siteye gidiliyor (Selenium): {BASE_URL}")
         driver.get(BASE_URL)
         WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
         time.sleep(3)
         
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        soup = BeautifulSoup(driver.page_source, HTML_PARSER, parse_only=MENU_STRAINER)
         
         print("2. Ana menü kapsayıcısı aranıyor...")
-        target_li = None
-        
-        # Senin kodundaki li bulma mantığı
-        candidates = soup.find_all('li')
-        for li in candidates:
-            txt = clean_text(li.get_text())
-            if TARGET_KEYWORD in txt and "KYS" in txt:
-                target_li = li
-                print(f"   -> Kapsayıcı bulundu! (Text: {txt[:30]}...)")
-                break
+        target_li = find_menu_container(soup)
         
         if not target_li:
             print("HATA: Mevzuat kapsayıcısı bulunamadı.")
             return []
 
         print("3. Linkler ve Hiyerarşi Ayrıştırılıyor...")
-        # Recursive=True ile derinlemesine tüm linkleri alıyoruz
-        all_links = target_li.find_all('a', href=True)
-        
-        for link in all_links:
-            href = link['href']
-            text = clean_text(link.get_text())
-            
-            # Temel filtreler
-            if not text: continue
-            if href in ['#', 'javascript:void(0)', '']: continue
-            if "Mevzuat - KYS" in text: continue 
-            
-            full_url = urljoin(BASE_URL, href)
-            
-            # Path'i liste olarak al
-            path_list = get_breadcrumb_path_list(link, target_li)
-            data_type = get_data_type(full_url)
-            
-            item = {
-                "text": text,
-                "url": full_url,
-                "path_list": path_list,             # Liste formatı
-                "path_string": " > ".join(path_list), # Okunabilir format
-                "data_type": data_type,
-                "source": "MENU"
-            }
-            
-            # Tekrarı önle
-            if not any(x['url'] == full_url for x in menu_items):
-                menu_items.append(item)
-                print(f"  [MENÜ] {data_type} | {text}")
+        menu_items = extract_menu_items(target_li)
 
     except Exception as e:
         print(f"Hata: {e}")
@@ -163,54 +214,127 @@ def scrape_menu_links():
         
     return menu_items
 
+def scrape_menu_links(cache=None):
+    """Önce HTTP ile dener; kapsayıcı bulunamazsa Selenium'a düşer."""
+    started = time.perf_counter()
+    menu_items = scrape_menu_links_http(cache)
+    if menu_items is not None:
+        print(f"   Menü HTTP ile {time.perf_counter() - started:.2f} sn'de alındı.")
+        return menu_items
+    
+    print("   Selenium yedeğine geçiliyor...")
+    return scrape_menu_links_selenium()
+
+def menu_record_key(item):
+    return (item['url'], tuple(item['path_list']), item['data_type'], item['text'])
+
+def check_menu_parity(reference_items=None):
+    """
+    HTTP ile çıkarılan menü kayıtlarını Selenium çıktısıyla (veya verilen
+    referans kayıtlarla, ör. önceki OUTPUT_FILE'daki MENU kayıtları) karşılaştırır.
+    """
+    started = time.perf_counter()
+    http_items = scrape_menu_links_http() or []
+    http_seconds = time.perf_counter() - started
+    
+    if reference_items is None:
+        started = time.perf_counter()
+        reference_items = scrape_menu_links_selenium()
+        print(f"   Selenium süresi: {time.perf_counter() - started:.2f} sn")
+    print(f"   HTTP süresi: {http_seconds:.2f} sn")
+    
+    http_keys = [menu_record_key(item) for item in http_items]
+    reference_keys = [menu_record_key(item) for item in reference_items]
+    missing = [key for key in reference_keys if key not in set(http_keys)]
+    extra = [key for key in http_keys if key not in set(reference_keys)]
+    
+    for key in missing:
+        print(f"  [EKSİK] {key}")
+    for key in extra:
+        print(f"  [FAZLA] {key}")
+    same_order = http_keys == reference_keys
+    print(f"Parite: {len(http_keys)} HTTP / {len(reference_keys)} referans kayıt, "
+          f"{len(missing)} eksik, {len(extra)} fazla, sıra {'aynı' if same_order else 'farklı'}.")
+    return not missing and not extra
+
 # --- PHASE 2: İÇERİK SAYFASI TARAMA (REQUESTS) ---
 
-def scrape_content_page(parent_item):
-    """HTML sayfasına gider ve içindeki dosya linklerini çeker."""
+def extract_page_files(parent_item, content):
+    """Sayfa HTML'i içindeki dosya linklerini PAGE_CONTENT kayıtlarına çevirir."""
     url = parent_item['url']
     parent_path = parent_item['path_list']
     found_files = []
     
-    try:
-        # Requests ile hızlıca çekiyoruz
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
-        resp = requests.get(url, headers=headers, timeout=10)
+    soup = BeautifulSoup(content, 'html.parser')
+    
+    # İçerik alanını bul (TTKB sitesi için genelde 'icerik' id'si kullanılır)
+    content_div = soup.find('div', id='icerik') or soup.find('div', class_='icerik') or soup.body
+    
+    links = content_div.find_all('a', href=True)
+    for link in links:
+        href = link['href']
+        text = clean_text(link.get_text())
+        full_url = urljoin(url, href)
+        dtype = get_data_type(full_url)
         
-        if resp.status_code == 200:
-            soup = BeautifulSoup(resp.content, 'html.parser')
+        # Sadece dosya olanları al (HTML sayfalarını tekrar alırsak döngüye gireriz)
+        if dtype != 'HTML':
+            if not text: text = os.path.basename(full_url)
             
-            # İçerik alanını bul (TTKB sitesi için genelde 'icerik' id'si kullanılır)
-            content_div = soup.find('div', id='icerik') or soup.find('div', class_='icerik') or soup.body
+            # Yeni path: Mevcut Path + Dosya Adı
+            new_path = parent_path + [text]
             
-            links = content_div.find_all('a', href=True)
-            for link in links:
-                href = link['href']
-                text = clean_text(link.get_text())
-                full_url = urljoin(url, href)
-                dtype = get_data_type(full_url)
-                
-                # Sadece dosya olanları al (HTML sayfalarını tekrar alırsak döngüye gireriz)
-                if dtype != 'HTML':
-                    if not text: text = os.path.basename(full_url)
-                    
-                    # Yeni path: Mevcut Path + Dosya Adı
-                    new_path = parent_path + [text]
-                    
-                    file_item = {
-                        "text": text,
-                        "url": full_url,
-                        "path_list": new_path,
-                        "path": " > ".join(new_path),
-                        "data_type": dtype,
-                        "source": "PAGE_CONTENT"
-                    }
-                    found_files.append(file_item)
-                    print(f"    -> [SAYFA İÇİ] {dtype} | {text}")
+            file_item = {
+                "text": text,
+                "url": full_url,
+                "path_list": new_path,
+                "path": " > ".join(new_path),
+                "data_type": dtype,
+                "source": "PAGE_CONTENT"
+            }
+            found_files.append(file_item)
+            print(f"    -> [SAYFA İÇİ] {dtype} | {text}")
+    
+    return found_files
+
+def scrape_content_page(parent_item, fetcher=None, cache=None):
+    """
+    HTML sayfasına gider ve içindeki dosya linklerini çeker.
+    Önbellek verilirse sayfaya içerik özeti (content_sha256) yazılır.
+    Sayfanın önceki çalıştırmaya göre değişip değişmediği kayda yazılmaz;
+    çalıştırmaya bağlı olduğundan manifest farkını kirletirdi.
+    """
+    url = parent_item['url']
+    
+    try:
+        if cache is not None and fetcher is not None:
+            resp = cache.fetch(fetcher, url)
+        elif cache is not None:
+            resp = cache.fetch(requests, url, headers={'User-Agent': USER_AGENT}, timeout=10)
+        elif fetcher is not None:
+            resp = fetcher.get(url)
+        else:
+            headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
+            resp = requests.get(url, headers=headers, timeout=10)
+        
+        if resp.status_code == 200:
+            if cache is not None:
+                parent_item['content_sha256'] = resp.sha256
+            return extract_page_files(parent_item, resp.content)
+        print(f"    HTTP {resp.status_code} ({url})")
                     
     except Exception as e:
         print(f"    Hata ({url}): {e}")
         
-    return found_files
+    return []
+
+def scrape_content_pages(items, fetcher, workers=CRAWL_WORKERS, cache=None):
+    """
+    Sayfaları ortak bağlantı havuzu ve host başına sınırlarla eşzamanlı tarar.
+    Sonuçlar items ile aynı sırada döner.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda item: scrape_content_page(item, fetcher, cache), items))
 
 
 def upload_links_to_s3(links, bucket_name, object_key):
@@ -238,31 +362,46 @@ def upload_links_to_s3(links, bucket_name, object_key):
 # --- ANA ÇALIŞTIRMA ---
 
 if __name__ == "__main__":
+    if MENU_PARITY_CHECK:
+        print("=== MENÜ PARİTE KONTROLÜ (HTTP vs Selenium) ===")
+        reference = None
+        if MENU_PARITY_REFERENCE:
+            with open(MENU_PARITY_REFERENCE, "r", encoding="utf-8") as f:
+                reference = [item for item in json.load(f) if item.get('source') == 'MENU']
+        sys.exit(0 if check_menu_parity(reference) else 1)
+
+    cache = HttpCache(HTTP_CACHE_DIR) if HTTP_CACHE_DIR else None
+    
     print("=== AŞAMA 1: MENÜ TARAMA BAŞLIYOR ===")
-    all_data = scrape_menu_links()
+    all_data = scrape_menu_links(cache)
     
     print(f"\n[Aşama 1 Bitti] Menüden {len(all_data)} öğe bulundu.")
     
     final_results = []
     
     print("\n=== AŞAMA 2: DETAYLI DOSYA TARAMA BAŞLIYOR ===")
+    # Sadece HTML sayfalarının içine girip dosya var mı bakıyoruz
+    pages = [item for item in all_data if item['data_type'] == 'HTML' and "meb.gov.tr" in item['url']]
+    fetcher = PoliteFetcher(max_per_host=CRAWL_PER_HOST, rate_per_host=CRAWL_RATE_PER_HOST)
+    started = time.perf_counter()
+    try:
+        page_files = scrape_content_pages(pages, fetcher, cache=cache)
+    finally:
+        fetcher.close()
+    print(f"  {len(pages)} sayfa {time.perf_counter() - started:.2f} sn'de tarandı. İstatistik: {fetcher.stats}")
+    if cache is not None:
+        # not_modified (304) ve unchanged (aynı özet) sayfalar değişmemiş sayfalardır.
+        print(f"  Önbellek istatistiği: {cache.stats}")
+    files_by_page = {id(page): files for page, files in zip(pages, page_files)}
+    
     for item in all_data:
-        # Öğeyi ana listeye ekle
+        # Öğeyi ana listeye ekle, ardından sayfadan çıkan dosyaları
         final_results.append(item)
-        
-        # Eğer bu bir HTML sayfası ise içine girip dosya var mı bak
-        if item['data_type'] == 'HTML' and "meb.gov.tr" in item['url']:
-            print(f"  İnceleniyor: {item['text']}")
-            sub_files = scrape_content_page(item)
-            if sub_files:
-                final_results.extend(sub_files)
+        final_results.extend(files_by_page.get(id(item), []))
     
     print("\n" + "="*50)
     print(f"TOPLAM SONUÇ: {len(final_results)}")
     
-    # Kayıt
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(final_results, f, ensure_ascii=False, indent=2)
-    print(f"Veriler '{OUTPUT_FILE}' dosyasına kaydedildi.")
-
-    upload_links_to_s3(final_results, S3_BUCKET_NAME, S3_OUTPUT_KEY)
\ No newline at end of file
+    # Kayıt: önceki manifest ile fark çıkarılır; S3'e sadece değişiklik varsa yüklenir
+    publish_incremental(final_results, OUTPUT_FILE, S3_BUCKET_NAME, S3_OUTPUT_KEY, upload_links_to_s3, FORCE_PUBLISH)
+    print(f"Veriler '{OUTPUT_FILE}' dosyasına kaydedildi.")
\ No newline at end of file
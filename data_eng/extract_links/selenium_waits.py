@@ -0,0 +1,137 @@
+import threading
+import time
+
+from selenium.common.exceptions import JavascriptException, StaleElementReferenceException
+
+# Short polling with an upper bound per wait; most menus settle well under it.
+POLL_SECONDS = 0.05
+QUIET_SECONDS = 0.15
+DEFAULT_TIMEOUT = 3.0
+# A hover that reveals nothing new is accepted after this long (menus with a
+# hover-intent delay open within it).
+NO_CHANGE_GRACE_SECONDS = 0.5
+
+# Installs (once per page) a MutationObserver that stamps the last DOM change;
+# returns the seconds since that change.
+_OBSERVE_JS = """
+if (!window.__lastMutation) {
+    window.__lastMutation = performance.now();
+    new MutationObserver(function () { window.__lastMutation = performance.now(); })
+        .observe(document, {subtree: true, childList: true, attributes: true});
+}
+return (performance.now() - window.__lastMutation) / 1000;
+"""
+
+# Visible links under `root` (or the whole document); a submenu that has
+# finished opening keeps this count steady.
+_VISIBLE_LINKS_JS = """
+var root = arguments[0] || document;
+var links = root.querySelectorAll('a[href]');
+var visible = 0;
+for (var i = 0; i < links.length; i++) {
+    var r = links[i].getBoundingClientRect();
+    if (r.width > 0 && r.height > 0 && getComputedStyle(links[i]).visibility !== 'hidden') visible++;
+}
+return visible;
+"""
+
+
+class WaitStats:
+    """
+    Measured time spent in condition waits, next to the fixed sleeps they
+    replace. The fixed figure is the sum of the old sleep constants, not a
+    timed run; a sleep always took exactly that long. Shared by the browser
+    pool's threads, so updates take a lock.
+    """
+
+    def __init__(self):
+        self.waits = 0
+        self.timeouts = 0
+        self.waited_seconds = 0.0
+        self.fixed_sleep_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, started: float, fixed_sleep: float, timed_out: bool) -> None:
+        waited = time.perf_counter() - started
+        with self._lock:
+            self.waits += 1
+            self.timeouts += int(timed_out)
+            self.waited_seconds += waited
+            self.fixed_sleep_seconds += fixed_sleep
+
+    def summary(self) -> str:
+        saved = self.fixed_sleep_seconds - self.waited_seconds
+        return (
+            f"{self.waits} waits took {self.waited_seconds:.2f}s "
+            f"(replaced fixed sleeps: {self.fixed_sleep_seconds:.2f}s, saved {saved:.2f}s, "
+            f"{self.timeouts} hit the upper bound)"
+        )
+
+
+STATS = WaitStats()
+
+
+def _poll(condition, timeout: float, fixed_sleep: float) -> bool:
+    started = time.perf_counter()
+    deadline = started + timeout
+    while True:
+        try:
+            if condition():
+                STATS.add(started, fixed_sleep, timed_out=False)
+                return True
+        except (JavascriptException, StaleElementReferenceException):
+            pass
+        if time.perf_counter() >= deadline:
+            STATS.add(started, fixed_sleep, timed_out=True)
+            return False
+        time.sleep(POLL_SECONDS)
+
+
+def wait_for_page_load(driver, timeout: float = 10.0, fixed_sleep: float = 0.0) -> bool:
+    """document.readyState is complete and the DOM has stopped changing."""
+    return _poll(
+        lambda: driver.execute_script("return document.readyState") == "complete"
+        and driver.execute_script(_OBSERVE_JS) >= QUIET_SECONDS,
+        timeout,
+        fixed_sleep,
+    )
+
+
+def wait_for_dom_quiet(driver, timeout: float = 1.0, fixed_sleep: float = 0.0) -> bool:
+    """No DOM mutation for QUIET_SECONDS, e.g. after a scroll or a mouse-out."""
+    return _poll(lambda: driver.execute_script(_OBSERVE_JS) >= QUIET_SECONDS, timeout, fixed_sleep)
+
+
+def wait_for_submenu(
+    driver, root=None, baseline=None, timeout: float = DEFAULT_TIMEOUT, fixed_sleep: float = 0.0
+) -> bool:
+    """
+    After a hover: wait until the number of visible links under `root` (or
+    anywhere) holds for three polls while the DOM is quiet. With a
+    `baseline` count from before the hover, an unchanged count is only
+    accepted after NO_CHANGE_GRACE_SECONDS.
+    """
+    history = []
+    started = time.perf_counter()
+
+    def settled() -> bool:
+        history.append(driver.execute_script(_VISIBLE_LINKS_JS, root))
+        if len(history) < 3 or not history[-1] == history[-2] == history[-3]:
+            return False
+        if baseline is not None and history[-1] == baseline:
+            if time.perf_counter() - started < NO_CHANGE_GRACE_SECONDS:
+                return False
+        return driver.execute_script(_OBSERVE_JS) >= QUIET_SECONDS
+
+    return _poll(settled, timeout, fixed_sleep)
+
+
+def visible_link_count(driver, root=None) -> int:
+    return driver.execute_script(_VISIBLE_LINKS_JS, root)
+
+
+def hover(actions, driver, element, root=None, timeout: float = DEFAULT_TIMEOUT, fixed_sleep: float = 0.0) -> bool:
+    """Move the mouse onto `element` and wait for what it opens to settle."""
+    baseline = visible_link_count(driver, root)
+    actions.move_to_element(element).perform()
+    return wait_for_submenu(driver, root, baseline, timeout, fixed_sleep)
@@ -1,117 +1,380 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 import time
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
 
+from browser_pool import BrowserPool, new_driver
+from manifest_diff import publish_incremental
+from selenium_waits import STATS as WAIT_STATS, hover, wait_for_dom_quiet, wait_for_page_load
+
 TARGET_TEXT = "Mevzuat - KYS"
+BASE_URL = "https://ttkb.meb.gov.tr/"
+# Browsers exploring nested dropdown items in parallel; 1 keeps the serial crawl.
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "3"))
+# Upload the manifest and its diff even when nothing changed.
+FORCE_PUBLISH = os.getenv("MANIFEST_FORCE_PUBLISH") == "1"
 S3_BUCKET_NAME = "goaltech-poc-ai-assistant"
 S3_OUTPUT_KEY = os.getenv("S3_OUTPUT_KEY", "extract-links/mevzuat_kys_links.json")
 
 
-def scrape_mevzuat_kys_links():
+def open_mevzuat_menu(driver, actions):
     """
-    Scrapes all links from the TARGET_TEXT dropdown menu.
-    Returns a list of dictionaries containing link text and URLs.
+    Loads the home page, finds the TARGET_TEXT navbar item and hovers it so
+    its dropdown is open. Returns the item, or None if it cannot be opened.
     """
-    # Setup Chrome options - run headless for EC2
-    chrome_options = Options()
-    chrome_options.add_argument("--headless=new")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    )
+    print(f"Navigating to {BASE_URL}...")
+    driver.get(BASE_URL)
 
-    # Initialize the driver
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    actions = ActionChains(driver)
+    # Wait for the page to load and settle
+    wait_for_page_load(driver, fixed_sleep=3)
 
-    links_found = []
+    # Find the TARGET_TEXT navbar item
+    print(f"Looking for '{TARGET_TEXT}' navbar item...")
+
+    mevzuat_item = None
+
+    # Try multiple selectors to find the TARGET_TEXT item
+    selectors = [
+        f"//a[contains(text(), '{TARGET_TEXT}')]",
+        f"//span[contains(text(), '{TARGET_TEXT}')]",
+        f"//li[contains(text(), '{TARGET_TEXT}')]",
+    ]
 
+    for selector in selectors:
+        try:
+            elements = driver.find_elements(By.XPATH, selector)
+            for elem in elements:
+                if elem.is_displayed():
+                    # Get the parent li or the element itself
+                    try:
+                        mevzuat_item = elem.find_element(By.XPATH, "./ancestor::li[1]")
+                    except Exception:
+                        mevzuat_item = elem.find_element(By.XPATH, "./..")
+                    print(f"Found '{TARGET_TEXT}' using selector: {selector}")
+                    break
+            if mevzuat_item:
+                break
+        except Exception:
+            continue
+
+    if not mevzuat_item:
+        # Try finding by partial text
+        try:
+            link = driver.find_element(By.PARTIAL_LINK_TEXT, "Mevzuat")
+            mevzuat_item = link.find_element(By.XPATH, "./ancestor::li[1]")
+            print(f"Found '{TARGET_TEXT}' using partial link text")
+        except Exception:
+            pass
+
+    if not mevzuat_item:
+        print(f"Error: Could not find '{TARGET_TEXT}' navbar item!")
+        return None
+
+    # Scroll to the element
+    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", mevzuat_item)
+    wait_for_dom_quiet(driver, fixed_sleep=0.5)
+
+    # Hover over TARGET_TEXT to open dropdown
+    print(f"Hovering over '{TARGET_TEXT}'...")
     try:
-        # Navigate to the website
-        base_url = "https://ttkb.meb.gov.tr/"
-        print(f"Navigating to {base_url}...")
-        driver.get(base_url)
+        hover(actions, driver, mevzuat_item, fixed_sleep=3.0)  # Wait for dropdown to open and settle
+        print("  Dropdown opened")
+    except Exception as e:
+        print(f"  Could not hover: {e}")
+        return None
 
-        # Wait for page to load
-        time.sleep(3)
+    return mevzuat_item
 
-        # Find the TARGET_TEXT navbar item
-        print(f"Looking for '{TARGET_TEXT}' navbar item...")
 
-        mevzuat_item = None
+def find_nested_items(dropdown):
+    """
+    List items inside a dropdown that head a submenu (like "TTKB Mevzuatı"),
+    in a stable order so another browser can find the same item by index.
+    """
+    nested_items = []
 
-        # Try multiple selectors to find the TARGET_TEXT item
-        selectors = [
-            f"//a[contains(text(), '{TARGET_TEXT}')]",
-            f"//span[contains(text(), '{TARGET_TEXT}')]",
-            f"//li[contains(text(), '{TARGET_TEXT}')]",
-        ]
+    # Find items with spans (likely submenu headers)
+    all_li_items = dropdown.find_elements(By.XPATH, ".//li")
+    for li in all_li_items:
+        try:
+            # Check if this li contains a span (submenu header indicator)
+            span = li.find_element(By.XPATH, ".//span")
+            span_text = span.text.strip() if span else ""
+
+            # Check if this li has a submenu class or contains a span
+            li_classes = li.get_attribute("class") or ""
+            if (
+                "mt-lg-1" in span.get_attribute("class")
+                or "submenu" in li_classes.lower()
+                or span_text
+            ):
+                if li not in nested_items:
+                    nested_items.append(li)
+        except Exception:
+            pass
+
+    # Also find items with dropdown/submenu classes
+    class_based_items = dropdown.find_elements(
+        By.XPATH,
+        ".//li[contains(@class, 'dropdown') or "
+        "contains(@class, 'submenu') or contains(@class, 'has-submenu')]",
+    )
+    for item in class_based_items:
+        if item not in nested_items:
+            nested_items.append(item)
+
+    # Find spans with mt-lg-1 class and get their parent li
+    mt_spans = dropdown.find_elements(
+        By.XPATH, ".//span[contains(@class, 'mt-lg-1')]"
+    )
+    for span in mt_spans:
+        try:
+            parent_li = span.find_element(By.XPATH, "./ancestor::li[1]")
+            if parent_li not in nested_items:
+                nested_items.append(parent_li)
+        except Exception:
+            pass
+
+    return nested_items
+
+
+def nested_item_text(nested_item):
+    """Text of a nested item, from its span first (like "TTKB Mevzuatı")."""
+    try:
+        try:
+            span = nested_item.find_element(By.XPATH, ".//span")
+            return span.text.strip()
+        except Exception:
+            return nested_item.text.strip()
+    except Exception:
+        return ""
+
+
+def explore_nested_item(
+    driver,
+    actions,
+    mevzuat_item,
+    nested_item,
+    nested_text,
+    base_path,
+    excluded_texts,
+    excluded_urls,
+    processed_dropdowns,
+):
+    """
+    Hovers a nested dropdown item and returns the (text, url, path) tuples of
+    the links its submenu shows, then moves back to the TARGET_TEXT item.
+    """
+    base_url = BASE_URL
+    all_links = set()
+    try:
+        # Hover over nested item to open submenu
+        hover(actions, driver, nested_item, fixed_sleep=2)  # Wait for submenu to settle
 
-        for selector in selectors:
+        # Find all visible submenus that appeared after hovering
+        # Look for submenus that are siblings or children of the nested item
+        submenu_links_found = []
+
+        # Strategy 1: Find submenus that are siblings or following the nested item
+        try:
+            # Look for ul or div elements that are siblings
+            sibling_submenus = nested_item.find_elements(
+                By.XPATH,
+                "./following-sibling::*[contains(@class, 'submenu')] | "
+                "./following-sibling::*[contains(@class, 'dropdown-menu')]",
+            )
+            for submenu in sibling_submenus:
+                if submenu.is_displayed():
+                    links = submenu.find_elements(By.XPATH, ".//a[@href]")
+                    submenu_links_found.extend(links)
+        except Exception:
+            pass
+
+        # Strategy 2: Find all visible submenus globally and check if related
+        try:
+            all_submenus = driver.find_elements(
+                By.XPATH,
+                "//div[contains(@class, 'sub-dropdown-container')] | "
+                "//div[contains(@class, 'dropdown-container')] | "
+                "//div[contains(@class, 'submenu')] | "
+                "//ul[contains(@class, 'submenu')] | "
+                "//div[contains(@class, 'dropdown-menu')] | "
+                "//ul[contains(@class, 'dropdown-menu')]",
+            )
+            for submenu in all_submenus:
+                try:
+                    if (
+                        submenu.is_displayed()
+                        and id(submenu) not in processed_dropdowns
+                    ):
+                        # Extract links from ul elements, especially alt-menu
+                        links = submenu.find_elements(
+                            By.XPATH,
+                            ".//ul//li[contains(@class, 'alt-menu')]"
+                            "//a[@href] | .//a[@href]",
+                        )
+                        submenu_links_found.extend(links)
+                except Exception:
+                    continue
+        except Exception:
+            pass
+
+        # Strategy 3: Find links in the nested item's structure
+        try:
+            item_links = nested_item.find_elements(
+                By.XPATH,
+                ".//a[@href] | ./following-sibling::*//a[@href] | "
+                "./following::*[contains(@class, 'submenu')]//a[@href]",
+            )
+            submenu_links_found.extend(item_links)
+        except Exception:
+            pass
+
+        print(
+            f"    Found {len(submenu_links_found)} "
+            "potential links from submenu"
+        )
+
+        # Extract and add all found links
+        for link in submenu_links_found:
             try:
-                elements = driver.find_elements(By.XPATH, selector)
-                for elem in elements:
-                    if elem.is_displayed():
-                        # Get the parent li or the element itself
-                        try:
-                            mevzuat_item = elem.find_element(By.XPATH, "./ancestor::li[1]")
-                        except Exception:
-                            mevzuat_item = elem.find_element(By.XPATH, "./..")
-                        print(f"Found '{TARGET_TEXT}' using selector: {selector}")
-                        break
-                if mevzuat_item:
-                    break
+                if not link.is_displayed():
+                    continue
+
+                href = link.get_attribute("href")
+                text = link.text.strip()
+
+                # Skip excluded links
+                if text in excluded_texts:
+                    continue
+
+                if href and href not in [
+                    "#",
+                    "",
+                    None,
+                    "javascript:void(0)",
+                ]:
+                    full_url = urljoin(base_url, href)
+
+                    # Skip excluded URLs
+                    if full_url in excluded_urls:
+                        continue
+
+                    # Skip base URL
+                    if (
+                        full_url == base_url
+                        or full_url == base_url.rstrip("/")
+                    ):
+                        continue
+
+                    if text:
+                        # Path includes nested item text
+                        current_path = base_path + [nested_text]
+                        path_tuple = tuple(current_path)
+                        all_links.add((text, full_url, path_tuple))
+                        print(
+                            "      ✓ Added: "
+                            f"{text}: {full_url} "
+                            f"(Path: {' --> '.join(path_tuple)})"
+                        )
             except Exception:
                 continue
 
+        # Move back to parent item to keep dropdown open
+        hover(actions, driver, mevzuat_item, timeout=1.0, fixed_sleep=0.8)
+    except Exception as e:
+        print(f"    Error processing nested item: {e}")
+        import traceback
+
+        traceback.print_exc()
+        # Move back to parent on error too
+        try:
+            hover(actions, driver, mevzuat_item, timeout=1.0, fixed_sleep=0.5)
+        except Exception:
+            pass
+
+    return all_links
+
+
+def explore_branch(driver, task, open_menus):
+    """
+    Explores one nested item on a pooled browser. The browser opens the
+    TARGET_TEXT dropdown once and keeps it open for later branches; the item
+    is found again by dropdown and item index, checked against its text.
+    """
+    actions = ActionChains(driver)
+    mevzuat_item = open_menus.get(id(driver))
+    if mevzuat_item is None:
+        mevzuat_item = open_mevzuat_menu(driver, actions)
         if not mevzuat_item:
-            # Try finding by partial text
-            try:
-                link = driver.find_element(By.PARTIAL_LINK_TEXT, "Mevzuat")
-                mevzuat_item = link.find_element(By.XPATH, "./ancestor::li[1]")
-                print(f"Found '{TARGET_TEXT}' using partial link text")
-            except Exception:
-                pass
+            raise RuntimeError(f"Could not open '{TARGET_TEXT}' dropdown")
+        open_menus[id(driver)] = mevzuat_item
+
+    dropdown = driver.find_elements(By.XPATH, task["selector"])[task["dropdown_index"]]
+    nested_items = find_nested_items(dropdown)
+    index = task["nested_index"]
+    if index >= len(nested_items) or nested_item_text(nested_items[index]) != task["nested_text"]:
+        matches = [item for item in nested_items if nested_item_text(item) == task["nested_text"]]
+        if not matches:
+            raise RuntimeError(f"Nested item not found: {task['nested_text']}")
+        index = nested_items.index(matches[0])
+
+    print(f"  [pool] Processing nested item: {task['nested_text'][:60]}...")
+    return explore_nested_item(
+        driver,
+        actions,
+        mevzuat_item,
+        nested_items[index],
+        task["nested_text"],
+        task["base_path"],
+        task["excluded_texts"],
+        task["excluded_urls"],
+        set(),
+    )
+
+
+def scrape_mevzuat_kys_links(pool_size=BROWSER_POOL_SIZE):
+    """
+    Scrapes all links from the TARGET_TEXT dropdown menu.
+    Returns a list of dictionaries containing link text and URLs.
+
+    With pool_size > 1, nested dropdown items are explored on a pool of warm
+    headless browsers started while the main browser loads the page.
+    """
+    # Start the parallel pool in the background while the main browser loads the page
+    pool_future = None
+    pool_executor = ThreadPoolExecutor(max_workers=1)
+    if pool_size > 1:
+        pool_future = pool_executor.submit(BrowserPool, pool_size)
 
+    started = time.perf_counter()
+    try:
+        driver = new_driver()
+    except Exception:
+        if pool_future is not None:
+            pool_future.result().close()
+        raise
+    print(f"Browser started in {time.perf_counter() - started:.2f}s")
+    actions = ActionChains(driver)
+
+    links_found = []
+
+    try:
+        base_url = BASE_URL
+        mevzuat_item = open_mevzuat_menu(driver, actions)
         if not mevzuat_item:
-            print(f"Error: Could not find '{TARGET_TEXT}' navbar item!")
             return []
 
         all_links = set()  # Use set to avoid duplicates - stores (text, url, path) tuples
         base_path = [TARGET_TEXT]  # Base path for all links
+        branch_tasks = []  # Nested items explored on the browser pool
 
         # Process the TARGET_TEXT item
         print(f"\nProcessing '{TARGET_TEXT}' dropdown...")
         try:
-            # Scroll to the element
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", mevzuat_item)
-            time.sleep(0.5)
-
-            # Hover over TARGET_TEXT to open dropdown
-            print(f"Hovering over '{TARGET_TEXT}'...")
-            try:
-                actions.move_to_element(mevzuat_item).perform()
-                time.sleep(1.5)  # Wait for dropdown to appear
-                print("  Dropdown opened")
-            except Exception as e:
-                print(f"  Could not hover: {e}")
-                return []
-
-            # Wait a bit for dropdown animations
-            time.sleep(1.5)
-
             # Find dropdown menus that appeared after hovering
             # Filter out common navbar links that shouldn't be included
             excluded_texts = ["Anasayfa", "RSS", "S.S.S", "İletişim", "Home", "Contact", "EN", "TR"]
@@ -138,7 +401,7 @@ def scrape_mevzuat_kys_links():
                 try:
                     dropdowns = driver.find_elements(By.XPATH, selector)
                     print(f"  Found {len(dropdowns)} dropdowns with selector: {selector}")
-                    for dropdown in dropdowns:
+                    for dropdown_index, dropdown in enumerate(dropdowns):
                         try:
                             if dropdown.is_displayed() and id(dropdown) not in processed_dropdowns:
                                 processed_dropdowns.add(id(dropdown))
@@ -207,200 +470,46 @@ def scrape_mevzuat_kys_links():
 
                                 # Now find nested submenu items (like "TTKB Mevzuatı")
                                 # Find all list items that might have submenus - look for items with spans
-                                nested_items = []
-
-                                # Find items with spans (likely submenu headers)
-                                all_li_items = dropdown.find_elements(By.XPATH, ".//li")
-                                for li in all_li_items:
-                                    try:
-                                        # Check if this li contains a span (submenu header indicator)
-                                        span = li.find_element(By.XPATH, ".//span")
-                                        span_text = span.text.strip() if span else ""
-
-                                        # Check if this li has a submenu class or contains a span
-                                        li_classes = li.get_attribute("class") or ""
-                                        if (
-                                            "mt-lg-1" in span.get_attribute("class")
-                                            or "submenu" in li_classes.lower()
-                                            or span_text
-                                        ):
-                                            if li not in nested_items:
-                                                nested_items.append(li)
-                                    except Exception:
-                                        pass
-
-                                # Also find items with dropdown/submenu classes
-                                class_based_items = dropdown.find_elements(
-                                    By.XPATH,
-                                    ".//li[contains(@class, 'dropdown') or "
-                                    "contains(@class, 'submenu') or contains(@class, 'has-submenu')]",
-                                )
-                                for item in class_based_items:
-                                    if item not in nested_items:
-                                        nested_items.append(item)
-
-                                # Find spans with mt-lg-1 class and get their parent li
-                                mt_spans = dropdown.find_elements(
-                                    By.XPATH, ".//span[contains(@class, 'mt-lg-1')]"
-                                )
-                                for span in mt_spans:
-                                    try:
-                                        parent_li = span.find_element(By.XPATH, "./ancestor::li[1]")
-                                        if parent_li not in nested_items:
-                                            nested_items.append(parent_li)
-                                    except Exception:
-                                        pass
+                                nested_items = find_nested_items(dropdown)
 
                                 print(f"    Found {len(nested_items)} nested items to process")
 
                                 # Process each nested item
                                 for idx, nested_item in enumerate(nested_items, 1):
-                                    try:
-                                        # Try to get text from span first (like "TTKB Mevzuatı")
-                                        nested_text = ""
-                                        try:
-                                            span = nested_item.find_element(By.XPATH, ".//span")
-                                            nested_text = span.text.strip()
-                                        except Exception:
-                                            nested_text = nested_item.text.strip()
-
-                                        if not nested_text or nested_text in excluded_texts:
-                                            continue
-
-                                        print(
-                                            f"  [{idx}/{len(nested_items)}] "
-                                            f"Processing nested item: {nested_text[:60]}..."
-                                        )
-
-                                        # Hover over nested item to open submenu
-                                        actions.move_to_element(nested_item).perform()
-                                        time.sleep(2)  # Wait longer for submenu to appear
-
-                                        # Find all visible submenus that appeared after hovering
-                                        # Look for submenus that are siblings or children of the nested item
-                                        submenu_links_found = []
-
-                                        # Strategy 1: Find submenus that are siblings or following the nested item
-                                        try:
-                                            # Look for ul or div elements that are siblings
-                                            sibling_submenus = nested_item.find_elements(
-                                                By.XPATH,
-                                                "./following-sibling::*[contains(@class, 'submenu')] | "
-                                                "./following-sibling::*[contains(@class, 'dropdown-menu')]",
-                                            )
-                                            for submenu in sibling_submenus:
-                                                if submenu.is_displayed():
-                                                    links = submenu.find_elements(By.XPATH, ".//a[@href]")
-                                                    submenu_links_found.extend(links)
-                                        except Exception:
-                                            pass
-
-                                        # Strategy 2: Find all visible submenus globally and check if related
-                                        try:
-                                            all_submenus = driver.find_elements(
-                                                By.XPATH,
-                                                "//div[contains(@class, 'sub-dropdown-container')] | "
-                                                "//div[contains(@class, 'dropdown-container')] | "
-                                                "//div[contains(@class, 'submenu')] | "
-                                                "//ul[contains(@class, 'submenu')] | "
-                                                "//div[contains(@class, 'dropdown-menu')] | "
-                                                "//ul[contains(@class, 'dropdown-menu')]",
-                                            )
-                                            for submenu in all_submenus:
-                                                try:
-                                                    if (
-                                                        submenu.is_displayed()
-                                                        and id(submenu) not in processed_dropdowns
-                                                    ):
-                                                        # Extract links from ul elements, especially alt-menu
-                                                        links = submenu.find_elements(
-                                                            By.XPATH,
-                                                            ".//ul//li[contains(@class, 'alt-menu')]"
-                                                            "//a[@href] | .//a[@href]",
-                                                        )
-                                                        submenu_links_found.extend(links)
-                                                except Exception:
-                                                    continue
-                                        except Exception:
-                                            pass
-
-                                        # Strategy 3: Find links in the nested item's structure
-                                        try:
-                                            item_links = nested_item.find_elements(
-                                                By.XPATH,
-                                                ".//a[@href] | ./following-sibling::*//a[@href] | "
-                                                "./following::*[contains(@class, 'submenu')]//a[@href]",
-                                            )
-                                            submenu_links_found.extend(item_links)
-                                        except Exception:
-                                            pass
+                                    nested_text = nested_item_text(nested_item)
+                                    if not nested_text or nested_text in excluded_texts:
+                                        continue
 
-                                        print(
-                                            f"    Found {len(submenu_links_found)} "
-                                            "potential links from submenu"
+                                    if pool_future is not None:
+                                        # Explored later on a pooled browser, in parallel with the others
+                                        branch_tasks.append(
+                                            {
+                                                "selector": selector,
+                                                "dropdown_index": dropdown_index,
+                                                "nested_index": idx - 1,
+                                                "nested_text": nested_text,
+                                                "base_path": base_path,
+                                                "excluded_texts": excluded_texts,
+                                                "excluded_urls": excluded_urls,
+                                            }
                                         )
-
-                                        # Extract and add all found links
-                                        for link in submenu_links_found:
-                                            try:
-                                                if not link.is_displayed():
-                                                    continue
-
-                                                href = link.get_attribute("href")
-                                                text = link.text.strip()
-
-                                                # Skip excluded links
-                                                if text in excluded_texts:
-                                                    continue
-
-                                                if href and href not in [
-                                                    "#",
-                                                    "",
-                                                    None,
-                                                    "javascript:void(0)",
-                                                ]:
-                                                    full_url = urljoin(base_url, href)
-
-                                                    # Skip excluded URLs
-                                                    if full_url in excluded_urls:
-                                                        continue
-
-                                                    # Skip base URL
-                                                    if (
-                                                        full_url == base_url
-                                                        or full_url == base_url.rstrip("/")
-                                                    ):
-                                                        continue
-
-                                                    if text:
-                                                        # Path includes nested item text
-                                                        current_path = base_path + [nested_text]
-                                                        path_tuple = tuple(current_path)
-                                                        all_links.add((text, full_url, path_tuple))
-                                                        print(
-                                                            "      ✓ Added: "
-                                                            f"{text}: {full_url} "
-                                                            f"(Path: {' --> '.join(path_tuple)})"
-                                                        )
-                                            except Exception:
-                                                continue
-
-                                        # Move back to parent item to keep dropdown open
-                                        actions.move_to_element(mevzuat_item).perform()
-                                        time.sleep(0.8)
-
-                                    except Exception as e:
-                                        print(f"    Error processing nested item: {e}")
-                                        import traceback
-
-                                        traceback.print_exc()
-                                        # Move back to parent on error too
-                                        try:
-                                            actions.move_to_element(mevzuat_item).perform()
-                                            time.sleep(0.5)
-                                        except Exception:
-                                            pass
                                         continue
+
+                                    print(
+                                        f"  [{idx}/{len(nested_items)}] "
+                                        f"Processing nested item: {nested_text[:60]}..."
+                                    )
+                                    all_links |= explore_nested_item(
+                                        driver,
+                                        actions,
+                                        mevzuat_item,
+                                        nested_item,
+                                        nested_text,
+                                        base_path,
+                                        excluded_texts,
+                                        excluded_urls,
+                                        processed_dropdowns,
+                                    )
                         except Exception as e:
                             print(f"  Error processing dropdown: {e}")
                             continue
@@ -408,6 +517,33 @@ def scrape_mevzuat_kys_links():
                     print(f"  Error with selector {selector}: {e}")
                     continue
 
+            if branch_tasks:
+                started = time.perf_counter()
+                open_menus = {}
+                try:
+                    pool = pool_future.result()
+                    print(
+                        f"\nExploring {len(branch_tasks)} nested items on {len(pool.drivers)} browsers "
+                        f"(pool started in {pool.startup_seconds:.2f}s)..."
+                    )
+                    results = pool.map(lambda pooled, task: explore_branch(pooled, task, open_menus), branch_tasks)
+                except Exception as e:
+                    # No pool: explore on the main browser, whose dropdown is already open
+                    print(f"\nBrowser pool unavailable ({e}); exploring nested items serially...")
+                    open_menus[id(driver)] = mevzuat_item
+                    results = []
+                    for task in branch_tasks:
+                        try:
+                            results.append(explore_branch(driver, task, open_menus))
+                        except Exception as exc:
+                            results.append(exc)
+                for task, result in zip(branch_tasks, results):
+                    if isinstance(result, Exception):
+                        print(f"    Error exploring nested item {task['nested_text']}: {result}")
+                        continue
+                    all_links |= result
+                print(f"  Nested items explored in {time.perf_counter() - started:.2f}s")
+
             # Always try to find links in the dropdown structure
             print("  Extracting all links from visible dropdown structure...")
 
@@ -688,8 +824,7 @@ def scrape_mevzuat_kys_links():
                             )
 
                             # Hover over nested item
-                            actions.move_to_element(nested_item).perform()
-                            time.sleep(2)  # Wait for submenu to appear
+                            hover(actions, driver, nested_item, fixed_sleep=2)  # Wait for submenu to settle
 
                             # Find all newly visible links after hovering
                             new_links = driver.find_elements(
@@ -739,13 +874,11 @@ def scrape_mevzuat_kys_links():
                                     continue
 
                             # Move back to parent
-                            actions.move_to_element(mevzuat_item).perform()
-                            time.sleep(0.8)
+                            hover(actions, driver, mevzuat_item, timeout=1.0, fixed_sleep=0.8)
                         except Exception as e:
                             print(f"    Error hovering over nested item: {e}")
                             try:
-                                actions.move_to_element(mevzuat_item).perform()
-                                time.sleep(0.5)
+                                hover(actions, driver, mevzuat_item, timeout=1.0, fixed_sleep=0.5)
                             except Exception:
                                 pass
                             continue
@@ -806,6 +939,12 @@ def scrape_mevzuat_kys_links():
 
     finally:
         driver.quit()
+        if pool_future is not None:
+            try:
+                pool_future.result().close()
+            except Exception as e:
+                print(f"Browser pool failed: {e}")
+        pool_executor.shutdown()
 
     return links_found
 
@@ -837,20 +976,20 @@ if __name__ == "__main__":
     print(f"Starting scraper for MEB TTKB '{TARGET_TEXT}' dropdown links...")
     print("=" * 60)
 
+    started = time.perf_counter()
     links = scrape_mevzuat_kys_links()
+    elapsed = time.perf_counter() - started
 
     print("\n" + "=" * 60)
     print(f"Total links found: {len(links)}")
+    print(f"Crawl took {elapsed:.2f}s; {WAIT_STATS.summary()}")
 
-    # Save to JSON file
+    # Save to JSON file; S3 gets the diff and the new manifest only when something changed
     output_file = "mevzuat_kys_links.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(links, f, ensure_ascii=False, indent=2)
+    publish_incremental(links, output_file, S3_BUCKET_NAME, S3_OUTPUT_KEY, upload_links_to_s3, FORCE_PUBLISH)
 
     print(f"\nLinks saved to {output_file}")
 
-    upload_links_to_s3(links, S3_BUCKET_NAME, S3_OUTPUT_KEY)
-
     # Also print JSON output
     # print("\nJSON Output:")
     # print(json.dumps(links, ensure_ascii=False, indent=2))
\ No newline at end of file
@@ -0,0 +1,285 @@
+import argparse
+import hashlib
+import json
+import logging
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import boto3
+import numpy as np
+from botocore.config import Config
+
+from kb_metadata import SIDECAR_SUFFIX, metadata_attributes, sidecar_key, write_sidecar
+from prepare_for_gold import read_object_bytes, with_retries, write_object_bytes
+from s3_objects import delete_objects, list_entries
+# Turkish folding and MinHash/LSH are shared with the evaluation harness's question clustering.
+from ttkb_common.near_duplicates import minhash_signature, near_duplicate_roots, normalize_question, word_shingles
+
+DEFAULT_OUTPUT_PREFIX = "gold-dedup/"
+DEFAULT_REPORT_KEY = "manifests/gold_dedup_report.json"
+DOCUMENT_THRESHOLD = 0.9
+CHUNK_THRESHOLD = 0.85
+DOCUMENT_SHINGLE_WORDS = 5
+CHUNK_SHINGLE_WORDS = 3
+PROVENANCE_FIELDS = ("source_key", "source_url", "title", "path_list", "path_string")
+
+
+def content_hash(normalized: str) -> str:
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _provenance(record: dict) -> dict:
+    return {field: record[field] for field in PROVENANCE_FIELDS if record.get(field)}
+
+
+def _merge_sources(target: list[dict], sources: list[dict]) -> None:
+    for source in sources:
+        if source not in target:
+            target.append(source)
+
+
+def _group_and_pick(items: list, hashes: list[str], signatures: list[np.ndarray], threshold: float):
+    """Return (canonical index per item, kind) where kind is None, "exact" or "near"."""
+    first_by_hash: dict[str, int] = {}
+    exact_of = []
+    for idx, digest in enumerate(hashes):
+        exact_of.append(first_by_hash.setdefault(digest, idx))
+    unique = sorted(set(exact_of))
+    roots = near_duplicate_roots([signatures[idx] for idx in unique], threshold)
+    canonical_of_unique = {idx: unique[root] for idx, root in zip(unique, roots)}
+
+    result = []
+    for idx in range(len(items)):
+        canonical = canonical_of_unique[exact_of[idx]]
+        if canonical == idx:
+            result.append((idx, None))
+        elif exact_of[idx] != idx and exact_of[idx] == canonical:
+            result.append((canonical, "exact"))
+        else:
+            result.append((canonical, "near"))
+    return result
+
+
+def deduplicate(
+    documents: dict[str, list[dict]],
+    document_threshold: float = DOCUMENT_THRESHOLD,
+    chunk_threshold: float = CHUNK_THRESHOLD,
+) -> tuple[dict[str, list[dict]], dict]:
+    """
+    Drop duplicate documents and chunks from {gold_key: chunk records}.
+
+    Documents are compared first (content hash, then MinHash over word
+    shingles). The longest document of each group is kept, ties going to the
+    first key. Chunks of the surviving documents are then compared the same
+    way and only the first occurrence is kept. Every kept chunk gets a
+    "sources" list with the provenance (source key, URL, title, menu path) of
+    all the copies it replaced.
+
+    Returns:
+        (deduplicated documents, report)
+    """
+    # Longest first so the canonical copy of a group is the most complete one.
+    keys = sorted(documents, key=lambda key: (-sum(len(chunk["text"]) for chunk in documents[key]), key))
+    document_texts = [normalize_question("\n".join(chunk["text"] for chunk in documents[key])) for key in keys]
+    document_picks = _group_and_pick(
+        keys,
+        [content_hash(text) for text in document_texts],
+        [minhash_signature(word_shingles(text, DOCUMENT_SHINGLE_WORDS)) for text in document_texts],
+        document_threshold,
+    )
+
+    document_sources: dict[str, list[dict]] = {key: [] for key in keys}
+    groups: dict[str, list[str]] = defaultdict(list)
+    report = {"exact_duplicate_documents": 0, "near_duplicate_documents": 0}
+    for key, (canonical, kind) in zip(keys, document_picks):
+        sources = [_provenance(chunk) for chunk in documents[key][:1]]
+        _merge_sources(document_sources[keys[canonical]], sources)
+        if kind:
+            report[f"{kind}_duplicate_documents"] += 1
+            groups[keys[canonical]].append(key)
+    kept_keys = sorted(key for key, (canonical, _) in zip(keys, document_picks) if keys[canonical] == key)
+
+    chunks = []
+    for key in kept_keys:
+        for chunk in documents[key]:
+            chunks.append({**chunk, "sources": list(document_sources[key])})
+    chunk_texts = [normalize_question(chunk["text"]) for chunk in chunks]
+    chunk_picks = _group_and_pick(
+        chunks,
+        [content_hash(text) for text in chunk_texts],
+        [minhash_signature(word_shingles(text, CHUNK_SHINGLE_WORDS)) for text in chunk_texts],
+        chunk_threshold,
+    )
+
+    report.update({"exact_duplicate_chunks": 0, "near_duplicate_chunks": 0})
+    for chunk, (canonical, kind) in zip(chunks, chunk_picks):
+        if kind:
+            report[f"{kind}_duplicate_chunks"] += 1
+            _merge_sources(chunks[canonical]["sources"], chunk["sources"])
+
+    deduplicated: dict[str, list[dict]] = defaultdict(list)
+    for idx, (chunk, (canonical, _)) in enumerate(zip(chunks, chunk_picks)):
+        if canonical == idx:
+            deduplicated[chunk["gold_key"]].append(chunk)
+
+    report["duplicate_groups"] = [{"canonical": key, "duplicates": sorted(dups)} for key, dups in sorted(groups.items())]
+    return dict(deduplicated), report
+
+
+def _size_stats(documents: dict[str, list[dict]]) -> dict:
+    return {
+        "documents": len(documents),
+        "chunks": sum(len(chunks) for chunks in documents.values()),
+        "characters": sum(len(chunk["text"]) for chunks in documents.values() for chunk in chunks),
+    }
+
+
+def _encode(chunks: list[dict]) -> bytes:
+    return "".join(json.dumps(chunk, ensure_ascii=False) + "\n" for chunk in chunks).encode("utf-8")
+
+
+def dedup_bucket(
+    bucket: str,
+    gold_prefix: str,
+    output_prefix: str = DEFAULT_OUTPUT_PREFIX,
+    report_key: Optional[str] = DEFAULT_REPORT_KEY,
+    workers: int = 16,
+    max_attempts: int = 3,
+    endpoint_url: Optional[str] = None,
+    document_threshold: float = DOCUMENT_THRESHOLD,
+    chunk_threshold: float = CHUNK_THRESHOLD,
+) -> dict:
+    """
+    Deduplicate every gold JSONL object under `gold_prefix` into `output_prefix`.
+
+    Output objects keep their gold-relative key and get a knowledge-base
+    metadata sidecar covering all of their sources; objects left over from
+    earlier runs whose document is now a duplicate are deleted. The report (also
+    written to `report_key`) gives counts and sizes before and after.
+    """
+    s3_client = boto3.client("s3", endpoint_url=endpoint_url, config=Config(max_pool_connections=max(10, workers)))
+    started = time.perf_counter()
+
+    gold_keys = [
+        item["Key"] for item in list_entries(s3_client, bucket, gold_prefix) if item["Key"].endswith(".jsonl")
+    ]
+
+    def load(gold_key: str) -> tuple[str, list[dict]]:
+        payload = with_retries(read_object_bytes, s3_client, bucket, gold_key, max_attempts=max_attempts)
+        lines = payload.decode("utf-8").splitlines()
+        return gold_key, [{**json.loads(line), "gold_key": gold_key} for line in lines if line.strip()]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        documents = {key: chunks for key, chunks in executor.map(load, gold_keys) if chunks}
+    bytes_before = sum(len(_encode(chunks)) for chunks in documents.values())
+
+    deduplicated, report = deduplicate(documents, document_threshold, chunk_threshold)
+
+    outputs: dict[str, bytes] = {}
+    sidecars: dict[str, dict] = {}
+    for gold_key, chunks in deduplicated.items():
+        output_key = output_prefix + gold_key[len(gold_prefix) :]
+        outputs[output_key] = _encode([{k: v for k, v in chunk.items() if k != "gold_key"} for chunk in chunks])
+        # A kept document also stands in for every copy it replaced, so it
+        # must match the category filters of all of them.
+        sources: list[dict] = []
+        for chunk in chunks:
+            _merge_sources(sources, chunk["sources"])
+        sidecars[output_key] = metadata_attributes(sources)
+
+    def store(output_key: str) -> None:
+        with_retries(
+            write_object_bytes,
+            s3_client,
+            bucket,
+            output_key,
+            outputs[output_key],
+            "application/x-ndjson; charset=utf-8",
+            max_attempts=max_attempts,
+        )
+        if sidecars[output_key]:
+            with_retries(write_sidecar, s3_client, bucket, output_key, sidecars[output_key], max_attempts=max_attempts)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(store, outputs))
+    kept_sidecars = {sidecar_key(key) for key, attributes in sidecars.items() if attributes}
+    stale = [
+        item["Key"]
+        for item in list_entries(s3_client, bucket, output_prefix)
+        if (item["Key"].endswith(".jsonl") and item["Key"] not in outputs)
+        or (item["Key"].endswith(SIDECAR_SUFFIX) and item["Key"] not in kept_sidecars)
+    ]
+    if stale:
+        delete_objects(s3_client, bucket, stale)
+
+    before, after = _size_stats(documents), _size_stats(deduplicated)
+    bytes_after = sum(len(payload) for payload in outputs.values())
+    summary = {
+        "before": {**before, "bytes": bytes_before},
+        "after": {**after, "bytes": bytes_after},
+        "removed_ratio": {
+            "chunks": round(1 - after["chunks"] / before["chunks"], 4) if before["chunks"] else 0.0,
+            "characters": round(1 - after["characters"] / before["characters"], 4) if before["characters"] else 0.0,
+        },
+        **{key: value for key, value in report.items() if key != "duplicate_groups"},
+        "deleted_outputs": len(stale),
+        "seconds": round(time.perf_counter() - started, 3),
+        "duplicate_groups": report["duplicate_groups"],
+    }
+    if report_key:
+        s3_client.put_object(
+            Bucket=bucket,
+            Key=report_key,
+            Body=json.dumps(summary, ensure_ascii=False, indent=2).encode("utf-8"),
+            ContentType="application/json; charset=utf-8",
+        )
+    logging.info(
+        "Kept %d/%d documents and %d/%d chunks (%.1f%% of characters removed)",
+        after["documents"],
+        before["documents"],
+        after["chunks"],
+        before["chunks"],
+        100 * summary["removed_ratio"]["characters"],
+    )
+    return summary
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Remove duplicate documents and chunks from the gold corpus.")
+    parser.add_argument("--bucket", default="goaltech-poc-ai-assistant", help="S3 bucket name.")
+    parser.add_argument("--gold-prefix", default="gold/", help="Gold prefix written by prepare_for_gold.py.")
+    parser.add_argument("--output-prefix", default=DEFAULT_OUTPUT_PREFIX, help="Where deduplicated objects go.")
+    parser.add_argument(
+        "--report-key", default=DEFAULT_REPORT_KEY, help="Key for the JSON report; pass an empty string to skip it."
+    )
+    parser.add_argument("--workers", type=int, default=16, help="Parallel S3 reads and writes.")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Attempts per S3 call.")
+    parser.add_argument("--endpoint-url", default=None, help="S3 endpoint override, e.g. a local MinIO.")
+    parser.add_argument(
+        "--document-threshold", type=float, default=DOCUMENT_THRESHOLD, help="Similarity for duplicate documents."
+    )
+    parser.add_argument("--chunk-threshold", type=float, default=CHUNK_THRESHOLD, help="Similarity for duplicate chunks.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    args = parse_args()
+    summary = dedup_bucket(
+        args.bucket,
+        args.gold_prefix,
+        output_prefix=args.output_prefix,
+        report_key=args.report_key or None,
+        workers=args.workers,
+        max_attempts=args.max_attempts,
+        endpoint_url=args.endpoint_url,
+        document_threshold=args.document_threshold,
+        chunk_threshold=args.chunk_threshold,
+    )
+    print(json.dumps({key: value for key, value in summary.items() if key != "duplicate_groups"}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
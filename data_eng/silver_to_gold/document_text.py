@@ -0,0 +1,165 @@
+import io
+import json
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+import unicodedata
+from typing import Optional, Tuple, Union
+
+from legislation_chunker import DEFAULT_MAX_CHARS, DEFAULT_MIN_CHARS, chunk_document
+
+# Small documents arrive as bytes; large ones are spooled to disk and passed by path.
+Source = Union[bytes, str]
+
+_SPACES_RE = re.compile(r"[ \t\u00a0]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def _open_source(source: Source):
+    return io.BytesIO(source) if isinstance(source, bytes) else open(source, "rb")
+
+
+def detect_format(silver_key: str, source: Source) -> str:
+    """Return PDF, DOCX, DOC or HTML from the file signature, falling back to the key's extension."""
+    with _open_source(source) as f:
+        raw_bytes = f.read(8)
+    if raw_bytes.startswith(b"%PDF"):
+        return "PDF"
+    if raw_bytes.startswith(b"PK\x03\x04"):
+        return "DOCX"
+    if raw_bytes.startswith(b"\xd0\xcf\x11\xe0"):
+        return "DOC"
+    lowered = silver_key.lower()
+    if lowered.endswith(".pdf"):
+        return "PDF"
+    if lowered.endswith(".docx"):
+        return "DOCX"
+    if lowered.endswith(".doc"):
+        return "DOC"
+    return "HTML"
+
+
+def clean_text(text: str) -> str:
+    # NFC keeps Turkish letters precomposed (ş, ğ, İ) even when extractors emit combining marks.
+    text = unicodedata.normalize("NFC", text).replace("\u00ad", "").replace("\r\n", "\n").replace("\r", "\n")
+    lines = [_SPACES_RE.sub(" ", line).strip() for line in text.split("\n")]
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()
+
+
+def extract_pdf_pages(source: Source) -> list[str]:
+    try:
+        from pypdf import PdfReader
+    except ModuleNotFoundError as exc:
+        raise RuntimeError("pypdf is required to parse PDF documents.") from exc
+
+    with _open_source(source) as f:
+        reader = PdfReader(f)
+        return [page.extract_text() or "" for page in reader.pages]
+
+
+def extract_docx_text(source: Source) -> str:
+    try:
+        import docx
+    except ModuleNotFoundError as exc:
+        raise RuntimeError("python-docx is required to parse DOCX documents.") from exc
+
+    with _open_source(source) as f:
+        document = docx.Document(f)
+    parts = [paragraph.text for paragraph in document.paragraphs]
+    for table in document.tables:
+        for row in table.rows:
+            parts.append(" | ".join(cell.text.strip() for cell in row.cells))
+    return "\n".join(parts)
+
+
+class ExtractorUnavailable(RuntimeError):
+    """The document's format needs an external tool this host does not have."""
+
+
+def _doc_to_text_command() -> list[str]:
+    # Legacy binary Word files have no maintained pure-Python parser; antiword
+    # handles them well and catdoc is the usual fallback on hosts without it.
+    antiword = shutil.which("antiword")
+    if antiword:
+        return [antiword, "-m", "UTF-8.txt", "-w", "0"]
+    catdoc = shutil.which("catdoc")
+    if catdoc:
+        return [catdoc, "-d", "utf-8", "-w"]
+    raise ExtractorUnavailable("antiword (or catdoc) is required to parse legacy DOC documents.")
+
+
+def extract_doc_text(source: Source) -> str:
+    command = _doc_to_text_command()
+
+    def run(path: str) -> bytes:
+        completed = subprocess.run(
+            command + [path],
+            capture_output=True,
+            check=True,
+            timeout=120,
+        )
+        return completed.stdout
+
+    if isinstance(source, str):
+        return run(source).decode("utf-8", errors="replace")
+    with tempfile.NamedTemporaryFile(suffix=".doc") as spooled:
+        spooled.write(source)
+        spooled.flush()
+        return run(spooled.name).decode("utf-8", errors="replace")
+
+
+def extract_html_text(source: Source) -> str:
+    from bs4 import BeautifulSoup
+
+    with _open_source(source) as f:
+        soup = BeautifulSoup(f.read(), "html.parser")
+    for tag in soup(["script", "style", "noscript", "header", "footer", "nav"]):
+        tag.decompose()
+    # Same content containers the link scraper looks at on ttkb.meb.gov.tr.
+    content = soup.find("div", id="icerik") or soup.find("div", class_="icerik") or soup.body or soup
+    return content.get_text("\n")
+
+
+def document_to_records(silver_key: str, source: Source) -> Tuple[str, list[dict]]:
+    """Extract clean text records (one per PDF page, one per other document)."""
+    data_format = detect_format(silver_key, source)
+    if data_format == "PDF":
+        pages = extract_pdf_pages(source)
+    elif data_format == "DOCX":
+        pages = [extract_docx_text(source)]
+    elif data_format == "DOC":
+        pages = [extract_doc_text(source)]
+    else:
+        pages = [extract_html_text(source)]
+
+    records = []
+    for page_number, page_text in enumerate(pages, start=1):
+        text = clean_text(page_text)
+        if text:
+            records.append({"source_key": silver_key, "format": data_format, "page": page_number, "text": text})
+    return data_format, records
+
+
+def transform_document(
+    silver_key: str,
+    source: Source,
+    metadata: Optional[dict] = None,
+    max_chars: int = DEFAULT_MAX_CHARS,
+    min_chars: int = DEFAULT_MIN_CHARS,
+) -> Tuple[bytes, str, str, float]:
+    """
+    Convert a silver document (bytes or a spooled file path) into gold JSONL chunks.
+
+    Page texts are split along the document's legislative structure (see
+    legislation_chunker) and each chunk carries `metadata` from the scrape
+    manifest. Runs inside a worker process. Returns (payload, content_type,
+    format, parse_seconds) so the parent can report parse time per format.
+    """
+    started = time.perf_counter()
+    data_format, records = document_to_records(silver_key, source)
+    pages = [(record["page"], record["text"]) for record in records]
+    chunks = chunk_document(silver_key, data_format, pages, metadata, max_chars, min_chars)
+    payload = "".join(json.dumps(chunk, ensure_ascii=False) + "\n" for chunk in chunks).encode("utf-8")
+    return payload, "application/x-ndjson; charset=utf-8", data_format, time.perf_counter() - started
@@ -0,0 +1,157 @@
+import argparse
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import boto3
+from botocore.config import Config
+
+from legislation_chunker import build_manifest_index, metadata_for_key
+from s3_objects import delete_objects, list_entries
+from ttkb_common.categories import category_for
+
+# Bedrock knowledge bases read "<document>.metadata.json" next to each document.
+SIDECAR_SUFFIX = ".metadata.json"
+# Written by data_eng/extract_links/scraper_ec2.py.
+DEFAULT_SCRAPE_MANIFEST_KEY = "extract-links/ttkb_mevzuat_full_data.json"
+
+
+def load_scrape_index(s3_client, bucket: str, scrape_manifest_key: str) -> dict:
+    """Index of the link scraper's output; documents get no path metadata if it is missing."""
+    try:
+        response = s3_client.get_object(Bucket=bucket, Key=scrape_manifest_key)
+    except s3_client.exceptions.NoSuchKey:
+        logging.warning("Scrape manifest %s not found; documents will carry no path metadata", scrape_manifest_key)
+        return {}
+    return build_manifest_index(json.loads(response["Body"].read()))
+
+
+def sidecar_key(document_key: str) -> str:
+    return f"{document_key}{SIDECAR_SUFFIX}"
+
+
+def metadata_attributes(sources: list[dict]) -> dict:
+    """
+    Knowledge-base attributes for a document scraped from one or more menu paths.
+
+    `categories` lists every category the document was linked from, so a
+    filter on any of them finds it; the first source supplies the rest.
+    """
+    sources = [source for source in sources if source]
+    if not sources:
+        return {}
+    primary = sources[0]
+    categories: list[str] = []
+    for source in sources:
+        category = category_for(source.get("path_list") or [])
+        if category not in categories:
+            categories.append(category)
+    attributes = {
+        "category": categories[0],
+        "categories": categories,
+        "data_type": primary.get("data_type", ""),
+        "source_url": primary.get("source_url", ""),
+        "title": primary.get("title", ""),
+        "path_string": primary.get("path_string", ""),
+    }
+    return {key: value for key, value in attributes.items() if value}
+
+
+def sidecar_payload(attributes: dict) -> bytes:
+    return json.dumps({"metadataAttributes": attributes}, ensure_ascii=False).encode("utf-8")
+
+
+def write_sidecar(s3_client, bucket: str, document_key: str, attributes: dict) -> None:
+    s3_client.put_object(
+        Bucket=bucket,
+        Key=sidecar_key(document_key),
+        Body=sidecar_payload(attributes),
+        ContentType="application/json; charset=utf-8",
+    )
+
+
+def generate_sidecars(
+    bucket: str,
+    prefix: str,
+    scrape_manifest_key: str = DEFAULT_SCRAPE_MANIFEST_KEY,
+    workers: int = 16,
+    max_attempts: int = 3,
+    endpoint_url: Optional[str] = None,
+) -> dict:
+    """
+    Write a sidecar for every JSONL document under `prefix` from the scrape manifest.
+
+    Gold keys mirror silver keys, so each document is matched to its manifest
+    entry by file name without reading the document. Sidecars whose document
+    is gone are deleted.
+    """
+    s3_client = boto3.client(
+        "s3",
+        endpoint_url=endpoint_url,
+        config=Config(max_pool_connections=max(10, workers), retries={"max_attempts": max_attempts, "mode": "standard"}),
+    )
+    scrape_index = load_scrape_index(s3_client, bucket, scrape_manifest_key)
+
+    document_keys: list[str] = []
+    existing_sidecars: set[str] = set()
+    for item in list_entries(s3_client, bucket, prefix):
+        if item["Key"].endswith(SIDECAR_SUFFIX):
+            existing_sidecars.add(item["Key"])
+        elif item["Key"].endswith(".jsonl"):
+            document_keys.append(item["Key"])
+
+    attributes_by_key = {}
+    for document_key in document_keys:
+        silver_name = os.path.basename(document_key)[: -len(".jsonl")]
+        attributes = metadata_attributes([metadata_for_key(silver_name, scrape_index)])
+        if attributes:
+            attributes_by_key[document_key] = attributes
+
+    def store(document_key: str) -> None:
+        write_sidecar(s3_client, bucket, document_key, attributes_by_key[document_key])
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(store, attributes_by_key))
+
+    stale = sorted(existing_sidecars - {sidecar_key(key) for key in attributes_by_key})
+    if stale:
+        delete_objects(s3_client, bucket, stale)
+    summary = {
+        "documents": len(document_keys),
+        "sidecars_written": len(attributes_by_key),
+        "without_manifest_entry": len(document_keys) - len(attributes_by_key),
+        "sidecars_deleted": len(stale),
+    }
+    logging.info("Wrote %d sidecars for %d documents", len(attributes_by_key), len(document_keys))
+    return summary
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Write Bedrock knowledge-base metadata sidecars for gold documents.")
+    parser.add_argument("--bucket", default="goaltech-poc-ai-assistant", help="S3 bucket name.")
+    parser.add_argument("--prefix", default="gold/", help="Prefix holding the knowledge-base documents.")
+    parser.add_argument("--scrape-manifest-key", default=DEFAULT_SCRAPE_MANIFEST_KEY, help="Link scraper output.")
+    parser.add_argument("--workers", type=int, default=16, help="Parallel S3 writes.")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Attempts per S3 call.")
+    parser.add_argument("--endpoint-url", default=None, help="S3 endpoint override, e.g. a local MinIO.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    args = parse_args()
+    summary = generate_sidecars(
+        args.bucket,
+        args.prefix,
+        scrape_manifest_key=args.scrape_manifest_key,
+        workers=args.workers,
+        max_attempts=args.max_attempts,
+        endpoint_url=args.endpoint_url,
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import os
+import re
+from typing import Optional
+from urllib.parse import urlparse
+
+from ttkb_common.naming import silver_name_for_url
+
+DEFAULT_MAX_CHARS = 1500
+DEFAULT_MIN_CHARS = 300
+
+_UPPER = "A-ZÇĞİÖŞÜ"
+# Headings used by TTKB KYS procedures and by regulations ("Amaç", "Kapsam", ...).
+SECTION_HEADINGS = (
+    "İlgili Dokümanlar ve Formlar",
+    "Gözden Geçirme",
+    "Amaç",
+    "Kapsam",
+    "Dayanak",
+    "Tanımlar",
+    "Sorumluluklar",
+    "Sorumluluk",
+    "Uygulama",
+    "Yürürlük",
+    "Yürütme",
+)
+_SECTION_ALTERNATION = "|".join(re.escape(heading) for heading in SECTION_HEADINGS)
+
+_ARTICLE_RE = re.compile(rf"^((?:GEÇİCİ|Geçici|EK|Ek)\s+)?(MADDE|Madde)\s+\d+\b")
+_CHAPTER_RE = re.compile(rf"^[{_UPPER}İ]+\s+(BÖLÜM|KISIM)\b")
+# A heading stands alone on its line, or is followed directly by its first step/sentence.
+_SECTION_RE = re.compile(rf"^(?:{_SECTION_ALTERNATION})(?=\s*$|\s+[{_UPPER}0-9])")
+_FIKRA_RE = re.compile(r"^\(\d+\)\s")
+_BENT_RE = re.compile(r"^[a-zçğıöşü]\)\s")
+_STEP_RE = re.compile(rf"^\d{{1,2}}\.\s+[{_UPPER}0-9]")
+
+# Extractors often flatten a procedure onto one line; restore breaks before
+# articles, headings, paragraphs and numbered steps that follow a sentence end.
+_INLINE_BREAK_RE = re.compile(
+    rf"(?<=[.:;])\s+(?=(?:(?:GEÇİCİ\s+)?MADDE\s+\d+|{_SECTION_ALTERNATION}\b|\(\d+\)\s|\d{{1,2}}\.\s+[{_UPPER}0-9]))"
+)
+_SENTENCE_END_RE = re.compile(rf"(?<=[.!?;:])\s+(?=[{_UPPER}0-9(])")
+
+# Units of these kinds open a new chunk once the current one is big enough.
+_BOUNDARY_KINDS = {"chapter", "article", "section"}
+
+
+def build_manifest_index(entries: list[dict]) -> dict[str, dict]:
+    """Index scrape manifest entries by silver file name and by URL file name."""
+    index: dict[str, dict] = {}
+    basename_counts: dict[str, int] = {}
+    for entry in entries:
+        basename = os.path.basename(urlparse(entry["url"]).path)
+        basename_counts[basename] = basename_counts.get(basename, 0) + 1
+
+    for entry in entries:
+        index.setdefault(silver_name_for_url(entry["url"], entry.get("data_type", "")), entry)
+        basename = os.path.basename(urlparse(entry["url"]).path)
+        # Only unambiguous names: the same file may hang under several menu paths.
+        if basename and basename_counts[basename] == 1:
+            index.setdefault(basename, entry)
+    return index
+
+
+def metadata_for_key(silver_key: str, manifest_index: dict[str, dict]) -> dict:
+    entry = manifest_index.get(os.path.basename(silver_key))
+    if not entry:
+        return {}
+    path_list = entry.get("path_list") or entry.get("path") or []
+    return {
+        "title": entry.get("text", ""),
+        "source_url": entry.get("url", ""),
+        "data_type": entry.get("data_type", ""),
+        "path_list": list(path_list),
+        "path_string": entry.get("path_string") or " > ".join(path_list),
+    }
+
+
+def _classify(line: str) -> str:
+    if _ARTICLE_RE.match(line):
+        return "article"
+    if _CHAPTER_RE.match(line):
+        return "chapter"
+    if _SECTION_RE.match(line):
+        return "section"
+    if _FIKRA_RE.match(line):
+        return "fikra"
+    if _BENT_RE.match(line):
+        return "bent"
+    if _STEP_RE.match(line):
+        return "step"
+    return "text"
+
+
+def split_units(pages: list[tuple[int, str]]) -> list[dict]:
+    """
+    Split page texts into structural units (chapter, article, section, fıkra,
+    bent, numbered step). Wrapped lines are joined back onto their unit, so a
+    sentence is never cut at a PDF line break.
+    """
+    units: list[dict] = []
+    chapter = article = section = ""
+
+    for page, text in pages:
+        for raw_line in _INLINE_BREAK_RE.sub("\n", text).split("\n"):
+            line = raw_line.strip()
+            if not line:
+                continue
+            kind = _classify(line)
+            if kind == "text" and units:
+                units[-1]["text"] += " " + line
+                continue
+
+            # Regulations title an article with the heading above it, so a
+            # heading resets the article and an article keeps the heading.
+            if kind == "chapter":
+                chapter, section, article = line, "", ""
+            elif kind == "section":
+                section, article = _SECTION_RE.match(line).group(0), ""
+            elif kind == "article":
+                article = _ARTICLE_RE.match(line).group(0)
+            heading = " > ".join(part for part in (chapter, section, article) if part)
+            units.append({"kind": kind, "heading": heading, "page": page, "text": line})
+    return units
+
+
+def _split_long_text(text: str, max_chars: int) -> list[str]:
+    pieces: list[str] = []
+    current = ""
+    for sentence in _SENTENCE_END_RE.split(text):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_units(
+    units: list[dict],
+    max_chars: int = DEFAULT_MAX_CHARS,
+    min_chars: int = DEFAULT_MIN_CHARS,
+) -> list[dict]:
+    """
+    Pack units into non-overlapping chunks of at most max_chars.
+
+    A new article, chapter or section starts a new chunk unless the current
+    one is still shorter than min_chars. Units longer than max_chars are split
+    at sentence ends. Repeated chunk texts are emitted once.
+    """
+    chunks: list[dict] = []
+    current: Optional[dict] = None
+    seen: set[str] = set()
+
+    def flush() -> None:
+        nonlocal current
+        if current:
+            fingerprint = " ".join(current["text"].lower().split())
+            if fingerprint not in seen:
+                seen.add(fingerprint)
+                chunks.append(current)
+        current = None
+
+    for unit in units:
+        for piece_index, piece in enumerate(_split_long_text(unit["text"], max_chars)):
+            # Only the first piece of a split unit is a boundary.
+            starts_boundary = piece_index == 0 and unit["kind"] in _BOUNDARY_KINDS
+            if current and (
+                len(current["text"]) + 1 + len(piece) > max_chars
+                or (starts_boundary and len(current["text"]) >= min_chars)
+            ):
+                flush()
+            if current is None:
+                current = {"heading": unit["heading"], "page": unit["page"], "text": piece}
+            else:
+                current["text"] += "\n" + piece
+    flush()
+    return chunks
+
+
+def chunk_document(
+    silver_key: str,
+    data_format: str,
+    pages: list[tuple[int, str]],
+    metadata: Optional[dict] = None,
+    max_chars: int = DEFAULT_MAX_CHARS,
+    min_chars: int = DEFAULT_MIN_CHARS,
+) -> list[dict]:
+    """Return gold chunk records for one document, each carrying the scrape metadata."""
+    records = []
+    for chunk_index, chunk in enumerate(chunk_units(split_units(pages), max_chars, min_chars)):
+        records.append(
+            {
+                "source_key": silver_key,
+                "format": data_format,
+                "chunk_index": chunk_index,
+                "page": chunk["page"],
+                "heading": chunk["heading"],
+                "text": chunk["text"],
+                **(metadata or {}),
+            }
+        )
+    return records
@@ -1,17 +1,96 @@
 import argparse
+import hashlib
 import io
 import json
 import logging
-from typing import Iterable, Tuple
+import os
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Optional, Tuple, Union
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+
+from document_text import ExtractorUnavailable, transform_document
+from kb_metadata import DEFAULT_SCRAPE_MANIFEST_KEY, load_scrape_index, metadata_attributes, sidecar_key, write_sidecar
+from legislation_chunker import DEFAULT_MAX_CHARS, DEFAULT_MIN_CHARS, metadata_for_key
+from s3_objects import delete_objects, list_entries
+
+# Bump whenever transform_payload output changes; every object is rebuilt on the next run.
+TRANSFORM_VERSION = "3"
+DEFAULT_MANIFEST_KEY = "manifests/silver_to_gold.json"
+DEFAULT_PART_SIZE_MB = 8
+DEFAULT_PART_CONCURRENCY = 4
+_STAGE_DONE = object()
 
 
 def list_silver_objects(s3_client, bucket: str, silver_prefix: str) -> Iterable[str]:
-    paginator = s3_client.get_paginator("list_objects_v2")
-    for page in paginator.paginate(Bucket=bucket, Prefix=silver_prefix):
-        for item in page.get("Contents", []):
-            yield item["Key"]
+    for item in list_entries(s3_client, bucket, silver_prefix):
+        yield item["Key"]
+
+
+def load_manifest(s3_client, bucket: str, manifest_key: str) -> dict:
+    """Return {silver_key: {etag, size, last_modified, transform_version, gold_key, metadata_sha256}}."""
+    try:
+        response = s3_client.get_object(Bucket=bucket, Key=manifest_key)
+    except s3_client.exceptions.NoSuchKey:
+        return {}
+    return json.loads(response["Body"].read()).get("objects", {})
+
+
+def save_manifest(s3_client, bucket: str, manifest_key: str, entries: dict) -> None:
+    payload = json.dumps({"transform_version": TRANSFORM_VERSION, "objects": entries}, ensure_ascii=False, indent=2)
+    s3_client.put_object(
+        Bucket=bucket,
+        Key=manifest_key,
+        Body=payload.encode("utf-8"),
+        ContentType="application/json; charset=utf-8",
+    )
+
+
+def metadata_digest(metadata: dict) -> str:
+    """
+    Hash of the scrape metadata a gold object is built from: the chunk
+    breadcrumbs and the sidecar attributes (categories included). A document
+    that moves in the menu changes it without changing its silver bytes.
+    """
+    payload = json.dumps([metadata, metadata_attributes([metadata])], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def manifest_entry_for(item: dict, gold_key: str, metadata_sha256: str) -> dict:
+    return {
+        "etag": item["ETag"],
+        "size": item["Size"],
+        "last_modified": item["LastModified"].isoformat(),
+        "transform_version": TRANSFORM_VERSION,
+        "gold_key": gold_key,
+        "metadata_sha256": metadata_sha256,
+    }
+
+
+def is_unchanged(item: dict, entry: Optional[dict], gold_key: str, metadata_sha256: str) -> bool:
+    return (
+        entry is not None
+        and entry.get("etag") == item["ETag"]
+        and entry.get("size") == item["Size"]
+        and entry.get("transform_version") == TRANSFORM_VERSION
+        and entry.get("gold_key") == gold_key
+        and entry.get("metadata_sha256") == metadata_sha256
+    )
+
+
+def build_transfer_config(part_size_mb: int, part_concurrency: int) -> TransferConfig:
+    part_size = part_size_mb * 1024 * 1024
+    return TransferConfig(
+        multipart_threshold=part_size,
+        multipart_chunksize=part_size,
+        max_concurrency=part_concurrency,
+    )
 
 
 def read_object_bytes(s3_client, bucket: str, key: str) -> bytes:
@@ -19,42 +98,341 @@ def read_object_bytes(s3_client, bucket: str, key: str) -> bytes:
     return response["Body"].read()
 
 
-def transform_payload(raw_bytes: bytes) -> Tuple[bytes, str]:
+def download_object(
+    s3_client,
+    bucket: str,
+    key: str,
+    size: int,
+    transfer_config: TransferConfig,
+    spool_dir: Optional[str] = None,
+) -> Union[bytes, str]:
+    """
+    Fetch a silver object for parsing.
+
+    Objects up to one part are returned as bytes. Larger ones are downloaded
+    with parallel ranged GETs straight into a temporary file whose path is
+    returned, so memory per object stays around one part per concurrent range.
+    The caller removes the file.
     """
-    Placeholder transform.
+    if size <= transfer_config.multipart_threshold:
+        return read_object_bytes(s3_client, bucket, key)
+
+    suffix = os.path.splitext(key)[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix, dir=spool_dir, delete=False) as spooled:
+        try:
+            s3_client.download_fileobj(bucket, key, spooled, Config=transfer_config)
+        except Exception:
+            os.remove(spooled.name)
+            raise
+    return spooled.name
 
-    Replace this with real logic that converts silver data into gold data.
+
+def transform_payload(raw_bytes: bytes, silver_key: str = "") -> Tuple[bytes, str]:
+    """
+    Convert a silver PDF, DOC/DOCX or HTML document into gold JSONL.
+
+    Each line is one chunk: {"source_key", "format", "chunk_index", "page",
+    "heading", "text"} with clean UTF-8 text.
     Return (payload_bytes, content_type).
     """
-    # Example: passthrough as JSON Lines if already JSONL.
-    # TODO: implement real transformation.
-    return raw_bytes, "application/json"
+    payload, content_type, _, _ = transform_document(silver_key, raw_bytes)
+    return payload, content_type
 
 
 def gold_key_for(silver_key: str, silver_prefix: str, gold_prefix: str) -> str:
     suffix = silver_key[len(silver_prefix) :] if silver_key.startswith(silver_prefix) else silver_key
-    return f"{gold_prefix}{suffix}"
+    return f"{gold_prefix}{suffix}.jsonl"
 
 
-def write_object_bytes(s3_client, bucket: str, key: str, payload: bytes, content_type: str) -> None:
+def write_object_bytes(
+    s3_client,
+    bucket: str,
+    key: str,
+    payload: bytes,
+    content_type: str,
+    transfer_config: Optional[TransferConfig] = None,
+) -> None:
+    # Past the multipart threshold, upload parts in parallel instead of one large PUT.
+    if transfer_config is not None and len(payload) > transfer_config.multipart_threshold:
+        s3_client.upload_fileobj(
+            io.BytesIO(payload),
+            bucket,
+            key,
+            ExtraArgs={"ContentType": content_type},
+            Config=transfer_config,
+        )
+        return
     s3_client.put_object(Bucket=bucket, Key=key, Body=payload, ContentType=content_type)
 
 
-def process_bucket(bucket: str, silver_prefix: str, gold_prefix: str) -> None:
-    s3_client = boto3.client("s3")
+def with_retries(operation: Callable, *args, max_attempts: int = 3, base_delay: float = 0.5):
+    """Call operation(*args), retrying with exponential backoff on any exception."""
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return operation(*args)
+        except Exception as exc:
+            if attempt == max_attempts:
+                raise
+            delay = base_delay * 2 ** (attempt - 1)
+            logging.warning("Attempt %d/%d failed (%s); retrying in %.1fs", attempt, max_attempts, exc, delay)
+            time.sleep(delay)
+
+
+def _start_stage(
+    name: str,
+    handler: Callable,
+    inbox: queue.Queue,
+    outbox: Optional[queue.Queue],
+    workers: int,
+    next_workers: int,
+    failures: dict,
+    lock: threading.Lock,
+) -> list[threading.Thread]:
+    """
+    Run handler(silver_key, *payload) on `workers` threads.
+
+    Items arrive as (silver_key, ...) tuples. A handler returning a tuple sends
+    it downstream; an exception only fails that key. When the last worker sees
+    the end of its input it tells every downstream worker to stop.
+    """
+    remaining = [workers]
+
+    def run() -> None:
+        while True:
+            item = inbox.get()
+            if item is _STAGE_DONE:
+                break
+            silver_key = item[0]
+            try:
+                result = handler(*item)
+            except Exception as exc:
+                logging.error("%s failed for %s: %s", name, silver_key, exc)
+                with lock:
+                    failures[silver_key] = f"{name}: {exc}"
+                continue
+            if outbox is not None and result is not None:
+                outbox.put(result)
+
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last and outbox is not None:
+            for _ in range(next_workers):
+                outbox.put(_STAGE_DONE)
+
+    threads = [threading.Thread(target=run, name=f"{name}-{idx}", daemon=True) for idx in range(workers)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def process_bucket(
+    bucket: str,
+    silver_prefix: str,
+    gold_prefix: str,
+    download_workers: int = 8,
+    transform_workers: Optional[int] = None,
+    upload_workers: int = 8,
+    queue_size: int = 32,
+    max_attempts: int = 3,
+    endpoint_url: Optional[str] = None,
+    manifest_key: Optional[str] = DEFAULT_MANIFEST_KEY,
+    full_rebuild: bool = False,
+    parse_processes: Optional[int] = None,
+    part_size_mb: int = DEFAULT_PART_SIZE_MB,
+    part_concurrency: int = DEFAULT_PART_CONCURRENCY,
+    scrape_manifest_key: Optional[str] = DEFAULT_SCRAPE_MANIFEST_KEY,
+    chunk_max_chars: int = DEFAULT_MAX_CHARS,
+    chunk_min_chars: int = DEFAULT_MIN_CHARS,
+) -> dict:
+    """
+    Transform new or changed silver objects into gold with a pipelined executor.
+
+    The manifest at `manifest_key` records each silver key's ETag, size,
+    LastModified, transform version, gold key and scrape-metadata hash from
+    the last successful run. Objects whose entry still matches are skipped,
+    so a document whose menu path changed is rebuilt with its new
+    breadcrumbs and sidecar, and gold objects whose silver source
+    disappeared are deleted.
+    `full_rebuild` (or a bumped TRANSFORM_VERSION) reprocesses everything;
+    `manifest_key=None` disables the manifest.
+
+    Listing, downloads, transforms and uploads run as separate stages connected
+    by bounded queues, so a slow stage applies backpressure instead of letting
+    objects pile up in memory. Document parsing is CPU-bound, so transform
+    workers hand it to a pool of `parse_processes` processes (default: one per
+    core). Objects larger than `part_size_mb` are transferred as parallel
+    multipart ranges (`part_concurrency` per object) and spooled to disk
+    instead of memory. Gold objects hold structure-aware chunks of at most
+    `chunk_max_chars`, tagged with the menu path the document was scraped from
+    (`scrape_manifest_key`), and get a knowledge-base metadata sidecar from
+    the same entry. S3 calls are retried; a key that still fails is
+    recorded and the rest of the run continues. Documents whose format needs
+    a tool the host lacks (antiword for legacy .doc) are logged and listed
+    under `unparsed_keys` instead of failing.
+
+    Returns:
+        Run summary with object/byte counts, throughput and per-key failures.
+    """
+    s3_client = boto3.client(
+        "s3",
+        endpoint_url=endpoint_url,
+        config=Config(max_pool_connections=max(10, (download_workers + upload_workers) * part_concurrency)),
+    )
+    transfer_config = build_transfer_config(part_size_mb, part_concurrency)
+
+    downloads: queue.Queue = queue.Queue(maxsize=queue_size)
+    transforms: queue.Queue = queue.Queue(maxsize=queue_size)
+    uploads: queue.Queue = queue.Queue(maxsize=queue_size)
+    failures: dict[str, str] = {}
+    unparsed: dict[str, str] = {}
+    stats = {"objects": 0, "bytes_read": 0, "bytes_written": 0}
+    parse_stats: dict[str, dict] = {}
+    lock = threading.Lock()
+    parse_processes = parse_processes or os.cpu_count() or 1
+    transform_workers = transform_workers or parse_processes
+    parse_pool = ProcessPoolExecutor(max_workers=parse_processes)
+
+    manifest = load_manifest(s3_client, bucket, manifest_key) if manifest_key else {}
+    scrape_index = load_scrape_index(s3_client, bucket, scrape_manifest_key) if scrape_manifest_key else {}
+    listed_items: dict[str, dict] = {}
+    stale_gold_keys: list[str] = []
 
-    for silver_key in list_silver_objects(s3_client, bucket, silver_prefix):
-        if silver_key.endswith("/"):
-            continue
-        logging.info("Processing %s", silver_key)
+    def download(silver_key: str):
+        size = listed_items[silver_key]["Size"]
+        source = with_retries(
+            download_object, s3_client, bucket, silver_key, size, transfer_config, max_attempts=max_attempts
+        )
+        with lock:
+            stats["bytes_read"] += size
+        return silver_key, source
 
-        raw_bytes = read_object_bytes(s3_client, bucket, silver_key)
-        payload, content_type = transform_payload(raw_bytes)
+    def transform(silver_key: str, source: Union[bytes, str]):
+        try:
+            payload, content_type, data_format, seconds = parse_pool.submit(
+                transform_document,
+                silver_key,
+                source,
+                metadata_for_key(silver_key, scrape_index),
+                chunk_max_chars,
+                chunk_min_chars,
+            ).result()
+        except ExtractorUnavailable as exc:
+            # Left out of the manifest, so the next run on a host with the tool picks it up.
+            logging.warning("Skipped %s: %s", silver_key, exc)
+            with lock:
+                unparsed[silver_key] = str(exc)
+            return None
+        finally:
+            if isinstance(source, str):
+                os.remove(source)
+        with lock:
+            format_stats = parse_stats.setdefault(data_format, {"documents": 0, "seconds": 0.0})
+            format_stats["documents"] += 1
+            format_stats["seconds"] += seconds
+        return silver_key, payload, content_type
 
+    def upload(silver_key: str, payload: bytes, content_type: str):
         gold_key = gold_key_for(silver_key, silver_prefix, gold_prefix)
-        write_object_bytes(s3_client, bucket, gold_key, payload, content_type)
+        with_retries(
+            write_object_bytes,
+            s3_client,
+            bucket,
+            gold_key,
+            payload,
+            content_type,
+            transfer_config,
+            max_attempts=max_attempts,
+        )
+        metadata = metadata_for_key(silver_key, scrape_index)
+        attributes = metadata_attributes([metadata])
+        if attributes:
+            with_retries(write_sidecar, s3_client, bucket, gold_key, attributes, max_attempts=max_attempts)
+        else:
+            # The document lost its manifest entry; a sidecar from an earlier run would be stale.
+            with_retries(delete_objects, s3_client, bucket, [sidecar_key(gold_key)], max_attempts=max_attempts)
+        with lock:
+            stats["objects"] += 1
+            stats["bytes_written"] += len(payload)
+            previous = manifest.get(silver_key)
+            if previous and previous.get("gold_key") != gold_key:
+                stale_gold_keys.append(previous["gold_key"])
+            manifest[silver_key] = manifest_entry_for(listed_items[silver_key], gold_key, metadata_digest(metadata))
         logging.info("Wrote %s", gold_key)
 
+    started = time.perf_counter()
+    threads = (
+        _start_stage("download", download, downloads, transforms, download_workers, transform_workers, failures, lock)
+        + _start_stage("transform", transform, transforms, uploads, transform_workers, upload_workers, failures, lock)
+        + _start_stage("upload", upload, uploads, None, upload_workers, 0, failures, lock)
+    )
+
+    skipped = 0
+    try:
+        for item in list_entries(s3_client, bucket, silver_prefix):
+            silver_key = item["Key"]
+            if silver_key.endswith("/"):
+                continue
+            listed_items[silver_key] = item
+            gold_key = gold_key_for(silver_key, silver_prefix, gold_prefix)
+            if not full_rebuild and is_unchanged(
+                item, manifest.get(silver_key), gold_key, metadata_digest(metadata_for_key(silver_key, scrape_index))
+            ):
+                skipped += 1
+                continue
+            logging.info("Processing %s", silver_key)
+            downloads.put((silver_key,))
+    finally:
+        for _ in range(download_workers):
+            downloads.put(_STAGE_DONE)
+        for thread in threads:
+            thread.join()
+        parse_pool.shutdown()
+    listed = len(listed_items)
+
+    deleted = 0
+    if manifest_key:
+        orphaned = [key for key in manifest if key.startswith(silver_prefix) and key not in listed_items]
+        stale_gold_keys.extend(manifest.pop(key)["gold_key"] for key in orphaned)
+        if stale_gold_keys:
+            delete_objects(s3_client, bucket, stale_gold_keys + [sidecar_key(key) for key in stale_gold_keys])
+            deleted = len(stale_gold_keys)
+            logging.info("Deleted %d orphaned gold objects", deleted)
+        save_manifest(s3_client, bucket, manifest_key, manifest)
+
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    summary = {
+        "listed": listed,
+        "objects": stats["objects"],
+        "skipped": skipped,
+        "deleted": deleted,
+        "failed": len(failures),
+        "unparsed": len(unparsed),
+        "bytes_read": stats["bytes_read"],
+        "bytes_written": stats["bytes_written"],
+        "seconds": round(elapsed, 3),
+        "objects_per_second": round(stats["objects"] / elapsed, 2),
+        "bytes_per_second": round(stats["bytes_read"] / elapsed, 1),
+        "parse_seconds_by_format": {
+            data_format: {"documents": values["documents"], "seconds": round(values["seconds"], 3)}
+            for data_format, values in sorted(parse_stats.items())
+        },
+        "failures": failures,
+        "unparsed_keys": unparsed,
+    }
+    logging.info(
+        "Processed %d/%d objects (%d unchanged) in %.1fs (%.2f objects/s, %.2f MB/s read), %d failed, %d unparsed",
+        summary["objects"],
+        listed,
+        skipped,
+        elapsed,
+        summary["objects_per_second"],
+        summary["bytes_per_second"] / 1_000_000,
+        summary["failed"],
+        summary["unparsed"],
+    )
+    return summary
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Transform silver data to gold in S3.")
@@ -65,13 +443,65 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument("--silver-prefix", default="silver/", help="Source prefix in bucket.")
     parser.add_argument("--gold-prefix", default="gold/", help="Target prefix in bucket.")
+    parser.add_argument("--download-workers", type=int, default=8, help="Parallel downloads.")
+    parser.add_argument(
+        "--transform-workers", type=int, default=None, help="Parallel transforms (default: parser processes)."
+    )
+    parser.add_argument("--parse-processes", type=int, default=None, help="Parser processes (default: CPU count).")
+    parser.add_argument("--upload-workers", type=int, default=8, help="Parallel uploads.")
+    parser.add_argument(
+        "--part-size-mb", type=int, default=DEFAULT_PART_SIZE_MB, help="Multipart part size and threshold (S3 parts are at least 5 MB)."
+    )
+    parser.add_argument(
+        "--part-concurrency", type=int, default=DEFAULT_PART_CONCURRENCY, help="Parallel parts per object."
+    )
+    parser.add_argument("--queue-size", type=int, default=32, help="Objects buffered between stages.")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Attempts per S3 call before a key fails.")
+    parser.add_argument("--endpoint-url", default=None, help="S3 endpoint override, e.g. a local MinIO.")
+    parser.add_argument(
+        "--manifest-key",
+        default=DEFAULT_MANIFEST_KEY,
+        help="Key of the run manifest in the bucket; pass an empty string to process everything without one.",
+    )
+    parser.add_argument("--full-rebuild", action="store_true", help="Reprocess every object, ignoring the manifest.")
+    parser.add_argument(
+        "--scrape-manifest-key",
+        default=DEFAULT_SCRAPE_MANIFEST_KEY,
+        help="Link scraper output used for chunk path metadata; pass an empty string to skip it.",
+    )
+    parser.add_argument("--chunk-max-chars", type=int, default=DEFAULT_MAX_CHARS, help="Maximum chunk length.")
+    parser.add_argument(
+        "--chunk-min-chars",
+        type=int,
+        default=DEFAULT_MIN_CHARS,
+        help="Chunks shorter than this are merged with the next article or section.",
+    )
     return parser.parse_args()
 
 
 def main() -> None:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
     args = parse_args()
-    process_bucket(args.bucket, args.silver_prefix, args.gold_prefix)
+    summary = process_bucket(
+        args.bucket,
+        args.silver_prefix,
+        args.gold_prefix,
+        download_workers=args.download_workers,
+        transform_workers=args.transform_workers,
+        upload_workers=args.upload_workers,
+        queue_size=args.queue_size,
+        max_attempts=args.max_attempts,
+        endpoint_url=args.endpoint_url,
+        manifest_key=args.manifest_key or None,
+        full_rebuild=args.full_rebuild,
+        parse_processes=args.parse_processes,
+        part_size_mb=args.part_size_mb,
+        part_concurrency=args.part_concurrency,
+        scrape_manifest_key=args.scrape_manifest_key or None,
+        chunk_max_chars=args.chunk_max_chars,
+        chunk_min_chars=args.chunk_min_chars,
+    )
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
 
 
 if __name__ == "__main__":
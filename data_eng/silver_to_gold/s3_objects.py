@@ -0,0 +1,15 @@
+from typing import Iterable
+
+
+def list_entries(s3_client, bucket: str, prefix: str) -> Iterable[dict]:
+    """list_objects_v2 entries under `prefix` (silver or gold), across pages."""
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        yield from page.get("Contents", [])
+
+
+def delete_objects(s3_client, bucket: str, keys: list[str]) -> None:
+    """Delete `keys` in batches of 1000, the most one DeleteObjects call takes."""
+    for start in range(0, len(keys), 1000):
+        batch = keys[start : start + 1000]
+        s3_client.delete_objects(Bucket=bucket, Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True})
@@ -0,0 +1,93 @@
+from decimal import Decimal
+from typing import Iterable
+
+import pandas as pd
+from boto3.dynamodb.types import TypeDeserializer
+
+# Attributes written by streamlit_app/streamlit.py, in the column order of the export.
+FEEDBACK_COLUMNS = (
+    "sessionId",
+    "messageId",
+    "answerTimestamp",
+    "updatedAt",
+    "updatedDate",
+    "username",
+    "userQuestion",
+    "modelAnswer",
+    "consultedDocuments",
+    "retrievedChunks",
+    "point",
+    "feedbackNote",
+    "feedbackUpdatedAt",
+)
+
+_deserializer = TypeDeserializer()
+
+
+class UnsupportedShape(Exception):
+    """Raised when an attribute needs the generic TypeDeserializer path."""
+
+
+def _decode_number(text: str):
+    if "." in text or "e" in text or "E" in text:
+        # Integral values ("4.0", "1E+2") become int, as json_default writes the generic Decimal.
+        number = Decimal(text)
+        return int(number) if number == number.to_integral_value() else float(number)
+    return int(text)
+
+
+def _decode_value(value: dict):
+    # Every attribute our writer produces is S, N, BOOL, NULL or a list of strings.
+    if "S" in value:
+        return value["S"]
+    if "N" in value:
+        return _decode_number(value["N"])
+    if "L" in value:
+        elements = value["L"]
+        try:
+            return [element["S"] for element in elements]
+        except KeyError:
+            raise UnsupportedShape from None
+    if "BOOL" in value:
+        return value["BOOL"]
+    if "NULL" in value:
+        return None
+    raise UnsupportedShape
+
+
+def decode_item(raw_item: dict) -> dict:
+    """Decode one DynamoDB-JSON item, using the generic deserializer for unusual shapes."""
+    try:
+        return {key: _decode_value(value) for key, value in raw_item.items()}
+    except UnsupportedShape:
+        return {key: _deserializer.deserialize(value) for key, value in raw_item.items()}
+
+
+def items_to_frame(raw_items: Iterable[dict]) -> pd.DataFrame:
+    """
+    Build the analysis frame straight from DynamoDB-JSON items.
+
+    Values are appended to per-column lists without building per-item dicts,
+    and numbers become int/float instead of Decimal. If any item holds a shape
+    outside our schema (maps, sets, lists of non-strings), the whole batch goes
+    through TypeDeserializer and pd.json_normalize instead, which is what the
+    export used before.
+    """
+    raw_items = list(raw_items)
+    columns: dict[str, list] = {name: [None] * len(raw_items) for name in FEEDBACK_COLUMNS}
+
+    try:
+        for row, raw_item in enumerate(raw_items):
+            for key, value in raw_item.items():
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = [None] * len(raw_items)
+                column[row] = _decode_value(value)
+    except UnsupportedShape:
+        items = [{k: _deserializer.deserialize(v) for k, v in raw_item.items()} for raw_item in raw_items]
+        return pd.json_normalize(items) if items else pd.DataFrame()
+
+    if not raw_items:
+        return pd.DataFrame()
+    present = {key for raw_item in raw_items for key in raw_item}
+    return pd.DataFrame({name: values for name, values in columns.items() if name in present})
@@ -0,0 +1,225 @@
+import argparse
+import gzip
+import io
+import json
+import os
+import re
+from typing import Iterable, Iterator
+
+import pandas as pd
+
+from dynamodb_decoder import decode_item, items_to_frame
+
+READ_CHUNK_SIZE = 1 << 16
+FRAME_BATCH_SIZE = 10000
+_SEPARATORS = " \t\r\n,[]"
+# Characters that open or close a JSON value or string, or escape inside one.
+_STRUCTURE_RE = re.compile(r'[{}\[\]"\\]')
+
+
+def _find_value_end(text: str, start: int, state: list) -> int:
+    """
+    Scan text[start:] for the end of an open top-level object or array.
+
+    `state` is [depth, in_string, escaped] and carries over from chunk to
+    chunk, so every character of a long record is scanned once. Returns the
+    index just past the closing bracket, or -1 if it is not in `text`.
+    """
+    depth, in_string, escaped = state
+    skip = start if escaped else -1
+    for match in _STRUCTURE_RE.finditer(text, start):
+        index = match.start()
+        if index == skip:
+            continue
+        char = match.group()
+        if in_string:
+            if char == "\\":
+                skip = index + 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                state[:] = [0, False, False]
+                return index + 1
+    state[:] = [depth, in_string, skip == len(text)]
+    return -1
+
+
+def _iter_json_values(stream, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Yield top-level JSON objects from a text stream, one at a time.
+
+    Handles both a JSON array (`[{...}, {...}]`) and line-delimited JSON, and
+    only keeps the object being decoded plus one read chunk in memory. A
+    record cut off at the end of a chunk is completed chunk by chunk with a
+    scan that resumes where the previous chunk stopped, then decoded once.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+
+    while True:
+        while position < len(buffer) and buffer[position] in _SEPARATORS:
+            position += 1
+        if position == len(buffer):
+            if eof:
+                return
+            buffer = stream.read(chunk_size)
+            position = 0
+            if not buffer:
+                return
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            if buffer[position] not in "{[":
+                # A bare scalar is short; read on and decode it again.
+                more = stream.read(chunk_size)
+                eof = not more
+                buffer = buffer[position:] + more
+                position = 0
+                continue
+
+            pieces = [buffer[position:]]
+            state = [0, False, False]
+            end = _find_value_end(pieces[0], 0, state)
+            while end < 0:
+                more = stream.read(chunk_size)
+                if not more:
+                    eof = True
+                    break
+                pieces.append(more)
+                end = _find_value_end(more, 0, state)
+            if end < 0:
+                # Truncated input: raises the decoder's error for the partial record.
+                decoder.decode("".join(pieces))
+            last = pieces.pop()
+            value = decoder.decode("".join(pieces) + last[:end])
+            buffer, position = last[end:], 0
+            yield value
+            continue
+
+        yield value
+        position = end
+
+
+def _unwrap_record(record: dict) -> dict:
+    # Export to S3 writes {"Item": {...}}; console/CLI dumps like test.json use {"M": {...}}.
+    if "Item" in record and isinstance(record["Item"], dict):
+        return record["Item"]
+    if set(record) == {"M"}:
+        return record["M"]
+    return record
+
+
+def _open_local(path: str):
+    with open(path, "rb") as f:
+        is_gzip = f.read(2) == b"\x1f\x8b"
+    binary = gzip.open(path, "rb") if is_gzip else open(path, "rb")
+    return io.TextIOWrapper(binary, encoding="utf-8")
+
+
+def _open_s3(uri: str, s3_client):
+    bucket, key = uri[len("s3://") :].split("/", 1)
+    body = s3_client.get_object(Bucket=bucket, Key=key)["Body"]
+    binary = gzip.GzipFile(fileobj=body) if key.endswith(".gz") else body
+    return io.TextIOWrapper(binary, encoding="utf-8")
+
+
+def _expand_paths(paths: Iterable[str], s3_client=None) -> Iterator[str]:
+    for path in paths:
+        if path.startswith("s3://"):
+            bucket, _, prefix = path[len("s3://") :].partition("/")
+            if prefix and not prefix.endswith("/"):
+                yield path
+                continue
+            paginator = s3_client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+                for item in page.get("Contents", []):
+                    if item["Key"].endswith((".json", ".json.gz")):
+                        yield f"s3://{bucket}/{item['Key']}"
+        elif os.path.isdir(path):
+            for root, _, files in sorted(os.walk(path)):
+                for name in sorted(files):
+                    if name.endswith((".json", ".json.gz")):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def iter_raw_items(paths: Iterable[str], s3_client=None) -> Iterator[dict]:
+    """
+    Stream DynamoDB-JSON items from local files, directories or s3:// URIs.
+
+    Files may be gzip-compressed, line-delimited (export to S3) or a JSON array
+    (like test.json). Directories and s3:// prefixes ending in "/" are expanded
+    to the .json/.json.gz files below them.
+    """
+    paths = list(paths)
+    if s3_client is None and any(path.startswith("s3://") for path in paths):
+        import boto3
+
+        s3_client = boto3.client("s3")
+
+    for path in _expand_paths(paths, s3_client):
+        stream = _open_s3(path, s3_client) if path.startswith("s3://") else _open_local(path)
+        with stream:
+            for record in _iter_json_values(stream):
+                yield _unwrap_record(record)
+
+
+def iter_export_records(paths: Iterable[str], s3_client=None) -> Iterator[dict]:
+    """Stream decoded records (plain Python values) from DynamoDB-JSON exports."""
+    for raw_item in iter_raw_items(paths, s3_client):
+        yield decode_item(raw_item)
+
+
+def read_export_frame(paths: Iterable[str], s3_client=None, batch_size: int = FRAME_BATCH_SIZE) -> pd.DataFrame:
+    """
+    Build the same analysis frame as get_feedback_results.py from export files.
+
+    Raw items are decoded in batches, so only one batch of DynamoDB JSON is
+    held in memory next to the frame being built.
+    """
+    frames = []
+    batch = []
+    for raw_item in iter_raw_items(paths, s3_client):
+        batch.append(raw_item)
+        if len(batch) >= batch_size:
+            frames.append(items_to_frame(batch))
+            batch = []
+    if batch:
+        frames.append(items_to_frame(batch))
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load DynamoDB JSON exports into the feedback analysis frame.")
+    parser.add_argument("paths", nargs="+", help="Export files, directories or s3:// URIs.")
+    parser.add_argument("--output", default="feedback_results.xlsx", help="Excel file to write.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    df = read_export_frame(args.paths)
+    df.to_excel(args.output, index=False)
+
+    print(f"Rows read: {len(df)}")
+    print(f"Saved to Excel: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import argparse
+import hashlib
+import json
+import os
+from datetime import date, datetime, timezone
+from typing import Iterable, Optional
+
+from feedback_store import item_key, json_default, read_store
+
+# Points are given on a 0-10 slider in the chat app.
+LOW_SCORE_THRESHOLD = 4
+TOP_N = 50
+STATE_FILE = "state.json"
+VIEWS_FILE = "views.json"
+
+
+def _empty_state() -> dict:
+    return {
+        "contributions": {},
+        "score_distribution": {},
+        "documents": {},
+        "chunks": {},
+        "users": {},
+        "days": {},
+        "weeks": {},
+    }
+
+
+def _empty_stats() -> dict:
+    return {"answers": 0, "scored": 0, "point_sum": 0.0, "low_scored": 0}
+
+
+def _chunk_previews(item: dict) -> dict[str, str]:
+    return {hashlib.sha1(chunk.encode("utf-8")).hexdigest(): chunk[:160] for chunk in item.get("retrievedChunks") or []}
+
+
+def _contribution(item: dict) -> dict:
+    """What one item adds to the aggregates: counts and IDs, never chunk text."""
+    timestamp = item.get("answerTimestamp") or item.get("timestamp") or ""
+    day = timestamp[:10] if len(timestamp) >= 10 else "unknown"
+    week = "unknown"
+    if day != "unknown":
+        year, week_number, _ = date.fromisoformat(day).isocalendar()
+        week = f"{year}-W{week_number:02d}"
+
+    point = item.get("point")
+    return {
+        "point": float(point) if point is not None else None,
+        "day": day,
+        "week": week,
+        "username": item.get("username") or "anonymous",
+        "documents": sorted(set(item.get("consultedDocuments") or item.get("documents") or [])),
+        "chunks": sorted(_chunk_previews(item)),
+    }
+
+
+def _apply_stats(group: dict, name: str, point: Optional[float], sign: int) -> dict:
+    stats = group.setdefault(name, _empty_stats())
+    stats["answers"] += sign
+    if point is not None:
+        stats["scored"] += sign
+        stats["point_sum"] += sign * point
+        if point <= LOW_SCORE_THRESHOLD:
+            stats["low_scored"] += sign
+    # Entries nothing contributes to any more are dropped, so the state
+    # matches a full recompute and does not grow with churn.
+    if stats["answers"] <= 0:
+        del group[name]
+    return stats
+
+
+def _apply_contribution(state: dict, contribution: dict, sign: int, previews: Optional[dict] = None) -> None:
+    point = contribution["point"]
+    if point is not None:
+        bucket = str(int(point)) if point == int(point) else str(point)
+        distribution = state["score_distribution"]
+        distribution[bucket] = distribution.get(bucket, 0) + sign
+        if distribution[bucket] <= 0:
+            del distribution[bucket]
+
+    for document in contribution["documents"]:
+        _apply_stats(state["documents"], document, point, sign)
+    # Older states stored {hash: preview} per contribution; iterating gives the hashes either way.
+    for chunk_hash in contribution["chunks"]:
+        stats = _apply_stats(state["chunks"], chunk_hash, point, sign)
+        if previews and chunk_hash in previews:
+            stats.setdefault("preview", previews[chunk_hash])
+    _apply_stats(state["users"], contribution["username"], point, sign)
+    _apply_stats(state["days"], contribution["day"], point, sign)
+    _apply_stats(state["weeks"], contribution["week"], point, sign)
+
+
+def apply_items(state: dict, items: Iterable[dict]) -> int:
+    """
+    Fold new or updated items into the aggregates.
+
+    Each item's previous contribution is subtracted before the new one is
+    added, so feedback arriving after the answer never double counts. The
+    state keeps one preview per distinct chunk; contributions hold only
+    counts and IDs.
+
+    Returns:
+        Number of items applied.
+    """
+    applied = 0
+    for item in items:
+        key = item_key(item)
+        previous = state["contributions"].get(key)
+        if previous is not None:
+            _apply_contribution(state, previous, -1)
+        contribution = _contribution(item)
+        _apply_contribution(state, contribution, 1, _chunk_previews(item))
+        state["contributions"][key] = contribution
+        applied += 1
+    return applied
+
+
+def _average(stats: dict) -> Optional[float]:
+    return round(stats["point_sum"] / stats["scored"], 2) if stats["scored"] else None
+
+
+def _stats_rows(group: dict, label: str) -> list[dict]:
+    return [
+        {
+            label: name,
+            "answers": stats["answers"],
+            "scored": stats["scored"],
+            "average_point": _average(stats),
+            "low_scored": stats["low_scored"],
+        }
+        for name, stats in group.items()
+        if stats["answers"] > 0
+    ]
+
+
+def build_views(state: dict) -> dict:
+    """Small, precomputed tables for the Streamlit admin page."""
+    days = _stats_rows(state["days"], "day")
+    scored = sum(row["scored"] for row in days)
+    point_sum = sum(stats["point_sum"] for stats in state["days"].values())
+
+    def worst_first(rows: list[dict]) -> list[dict]:
+        return sorted(rows, key=lambda row: (-row["low_scored"], -row["answers"]))[:TOP_N]
+
+    chunk_rows = _stats_rows(state["chunks"], "chunk")
+    for row in chunk_rows:
+        row["chunk"] = state["chunks"][row["chunk"]]["preview"]
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "low_score_threshold": LOW_SCORE_THRESHOLD,
+        "totals": {
+            "answers": sum(row["answers"] for row in days),
+            "scored": scored,
+            "average_point": round(point_sum / scored, 2) if scored else None,
+        },
+        "score_distribution": [
+            {"point": point, "count": count}
+            for point, count in sorted(state["score_distribution"].items(), key=lambda pair: float(pair[0]))
+            if count > 0
+        ],
+        "documents": worst_first(_stats_rows(state["documents"], "document")),
+        "chunks": worst_first(chunk_rows),
+        "users": sorted(_stats_rows(state["users"], "username"), key=lambda row: -row["answers"]),
+        "days": sorted(days, key=lambda row: row["day"]),
+        "weeks": sorted(_stats_rows(state["weeks"], "week"), key=lambda row: row["week"]),
+    }
+
+
+def load_state(analytics_dir: str) -> dict:
+    path = os.path.join(analytics_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return _empty_state()
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(path: str, payload: dict) -> None:
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, default=json_default)
+    os.replace(f"{path}.tmp", path)
+
+
+def save_state(analytics_dir: str, state: dict, s3_uri: Optional[str] = None) -> dict:
+    os.makedirs(analytics_dir, exist_ok=True)
+    views = build_views(state)
+    _write_json(os.path.join(analytics_dir, STATE_FILE), state)
+    _write_json(os.path.join(analytics_dir, VIEWS_FILE), views)
+
+    if s3_uri:
+        import boto3
+
+        bucket, key = s3_uri[len("s3://") :].split("/", 1)
+        boto3.client("s3").put_object(
+            Bucket=bucket,
+            Key=key,
+            Body=json.dumps(views, ensure_ascii=False).encode("utf-8"),
+            ContentType="application/json; charset=utf-8",
+        )
+    return views
+
+
+def update_analytics(analytics_dir: str, items: Iterable[dict], s3_uri: Optional[str] = None) -> dict:
+    """Apply decoded items to the stored aggregates and refresh the views."""
+    state = load_state(analytics_dir)
+    apply_items(state, items)
+    return save_state(analytics_dir, state, s3_uri)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rebuild feedback analytics from the local feedback store.")
+    parser.add_argument("--store-dir", default="feedback_store", help="Store written by get_feedback_results.py.")
+    parser.add_argument("--analytics-dir", default="feedback_analytics", help="Where aggregates and views go.")
+    parser.add_argument("--s3-uri", default=os.getenv("ANALYTICS_S3_URI"), help="Optional s3:// URI for views.json.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    state = _empty_state()
+    applied = apply_items(state, read_store(args.store_dir))
+    views = save_state(args.analytics_dir, state, args.s3_uri)
+    print(f"Items aggregated: {applied}")
+    print(f"Answers: {views['totals']['answers']}, average point: {views['totals']['average_point']}")
+
+
+if __name__ == "__main__":
+    main()
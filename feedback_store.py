@@ -0,0 +1,108 @@
+import json
+import os
+from decimal import Decimal
+from typing import Iterable, Optional
+
+WATERMARK_FILE = "_watermark.json"
+TIMESTAMP_FIELDS = ("answerTimestamp", "feedbackUpdatedAt", "updatedAt")
+
+
+def json_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, set):
+        return sorted(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def item_key(item: dict) -> str:
+    return f"{item.get('sessionId', '')}#{item.get('messageId', '')}"
+
+
+def partition_for(item: dict) -> str:
+    # Partition on the answer date: it never changes when feedback is added later.
+    timestamp = item.get("answerTimestamp") or item.get("timestamp") or ""
+    return f"date={timestamp[:10]}" if len(timestamp) >= 10 else "date=unknown"
+
+
+def latest_timestamp(items: Iterable[dict], current: Optional[str] = None) -> Optional[str]:
+    latest = current
+    for item in items:
+        for field in TIMESTAMP_FIELDS:
+            value = item.get(field)
+            if isinstance(value, str) and (latest is None or value > latest):
+                latest = value
+    return latest
+
+
+def load_watermark(store_dir: str) -> Optional[str]:
+    path = os.path.join(store_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("watermark")
+
+
+def save_watermark(store_dir: str, watermark: Optional[str]) -> None:
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, WATERMARK_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump({"watermark": watermark}, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _read_partition(path: str) -> dict[str, dict]:
+    items: dict[str, dict] = {}
+    if not os.path.exists(path):
+        return items
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                items[item_key(item)] = item
+    return items
+
+
+def upsert_items(store_dir: str, items: Iterable[dict]) -> int:
+    """
+    Insert or replace items in the date-partitioned store.
+
+    Items are keyed by sessionId + messageId; only partitions that receive an
+    item are rewritten.
+
+    Returns:
+        Number of items written.
+    """
+    by_partition: dict[str, list[dict]] = {}
+    for item in items:
+        by_partition.setdefault(partition_for(item), []).append(item)
+
+    written = 0
+    for partition, partition_items in by_partition.items():
+        partition_dir = os.path.join(store_dir, partition)
+        os.makedirs(partition_dir, exist_ok=True)
+        path = os.path.join(partition_dir, "items.jsonl")
+
+        stored = _read_partition(path)
+        for item in partition_items:
+            stored[item_key(item)] = item
+            written += 1
+
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            for key in sorted(stored):
+                f.write(json.dumps(stored[key], ensure_ascii=False, default=json_default))
+                f.write("\n")
+        os.replace(f"{path}.tmp", path)
+    return written
+
+
+def read_store(store_dir: str) -> list[dict]:
+    items: list[dict] = []
+    if not os.path.isdir(store_dir):
+        return items
+    for partition in sorted(os.listdir(store_dir)):
+        if not partition.startswith("date="):
+            continue
+        path = os.path.join(store_dir, partition, "items.jsonl")
+        items.extend(_read_partition(path).values())
+    return items
@@ -1,23 +1,160 @@
+import gzip
+import json
 import os
-from typing import Optional
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, Iterator, Optional
 
 import boto3
 import pandas as pd
-from boto3.dynamodb.types import TypeDeserializer
+import tqdm
+from botocore.exceptions import ClientError
+
+from dynamodb_decoder import FEEDBACK_COLUMNS, decode_item, items_to_frame
+from feedback_analytics import update_analytics
+from feedback_store import json_default, latest_timestamp, load_watermark, read_store, save_watermark, upsert_items
+
+# Written by streamlit_app/streamlit.py on every answer and feedback update.
+UPDATED_AT_INDEX_NAME = "updatedDate-updatedAt-index"
+# Re-read a small window before the watermark so late or skewed writes are not missed.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+# Scan pages each segment may read ahead of the writer; bounds memory per segment.
+PAGES_PER_SEGMENT_BUFFER = 2
+_SEGMENT_DONE = object()
+
+
+def _build_dynamodb_client(
+    region_name: Optional[str] = None,
+    profile_name: Optional[str] = None,
+    endpoint_url: Optional[str] = None,
+):
+    session_kwargs = {}
+    if profile_name:
+        session_kwargs["profile_name"] = profile_name
+
+    session = boto3.Session(**session_kwargs)
+    return session.client("dynamodb", region_name=region_name, endpoint_url=endpoint_url)
+
+
+def _put_page(pages: queue.Queue, value, stop: threading.Event) -> None:
+    while not stop.is_set():
+        try:
+            pages.put(value, timeout=0.5)
+            return
+        except queue.Full:
+            continue
+
+
+def _scan_segment_pages(
+    dynamodb,
+    table_name: str,
+    segment: int,
+    total_segments: int,
+    filter_kwargs: Optional[dict],
+    pages: queue.Queue,
+    stop: threading.Event,
+) -> None:
+    scan_kwargs = {"TableName": table_name, **(filter_kwargs or {})}
+    if total_segments > 1:
+        scan_kwargs["Segment"] = segment
+        scan_kwargs["TotalSegments"] = total_segments
+
+    try:
+        with tqdm.tqdm(desc=f"segment {segment}", unit="item", position=segment, leave=False) as progress:
+            while not stop.is_set():
+                response = dynamodb.scan(**scan_kwargs)
+                page_items = response.get("Items", [])
+                progress.update(len(page_items))
+                _put_page(pages, page_items, stop)
+
+                last_evaluated_key = response.get("LastEvaluatedKey")
+                if not last_evaluated_key:
+                    break
+                scan_kwargs["ExclusiveStartKey"] = last_evaluated_key
+    except Exception as exc:
+        _put_page(pages, exc, stop)
+        return
+    _put_page(pages, _SEGMENT_DONE, stop)
+
+
+def iter_scan_pages(
+    dynamodb,
+    table_name: str,
+    total_segments: int = 1,
+    filter_kwargs: Optional[dict] = None,
+) -> Iterator[list[dict]]:
+    """
+    Yield the table's raw DynamoDB-JSON scan pages as they arrive.
+
+    Each segment is scanned on its own worker and may only run
+    PAGES_PER_SEGMENT_BUFFER pages ahead of the consumer. Pages are taken from
+    the segments round-robin in segment order, so the output order only
+    depends on the table contents, not on which worker finishes first.
+    """
+    total_segments = max(1, total_segments)
+    segment_pages = [queue.Queue(maxsize=PAGES_PER_SEGMENT_BUFFER) for _ in range(total_segments)]
+    stop = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=total_segments) as executor:
+        for segment in range(total_segments):
+            executor.submit(
+                _scan_segment_pages,
+                dynamodb,
+                table_name,
+                segment,
+                total_segments,
+                filter_kwargs,
+                segment_pages[segment],
+                stop,
+            )
+
+        active = list(range(total_segments))
+        try:
+            while active:
+                for segment in list(active):
+                    page = segment_pages[segment].get()
+                    if page is _SEGMENT_DONE:
+                        active.remove(segment)
+                    elif isinstance(page, Exception):
+                        raise page
+                    else:
+                        yield page
+        finally:
+            stop.set()
+
+
+def scan_table_items(
+    dynamodb,
+    table_name: str,
+    total_segments: int = 1,
+    filter_kwargs: Optional[dict] = None,
+) -> list[dict]:
+    """Return the table's raw DynamoDB-JSON items, read with a parallel scan."""
+    return [item for page in iter_scan_pages(dynamodb, table_name, total_segments, filter_kwargs) for item in page]
 
 
 def get_dynamodb_table_as_df(
     table_name: str = "goaltech-poc",
     region_name: Optional[str] = None,
     profile_name: Optional[str] = None,
+    total_segments: int = 1,
+    endpoint_url: Optional[str] = None,
 ) -> pd.DataFrame:
     """
     Read all items from a DynamoDB table and return them as a pandas DataFrame.
 
+    Thin wrapper over iter_scan_pages: each page is decoded into a frame as it
+    arrives and the page frames are concatenated. With total_segments > 1 the
+    table is read as a parallel scan, one worker per segment.
+
     Args:
         table_name: DynamoDB table name.
         region_name: AWS region (for example, "ap-southeast-1"). If None, boto3 defaults are used.
         profile_name: Optional AWS profile name from local credentials.
+        total_segments: Number of parallel scan segments.
+        endpoint_url: Optional endpoint override, for example a DynamoDB Local instance.
 
     Returns:
         pandas.DataFrame containing all table items.
@@ -25,35 +162,205 @@ def get_dynamodb_table_as_df(
     if table_name.endswith("\n"):
         table_name = table_name.strip()
 
-    session_kwargs = {}
-    if profile_name:
-        session_kwargs["profile_name"] = profile_name
+    dynamodb = _build_dynamodb_client(region_name, profile_name, endpoint_url)
+    frames = [items_to_frame(page) for page in iter_scan_pages(dynamodb, table_name, total_segments) if page]
 
-    session = boto3.Session(**session_kwargs)
-    dynamodb = session.client("dynamodb", region_name=region_name)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
 
-    deserializer = TypeDeserializer()
-    items = []
-    scan_kwargs = {"TableName": table_name}
 
-    while True:
-        response = dynamodb.scan(**scan_kwargs)
-        raw_items = response.get("Items", [])
+def _write_jsonl_pages(pages: Iterable[list[dict]], output_path: str) -> int:
+    opener = gzip.open if output_path.endswith(".gz") else open
+    rows = 0
+    with opener(output_path, "wt", encoding="utf-8") as f:
+        for page in pages:
+            for raw_item in page:
+                f.write(json.dumps(decode_item(raw_item), ensure_ascii=False, default=json_default))
+                f.write("\n")
+            rows += len(page)
+    return rows
 
-        for raw_item in raw_items:
-            item = {k: deserializer.deserialize(v) for k, v in raw_item.items()}
-            items.append(item)
 
-        last_evaluated_key = response.get("LastEvaluatedKey")
-        if not last_evaluated_key:
-            break
-        scan_kwargs["ExclusiveStartKey"] = last_evaluated_key
+def _write_parquet_pages(pages: Iterable[list[dict]], output_path: str) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ModuleNotFoundError as exc:
+        raise RuntimeError("pyarrow is required for Parquet output; use a .jsonl path instead.") from exc
 
-    if not items:
-        return pd.DataFrame()
+    list_columns = {"consultedDocuments", "retrievedChunks"}
+    fields = [
+        pa.field(name, pa.list_(pa.string()) if name in list_columns else pa.float64() if name == "point" else pa.string())
+        for name in FEEDBACK_COLUMNS
+    ]
+    # Attributes outside our schema are kept as a JSON object per row.
+    schema = pa.schema(fields + [pa.field("otherAttributes", pa.string())])
+
+    rows = 0
+    with pq.ParquetWriter(output_path, schema) as writer:
+        for page in pages:
+            if not page:
+                continue
+            items = [decode_item(raw_item) for raw_item in page]
+            columns = {name: [item.get(name) for item in items] for name in FEEDBACK_COLUMNS}
+            # The fast decoder yields int or float, the TypeDeserializer fallback
+            # Decimal; the column is float64 on every page either way.
+            columns["point"] = [None if point is None else float(point) for point in columns["point"]]
+            columns["otherAttributes"] = [
+                json.dumps(extra, ensure_ascii=False, default=json_default) if extra else None
+                for extra in ({k: v for k, v in item.items() if k not in FEEDBACK_COLUMNS} for item in items)
+            ]
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            rows += len(page)
+    return rows
 
-    # Normalize nested objects when present.
-    return pd.json_normalize(items)
+
+def export_table_stream(
+    output_path: str,
+    table_name: str = "goaltech-poc",
+    region_name: Optional[str] = None,
+    profile_name: Optional[str] = None,
+    total_segments: int = 1,
+    endpoint_url: Optional[str] = None,
+) -> int:
+    """
+    Write every table item to a JSONL (.jsonl/.jsonl.gz) or Parquet file page by page.
+
+    Each scan page is written as soon as it arrives (one row group per page for
+    Parquet), so peak memory is bounded by the page size and scan read-ahead
+    rather than the table size.
+
+    Returns:
+        Number of rows written.
+    """
+    dynamodb = _build_dynamodb_client(region_name, profile_name, endpoint_url)
+    pages = iter_scan_pages(dynamodb, table_name, total_segments)
+    if output_path.endswith(".parquet"):
+        return _write_parquet_pages(pages, output_path)
+    return _write_jsonl_pages(pages, output_path)
+
+
+def _query_updated_since(dynamodb, table_name: str, since: str) -> list[dict]:
+    raw_items = []
+    day = date.fromisoformat(since[:10])
+    today = datetime.now(timezone.utc).date()
+
+    while day <= today:
+        query_kwargs = {
+            "TableName": table_name,
+            "IndexName": UPDATED_AT_INDEX_NAME,
+            "KeyConditionExpression": "#updatedDate = :day AND #updatedAt > :since",
+            "ExpressionAttributeNames": {"#updatedDate": "updatedDate", "#updatedAt": "updatedAt"},
+            "ExpressionAttributeValues": {":day": {"S": day.isoformat()}, ":since": {"S": since}},
+        }
+        while True:
+            response = dynamodb.query(**query_kwargs)
+            raw_items.extend(response.get("Items", []))
+
+            last_evaluated_key = response.get("LastEvaluatedKey")
+            if not last_evaluated_key:
+                break
+            query_kwargs["ExclusiveStartKey"] = last_evaluated_key
+        day += timedelta(days=1)
+
+    return raw_items
+
+
+def fetch_items_updated_since(dynamodb, table_name: str, since: str, total_segments: int = 1) -> list[dict]:
+    """
+    Fetch raw items written or given feedback after `since` (an ISO-8601 UTC timestamp).
+
+    Uses one query per day on the updatedDate/updatedAt index. Tables without the
+    index fall back to a filtered parallel scan, which still reads the whole
+    table but only transfers changed items.
+    """
+    try:
+        return _query_updated_since(dynamodb, table_name, since)
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") not in ("ValidationException", "ResourceNotFoundException"):
+            raise
+
+    filter_kwargs = {
+        "FilterExpression": "#answerTimestamp > :since OR #feedbackUpdatedAt > :since OR #updatedAt > :since",
+        "ExpressionAttributeNames": {
+            "#answerTimestamp": "answerTimestamp",
+            "#feedbackUpdatedAt": "feedbackUpdatedAt",
+            "#updatedAt": "updatedAt",
+        },
+        "ExpressionAttributeValues": {":since": {"S": since}},
+    }
+    return scan_table_items(dynamodb, table_name, total_segments, filter_kwargs)
+
+
+def create_updated_at_index(dynamodb, table_name: str) -> None:
+    """Add the updatedDate/updatedAt global secondary index used by incremental exports."""
+    table = dynamodb.describe_table(TableName=table_name)["Table"]
+    if any(index["IndexName"] == UPDATED_AT_INDEX_NAME for index in table.get("GlobalSecondaryIndexes", [])):
+        return
+
+    index = {
+        "IndexName": UPDATED_AT_INDEX_NAME,
+        "KeySchema": [
+            {"AttributeName": "updatedDate", "KeyType": "HASH"},
+            {"AttributeName": "updatedAt", "KeyType": "RANGE"},
+        ],
+        "Projection": {"ProjectionType": "ALL"},
+    }
+    if table.get("BillingModeSummary", {}).get("BillingMode") != "PAY_PER_REQUEST":
+        throughput = table["ProvisionedThroughput"]
+        index["ProvisionedThroughput"] = {
+            "ReadCapacityUnits": throughput["ReadCapacityUnits"],
+            "WriteCapacityUnits": throughput["WriteCapacityUnits"],
+        }
+
+    dynamodb.update_table(
+        TableName=table_name,
+        AttributeDefinitions=[
+            {"AttributeName": "updatedDate", "AttributeType": "S"},
+            {"AttributeName": "updatedAt", "AttributeType": "S"},
+        ],
+        GlobalSecondaryIndexUpdates=[{"Create": index}],
+    )
+
+
+def export_incremental(
+    store_dir: str,
+    table_name: str = "goaltech-poc",
+    region_name: Optional[str] = None,
+    profile_name: Optional[str] = None,
+    total_segments: int = 1,
+    endpoint_url: Optional[str] = None,
+    analytics_dir: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Fetch only items changed since the last run into the local store and
+    return the analysis frame rebuilt from that store.
+
+    The first run (no watermark yet) reads the whole table. When analytics_dir
+    is given, the fetched items are also folded into the precomputed aggregates
+    read by the Streamlit admin page.
+    """
+    dynamodb = _build_dynamodb_client(region_name, profile_name, endpoint_url)
+    watermark = load_watermark(store_dir)
+
+    if watermark is None:
+        raw_items = scan_table_items(dynamodb, table_name, total_segments)
+    else:
+        since = (datetime.fromisoformat(watermark) - WATERMARK_OVERLAP).isoformat()
+        raw_items = fetch_items_updated_since(dynamodb, table_name, since, total_segments)
+    items = [decode_item(raw_item) for raw_item in raw_items]
+
+    upsert_items(store_dir, items)
+    if analytics_dir:
+        update_analytics(analytics_dir, items, os.getenv("ANALYTICS_S3_URI"))
+    save_watermark(store_dir, latest_timestamp(items, watermark))
+    print(f"Items fetched since watermark {watermark}: {len(items)}")
+
+    stored_items = read_store(store_dir)
+    if not stored_items:
+        return pd.DataFrame()
+    return pd.json_normalize(stored_items)
 
 
 if __name__ == "__main__":
@@ -61,15 +368,57 @@ if __name__ == "__main__":
     # export AWS_REGION=ap-southeast-1
     # export AWS_PROFILE=your-profile
     # export DYNAMODB_TABLE=goaltech-poc
-    df = get_dynamodb_table_as_df(
-        table_name=os.getenv("DYNAMODB_TABLE", "goaltech-poc"),
-        region_name=os.getenv("AWS_REGION"),
-        profile_name=os.getenv("AWS_PROFILE"),
-    )
+    # export DYNAMODB_SCAN_SEGMENTS=8
+    # export DYNAMODB_ENDPOINT_URL=http://localhost:8000  (DynamoDB Local)
+    # export EXPORT_MODE=incremental  (keeps FEEDBACK_STORE_DIR up to date, fetches only changes)
+    # export CREATE_UPDATED_AT_INDEX=1  (one-off: adds the index incremental exports query)
+    # export ANALYTICS_DIR=feedback_analytics  (incremental mode: keep admin page aggregates current)
+    # export STREAM_OUTPUT=feedback_results.jsonl.gz  (or .parquet; bounded-memory export, no Excel)
+    table_name = os.getenv("DYNAMODB_TABLE", "goaltech-poc")
+    region_name = os.getenv("AWS_REGION")
+    profile_name = os.getenv("AWS_PROFILE")
+    endpoint_url = os.getenv("DYNAMODB_ENDPOINT_URL")
+    total_segments = int(os.getenv("DYNAMODB_SCAN_SEGMENTS", "1"))
+
+    if os.getenv("CREATE_UPDATED_AT_INDEX") == "1":
+        create_updated_at_index(_build_dynamodb_client(region_name, profile_name, endpoint_url), table_name)
+        print(f"Index '{UPDATED_AT_INDEX_NAME}' requested on {table_name}")
+
+    stream_output = os.getenv("STREAM_OUTPUT")
+    if stream_output:
+        rows = export_table_stream(
+            output_path=stream_output,
+            table_name=table_name,
+            region_name=region_name,
+            profile_name=profile_name,
+            total_segments=total_segments,
+            endpoint_url=endpoint_url,
+        )
+        print(f"Rows exported: {rows}")
+        print(f"Saved to: {stream_output}")
+    else:
+        if os.getenv("EXPORT_MODE", "full") == "incremental":
+            df = export_incremental(
+                store_dir=os.getenv("FEEDBACK_STORE_DIR", "feedback_store"),
+                table_name=table_name,
+                region_name=region_name,
+                profile_name=profile_name,
+                total_segments=total_segments,
+                endpoint_url=endpoint_url,
+                analytics_dir=os.getenv("ANALYTICS_DIR"),
+            )
+        else:
+            df = get_dynamodb_table_as_df(
+                table_name=table_name,
+                region_name=region_name,
+                profile_name=profile_name,
+                total_segments=total_segments,
+                endpoint_url=endpoint_url,
+            )
 
-    output_file = os.getenv("OUTPUT_XLSX", "feedback_results.xlsx")
-    df.to_excel(output_file, index=False)
+        output_file = os.getenv("OUTPUT_XLSX", "feedback_results.xlsx")
+        df.to_excel(output_file, index=False)
 
-    print(f"Rows fetched: {len(df)}")
-    print(f"Saved to Excel: {output_file}")
-    print(df.head())
+        print(f"Rows fetched: {len(df)}")
+        print(f"Saved to Excel: {output_file}")
+        print(df.head())
@@ -1,13 +1,25 @@
+import base64
+import gzip
+import hashlib
+import json
 import os
+import statistics
+import time
 import uuid
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime
 from threading import local
+from typing import Callable
 
 import boto3
 import pandas as pd
 from botocore.exceptions import ClientError
 import tqdm
 
+from question_clustering import plan_dispatch
+from ttkb_common.near_duplicates import normalize_question
+from ttkb_common.retrieval import build_session_state
+
 INPUT_FILE = "./dataset/TTKB TEST.xlsx"
 OUTPUT_FILE = "./dataset/TTKB TEST_answered.xlsx"
 SHEET_NAME = "dataset"
@@ -15,10 +27,42 @@ QUESTION_COLUMN = "Question"
 ANSWER_COLUMN = "System Answer After the Update"
 RETRIEVED_DOCUMENTS_COLUMN = "Retrieved Documents"
 RETRIEVED_CHUNKS_COLUMN = "Retrieved Chunks"
+CLUSTER_COLUMN = "Question Cluster"
+ANSWER_SOURCE_COLUMN = "Answer Source Row"
+# Optional comma-separated categories per question, used by the scope comparison.
+SCOPE_COLUMN = "Scope"
+SCOPE_REPORT_FILE = "./dataset/TTKB TEST_scope_comparison.xlsx"
+SWEEP_REPORT_FILE = "./dataset/TTKB TEST_retrieval_sweep.xlsx"
+# Graded answers from earlier runs serve as references for answer quality.
+REFERENCE_ANSWER_COLUMN = "System Answer"
+REFERENCE_POINT_COLUMN = "Point"
 
 AGENT_ID = "CHUW9WFEUR"
 AGENT_ALIAS_ID = "OS4IDX7EMV"
 MAX_WORKERS = 10
+# "off" calls the agent, "record" calls it and stores the raw event stream,
+# "replay" rebuilds answers from stored streams without touching AWS.
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off")
+CASSETTE_DIR = os.getenv("CASSETTE_DIR", "./dataset/cassettes")
+# Questions whose estimated shingle similarity reaches this threshold share a cluster.
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+# Distinct questions dispatched per near-duplicate cluster; 0 dispatches all of them.
+NEAR_DUPLICATE_SAMPLE = int(os.getenv("NEAR_DUPLICATE_SAMPLE", "0"))
+# Restrict retrieval to documents whose "categories" sidecar attribute contains
+# one of these comma-separated values (e.g. "TTKB Mevzuatı,Kalite Yönetim Sistemi").
+KNOWLEDGE_BASE_ID = os.getenv("KNOWLEDGE_BASE_ID", "")
+KB_CATEGORIES = [value.strip() for value in os.getenv("KB_CATEGORIES", "").split(",") if value.strip()]
+# Scoped searches cover less of the corpus, so they retrieve fewer chunks (same default as the chat app).
+SCOPED_NUMBER_OF_RESULTS = int(os.getenv("SCOPED_NUMBER_OF_RESULTS", "5"))
+# "answer" fills the answer columns; "scope" compares scoped and unscoped retrieval;
+# "sweep" runs the question set over a grid of retrieval settings.
+EVALUATION_MODE = os.getenv("EVALUATION_MODE", "answer")
+# Reference answers need at least this point (0-10) to count as correct.
+REFERENCE_MIN_POINT = float(os.getenv("REFERENCE_MIN_POINT", "8"))
+SWEEP_NUMBER_OF_RESULTS = [int(value) for value in os.getenv("SWEEP_NUMBER_OF_RESULTS", "3,5,10,20").split(",")]
+SWEEP_SEARCH_TYPES = [value.strip() for value in os.getenv("SWEEP_SEARCH_TYPES", "SEMANTIC,HYBRID").split(",")]
+# The recommended setting is the fastest one within this much reference F1 of the best.
+SWEEP_QUALITY_TOLERANCE = float(os.getenv("SWEEP_QUALITY_TOLERANCE", "0.02"))
 _thread_local = local()
 
 
@@ -29,27 +73,49 @@ def build_client():
     )
 
 
-def ask_agent(client, question: str) -> tuple[str, list[str], list[str]]:
-    response = client.invoke_agent(
-        agentId=AGENT_ID,
-        agentAliasId=AGENT_ALIAS_ID,
-        sessionId=str(uuid.uuid4()),
-        inputText=question,
-        enableTrace=True,
-        streamingConfigurations={"streamFinalResponse": False},
-    )
+def ask_agent(client, question: str, session_state: dict | None = None) -> tuple[str, list[str], list[str]]:
+    events, _ = fetch_agent_events(client, question, session_state)
+    return parse_agent_events(events)
+
+
+def fetch_agent_events(client, question: str, session_state: dict | None = None) -> tuple[list[dict], float | None]:
+    """
+    Return the agent's event stream and the seconds it took to receive it.
+
+    Replayed cassettes return the latency measured when they were recorded
+    (None for cassettes recorded before latency was stored).
+    """
+    if CASSETTE_MODE == "replay":
+        return load_cassette(question, session_state)
 
-    completion = response.get("completion")
-    if not completion:
-        return "", [], []
+    request = {
+        "agentId": AGENT_ID,
+        "agentAliasId": AGENT_ALIAS_ID,
+        "sessionId": str(uuid.uuid4()),
+        "inputText": question,
+        "enableTrace": True,
+        "streamingConfigurations": {"streamFinalResponse": False},
+    }
+    if session_state:
+        request["sessionState"] = session_state
+    started = time.perf_counter()
+    response = client.invoke_agent(**request)
+    events = list(response.get("completion") or [])
+    latency_seconds = time.perf_counter() - started
 
+    if CASSETTE_MODE == "record":
+        save_cassette(question, events, session_state, latency_seconds)
+    return events, latency_seconds
+
+
+def parse_agent_events(events) -> tuple[str, list[str], list[str]]:
     answer_parts = []
     retrieved_documents: list[str] = []
     retrieved_chunks: list[str] = []
     seen_documents: set[str] = set()
     seen_chunks: set[str] = set()
 
-    for event in completion:
+    for event in events:
         if "chunk" in event and "bytes" in event["chunk"]:
             answer_parts.append(event["chunk"]["bytes"].decode("utf-8", errors="replace"))
         elif "trace" in event:
@@ -69,6 +135,69 @@ def ask_agent(client, question: str) -> tuple[str, list[str], list[str]]:
     return "".join(answer_parts).strip(), retrieved_documents, retrieved_chunks
 
 
+def cassette_path(question: str, session_state: dict | None = None) -> str:
+    key = question.strip()
+    # Filtered and unfiltered runs of the same question are different recordings.
+    if session_state:
+        key += "\n" + json.dumps(session_state, sort_keys=True, ensure_ascii=False)
+    question_hash = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return os.path.join(CASSETTE_DIR, AGENT_ALIAS_ID, f"{question_hash}.json.gz")
+
+
+def _encode_event_value(value):
+    if isinstance(value, dict):
+        return {key: _encode_event_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_encode_event_value(item) for item in value]
+    if isinstance(value, bytes):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _decode_event_value(value):
+    if isinstance(value, dict):
+        if set(value) == {"__bytes__"}:
+            return base64.b64decode(value["__bytes__"])
+        return {key: _decode_event_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode_event_value(item) for item in value]
+    return value
+
+
+def save_cassette(
+    question: str,
+    events: list[dict],
+    session_state: dict | None = None,
+    latency_seconds: float | None = None,
+) -> None:
+    path = cassette_path(question, session_state)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = {
+        "agentId": AGENT_ID,
+        "agentAliasId": AGENT_ALIAS_ID,
+        "question": question,
+        "sessionState": session_state,
+        "latencySeconds": latency_seconds,
+        "events": _encode_event_value(events),
+    }
+    # Write to a temp file first so concurrent workers never leave a torn cassette.
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def load_cassette(question: str, session_state: dict | None = None) -> tuple[list[dict], float | None]:
+    path = cassette_path(question, session_state)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No cassette recorded for this question: {path}")
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        payload = json.load(f)
+    return _decode_event_value(payload["events"]), payload.get("latencySeconds")
+
+
 def _looks_like_document_reference(value: str) -> bool:
     lowered = value.lower()
     if lowered.startswith(("s3://", "http://", "https://", "file://", "arn:aws:s3:::")):
@@ -172,15 +301,294 @@ def _extract_retrieved_chunks(trace_payload) -> list[str]:
     return extracted_chunks
 
 
+def reference_categories(events: list[dict]) -> list[list[str]]:
+    """
+    Categories of every knowledge-base reference retrieved for one answer.
+
+    Retrieved references carry the sidecar attributes of their document in
+    their "metadata", so scope precision can be measured without the manifest.
+    """
+    references: dict[str, list[str]] = {}
+
+    def walk(node) -> None:
+        if isinstance(node, dict):
+            metadata = node.get("metadata")
+            if isinstance(metadata, dict) and ("categories" in metadata or "category" in metadata):
+                categories = metadata.get("categories") or metadata.get("category")
+                if not isinstance(categories, list):
+                    categories = [categories]
+                key = json.dumps(node, sort_keys=True, ensure_ascii=False, default=str)
+                references.setdefault(key, [str(category) for category in categories])
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    for event in events:
+        if "trace" in event:
+            walk(event["trace"])
+    return list(references.values())
+
+
+def answer_overlap(answer: str, reference: str) -> float:
+    """Token-level F1 between an answer and a reference answer."""
+    answer_tokens = normalize_question(answer).split()
+    reference_tokens = normalize_question(reference).split()
+    if not answer_tokens or not reference_tokens:
+        return 0.0
+    reference_counts: dict[str, int] = {}
+    for token in reference_tokens:
+        reference_counts[token] = reference_counts.get(token, 0) + 1
+    common = 0
+    for token in answer_tokens:
+        if reference_counts.get(token, 0) > 0:
+            reference_counts[token] -= 1
+            common += 1
+    if not common:
+        return 0.0
+    precision = common / len(answer_tokens)
+    recall = common / len(reference_tokens)
+    return 2 * precision * recall / (precision + recall)
+
+
+def measure_question(question: str, session_state: dict | None, scope: list[str], reference: str | None) -> dict:
+    """Ask one question under one retrieval setting and measure latency, scope precision and answer quality."""
+    try:
+        client = None if CASSETTE_MODE == "replay" else get_thread_client()
+        events, latency_seconds = fetch_agent_events(client, question, session_state)
+    except Exception as exc:
+        # Same columns as a success, so a variant whose every call failed still summarises.
+        return {
+            "latency_seconds": None,
+            "references": None,
+            "scope_precision": None,
+            "reference_f1": None,
+            "answer_characters": None,
+            "answer": None,
+            "documents": None,
+            "error": str(exc),
+        }
+
+    answer, documents, _ = parse_agent_events(events)
+    references = reference_categories(events)
+    in_scope = sum(1 for categories in references if set(categories) & set(scope))
+    return {
+        "latency_seconds": latency_seconds,
+        "references": len(references),
+        "scope_precision": in_scope / len(references) if references and scope else None,
+        "reference_f1": answer_overlap(answer, reference) if reference else None,
+        "answer_characters": len(answer),
+        "answer": answer,
+        "documents": " | ".join(documents),
+        "error": None,
+    }
+
+
+def collect_tasks(df: pd.DataFrame) -> list[tuple[int, str, list[str], str | None]]:
+    """
+    (row, question, scope, reference answer) for every question in the sheet.
+
+    The scope comes from the optional Scope column, else KB_CATEGORIES. The
+    reference is the earlier system answer when it was graded at least
+    REFERENCE_MIN_POINT.
+    """
+    tasks = []
+    for idx, row in df.iterrows():
+        question = row[QUESTION_COLUMN]
+        if pd.isna(question) or not str(question).strip():
+            continue
+        scope = KB_CATEGORIES
+        if SCOPE_COLUMN in df.columns and not pd.isna(row[SCOPE_COLUMN]):
+            scope = [value.strip() for value in str(row[SCOPE_COLUMN]).split(",") if value.strip()]
+        reference = None
+        if REFERENCE_ANSWER_COLUMN in df.columns and REFERENCE_POINT_COLUMN in df.columns:
+            point = pd.to_numeric(row[REFERENCE_POINT_COLUMN], errors="coerce")
+            if not pd.isna(point) and point >= REFERENCE_MIN_POINT and not pd.isna(row[REFERENCE_ANSWER_COLUMN]):
+                reference = str(row[REFERENCE_ANSWER_COLUMN])
+        tasks.append((idx, str(question).strip(), scope, reference))
+    return tasks
+
+
+def run_variants(
+    tasks: list[tuple[int, str, list[str], str | None]],
+    variants: dict[str, Callable[[list[str]], dict | None]],
+) -> pd.DataFrame:
+    """
+    Run every (row, question, scope, reference) task under every named retrieval variant.
+
+    Each variant maps a question's scope to the sessionState to send (None
+    keeps the agent's defaults). Returns one row per task and variant.
+    """
+    jobs = [
+        (variant, idx, question, scope, reference, build(scope))
+        for variant, build in variants.items()
+        for idx, question, scope, reference in tasks
+    ]
+    rows = []
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(measure_question, question, session_state, scope, reference): (
+                variant,
+                idx,
+                question,
+                scope,
+            )
+            for variant, idx, question, scope, reference, session_state in jobs
+        }
+        for future in tqdm.tqdm(as_completed(futures), total=len(futures)):
+            variant, idx, question, scope = futures[future]
+            rows.append({"variant": variant, "row": idx, "question": question, "scope": ", ".join(scope), **future.result()})
+    return pd.DataFrame(rows).sort_values(["variant", "row"], kind="stable").reset_index(drop=True)
+
+
+def summarize_variants(results: pd.DataFrame) -> pd.DataFrame:
+    summary = []
+    for variant, group in results.groupby("variant", sort=False):
+        ok = group[group["error"].isna()]
+        latencies = ok["latency_seconds"].dropna().tolist()
+        precisions = ok["scope_precision"].dropna().tolist()
+        overlaps = ok["reference_f1"].dropna().tolist()
+        summary.append(
+            {
+                "variant": variant,
+                "questions": len(group),
+                "errors": len(group) - len(ok),
+                "latency_mean": round(statistics.fmean(latencies), 3) if latencies else None,
+                "latency_median": round(statistics.median(latencies), 3) if latencies else None,
+                "latency_p90": round(statistics.quantiles(latencies, n=10)[-1], 3) if len(latencies) >= 2 else None,
+                "references_mean": round(ok["references"].mean(), 2) if len(ok) else None,
+                "scope_precision_mean": round(statistics.fmean(precisions), 3) if precisions else None,
+                "reference_f1_mean": round(statistics.fmean(overlaps), 3) if overlaps else None,
+            }
+        )
+    return pd.DataFrame(summary)
+
+
+def run_scope_comparison(df: pd.DataFrame) -> None:
+    """
+    Ask every question with a scope twice: unscoped with the agent defaults,
+    and filtered to its categories with SCOPED_NUMBER_OF_RESULTS chunks.
+
+    A question's scope comes from the optional Scope column, else KB_CATEGORIES.
+    Scope precision is the share of retrieved references inside the scope;
+    answers are kept side by side in the report for manual grading.
+    """
+    if not KNOWLEDGE_BASE_ID:
+        raise ValueError("EVALUATION_MODE=scope needs KNOWLEDGE_BASE_ID.")
+
+    tasks = [task for task in collect_tasks(df) if task[2]]
+    if not tasks:
+        raise ValueError(f"No question has a scope; fill the '{SCOPE_COLUMN}' column or set KB_CATEGORIES.")
+
+    results = run_variants(
+        tasks,
+        {
+            "unscoped": lambda scope: None,
+            "scoped": lambda scope: build_session_state(KNOWLEDGE_BASE_ID, scope, SCOPED_NUMBER_OF_RESULTS),
+        },
+    )
+    summary = summarize_variants(results)
+    with pd.ExcelWriter(SCOPE_REPORT_FILE, engine="openpyxl", mode="w") as writer:
+        summary.to_excel(writer, sheet_name="summary", index=False)
+        results.to_excel(writer, sheet_name="questions", index=False)
+
+    print(summary.to_string(index=False))
+    print(f"Scope comparison for {len(tasks)} questions saved to '{SCOPE_REPORT_FILE}'.")
+
+
+def _add_bar_chart(worksheet, title: str, y_title: str, columns: list[int], rows: int, anchor: str) -> None:
+    from openpyxl.chart import BarChart, Reference
+
+    chart = BarChart()
+    chart.title = title
+    chart.y_axis.title = y_title
+    chart.x_axis.title = "Setting"
+    chart.width, chart.height = 24, 9
+    for column in columns:
+        chart.add_data(Reference(worksheet, min_col=column, min_row=1, max_row=rows + 1), titles_from_data=True)
+    chart.set_categories(Reference(worksheet, min_col=1, min_row=2, max_row=rows + 1))
+    worksheet.add_chart(chart, anchor)
+
+
+def recommend_setting(summary: pd.DataFrame) -> str | None:
+    """Fastest setting whose mean reference F1 is within SWEEP_QUALITY_TOLERANCE of the best."""
+    scored = summary.dropna(subset=["reference_f1_mean", "latency_median"])
+    if scored.empty:
+        return None
+    acceptable = scored[scored["reference_f1_mean"] >= scored["reference_f1_mean"].max() - SWEEP_QUALITY_TOLERANCE]
+    return acceptable.sort_values("latency_median").iloc[0]["variant"]
+
+
+def run_retrieval_sweep(df: pd.DataFrame) -> None:
+    """
+    Ask the question set once with the agent defaults and once per
+    (numberOfResults, search type) pair from SWEEP_NUMBER_OF_RESULTS and
+    SWEEP_SEARCH_TYPES, then chart latency and quality per setting. Every
+    setting, the default included, keeps the question's category scope, so
+    the settings differ only in retrieval depth and search type.
+
+    Quality is the token F1 against graded reference answers, plus scope
+    precision for questions with a scope. Cassettes are keyed by the session
+    state, so every setting records and replays separately.
+    """
+    if not KNOWLEDGE_BASE_ID:
+        raise ValueError("EVALUATION_MODE=sweep needs KNOWLEDGE_BASE_ID.")
+
+    tasks = collect_tasks(df)
+    variants: dict[str, Callable[[list[str]], dict | None]] = {
+        "default": lambda scope: build_session_state(KNOWLEDGE_BASE_ID, scope)
+    }
+    for search_type in SWEEP_SEARCH_TYPES:
+        for number_of_results in SWEEP_NUMBER_OF_RESULTS:
+            variants[f"{search_type} k={number_of_results}"] = (
+                lambda scope, n=number_of_results, t=search_type: build_session_state(KNOWLEDGE_BASE_ID, scope, n, t)
+            )
+    print(f"{len(tasks)} questions x {len(variants)} settings = {len(tasks) * len(variants)} agent calls.")
+
+    results = run_variants(tasks, variants)
+    summary = summarize_variants(results).set_index("variant").loc[list(variants)].reset_index()
+    recommended = recommend_setting(summary)
+
+    with pd.ExcelWriter(SWEEP_REPORT_FILE, engine="openpyxl", mode="w") as writer:
+        summary.to_excel(writer, sheet_name="summary", index=False)
+        results.to_excel(writer, sheet_name="questions", index=False)
+        worksheet = writer.sheets["summary"]
+        column_of = {name: position + 1 for position, name in enumerate(summary.columns)}
+        rows = len(summary)
+        _add_bar_chart(
+            worksheet,
+            "Latency per setting",
+            "Seconds",
+            [column_of["latency_median"], column_of["latency_p90"]],
+            rows,
+            f"A{rows + 4}",
+        )
+        _add_bar_chart(
+            worksheet,
+            "Answer quality per setting",
+            "Score (0-1)",
+            [column_of["reference_f1_mean"], column_of["scope_precision_mean"]],
+            rows,
+            f"A{rows + 24}",
+        )
+
+    print(summary.to_string(index=False))
+    if recommended:
+        print(f"Recommended setting: {recommended} (fastest within {SWEEP_QUALITY_TOLERANCE} reference F1 of the best).")
+    print(f"Retrieval sweep saved to '{SWEEP_REPORT_FILE}'.")
+
+
 def get_thread_client():
     if not hasattr(_thread_local, "client"):
         _thread_local.client = build_client()
     return _thread_local.client
 
 
-def process_question(idx: int, question_text: str) -> tuple[int, str, str, str]:
+def process_question(idx: int, question_text: str, session_state: dict | None = None) -> tuple[int, str, str, str]:
     try:
-        answer, documents, chunks = ask_agent(get_thread_client(), question_text)
+        client = None if CASSETTE_MODE == "replay" else get_thread_client()
+        answer, documents, chunks = ask_agent(client, question_text, session_state)
     except ClientError as exc:
         answer = f"ClientError: {exc}"
         documents = []
@@ -193,16 +601,28 @@ def process_question(idx: int, question_text: str) -> tuple[int, str, str, str]:
 
 
 def main():
+    if CASSETTE_MODE not in ("off", "record", "replay"):
+        raise ValueError(f"Unknown CASSETTE_MODE '{CASSETTE_MODE}'; expected off, record or replay.")
+    if EVALUATION_MODE not in ("answer", "scope", "sweep"):
+        raise ValueError(f"Unknown EVALUATION_MODE '{EVALUATION_MODE}'; expected answer, scope or sweep.")
+
     df = pd.read_excel(INPUT_FILE, sheet_name=SHEET_NAME)
     if QUESTION_COLUMN not in df.columns:
         raise ValueError(f"'{QUESTION_COLUMN}' column not found in '{SHEET_NAME}' sheet.")
+    if EVALUATION_MODE == "scope":
+        run_scope_comparison(df)
+        return
+    if EVALUATION_MODE == "sweep":
+        run_retrieval_sweep(df)
+        return
 
     if ANSWER_COLUMN not in df.columns:
         df[ANSWER_COLUMN] = None
     if RETRIEVED_DOCUMENTS_COLUMN not in df.columns:
         df[RETRIEVED_DOCUMENTS_COLUMN] = None
-    if RETRIEVED_CHUNKS_COLUMN not in df.columns:
-        df[RETRIEVED_CHUNKS_COLUMN] = None
+    for column in (RETRIEVED_CHUNKS_COLUMN, CLUSTER_COLUMN, ANSWER_SOURCE_COLUMN):
+        if column not in df.columns:
+            df[column] = None
 
     pending_tasks: list[tuple[int, str]] = []
     for idx, question in df[QUESTION_COLUMN].items():
@@ -212,20 +632,48 @@ def main():
         if question_text:
             pending_tasks.append((idx, question_text))
 
+    cluster_ids, sources = plan_dispatch(
+        [question_text for _, question_text in pending_tasks],
+        threshold=NEAR_DUPLICATE_THRESHOLD,
+        near_duplicate_sample=NEAR_DUPLICATE_SAMPLE,
+    )
+    dispatch_tasks = [pending_tasks[position] for position in sorted(set(sources))]
+    print(
+        f"{len(pending_tasks)} questions, {len(set(cluster_ids))} clusters, "
+        f"{len(dispatch_tasks)} agent calls."
+    )
+
+    session_state = build_session_state(
+        KNOWLEDGE_BASE_ID, KB_CATEGORIES, SCOPED_NUMBER_OF_RESULTS if KB_CATEGORIES else None
+    )
+    if KB_CATEGORIES and not session_state:
+        raise ValueError("KB_CATEGORIES needs KNOWLEDGE_BASE_ID to build a retrieval filter.")
+
+    results: dict[int, tuple[str, str, str]] = {}
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = [executor.submit(process_question, idx, question_text) for idx, question_text in pending_tasks]
+        futures = [
+            executor.submit(process_question, idx, question_text, session_state)
+            for idx, question_text in dispatch_tasks
+        ]
         for future in tqdm.tqdm(as_completed(futures), total=len(futures)):
             idx, answer, retrieved_documents, retrieved_chunks = future.result()
-            df.at[idx, ANSWER_COLUMN] = answer
-            df.at[idx, RETRIEVED_DOCUMENTS_COLUMN] = retrieved_documents
-            df.at[idx, RETRIEVED_CHUNKS_COLUMN] = retrieved_chunks
+            results[idx] = (answer, retrieved_documents, retrieved_chunks)
+
+    for (idx, _), cluster_id, source in zip(pending_tasks, cluster_ids, sources):
+        source_idx = pending_tasks[source][0]
+        answer, retrieved_documents, retrieved_chunks = results[source_idx]
+        df.at[idx, ANSWER_COLUMN] = answer
+        df.at[idx, RETRIEVED_DOCUMENTS_COLUMN] = retrieved_documents
+        df.at[idx, RETRIEVED_CHUNKS_COLUMN] = retrieved_chunks
+        df.at[idx, CLUSTER_COLUMN] = cluster_id
+        df.at[idx, ANSWER_SOURCE_COLUMN] = source_idx
 
     with pd.ExcelWriter(OUTPUT_FILE, engine="openpyxl", mode="w") as writer:
         df.to_excel(writer, sheet_name=SHEET_NAME, index=False)
 
     print(
         f"Done. Answers saved to '{ANSWER_COLUMN}' in '{OUTPUT_FILE}' "
-        f"using {MAX_WORKERS} parallel workers."
+        f"using {MAX_WORKERS} parallel workers (cassette mode: {CASSETTE_MODE})."
     )
 
 
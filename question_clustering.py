@@ -0,0 +1,77 @@
+from collections import defaultdict
+
+from ttkb_common.near_duplicates import minhash_signature, near_duplicate_roots, normalize_question
+
+SHINGLE_SIZE = 5
+
+
+def question_shingles(normalized: str, size: int = SHINGLE_SIZE) -> set[str]:
+    if len(normalized) <= size:
+        return {normalized}
+    return {normalized[i : i + size] for i in range(len(normalized) - size + 1)}
+
+
+def cluster_questions(questions: list[str], threshold: float = 0.8) -> tuple[list[int], list[int]]:
+    """
+    Group questions into exact-duplicate groups and near-duplicate clusters.
+
+    Exact duplicates share the same normalized text. Near duplicates are found
+    with MinHash/LSH over character shingles and merged when their estimated
+    Jaccard similarity reaches `threshold`.
+
+    Returns:
+        (exact group id per question, cluster id per question), both numbered
+        from 1 in order of first appearance.
+    """
+    group_by_text: dict[str, int] = {}
+    group_ids: list[int] = []
+    group_texts: list[str] = []
+    for question in questions:
+        normalized = normalize_question(question)
+        if normalized not in group_by_text:
+            group_by_text[normalized] = len(group_texts)
+            group_texts.append(normalized)
+        group_ids.append(group_by_text[normalized])
+
+    roots = near_duplicate_roots([minhash_signature(question_shingles(text)) for text in group_texts], threshold)
+
+    cluster_numbers: dict[int, int] = {}
+    cluster_ids = []
+    for group in group_ids:
+        root = roots[group]
+        if root not in cluster_numbers:
+            cluster_numbers[root] = len(cluster_numbers) + 1
+        cluster_ids.append(cluster_numbers[root])
+    return [group + 1 for group in group_ids], cluster_ids
+
+
+def plan_dispatch(
+    questions: list[str],
+    threshold: float = 0.8,
+    near_duplicate_sample: int = 0,
+) -> tuple[list[int], list[int]]:
+    """
+    Decide which questions actually need an agent call.
+
+    Every exact-duplicate group is answered once by its first question. When
+    `near_duplicate_sample` is positive, only that many groups per near-duplicate
+    cluster are dispatched and the rest reuse the cluster's first answer.
+
+    Returns:
+        (cluster id per question, index of the question whose answer each one uses)
+    """
+    group_ids, cluster_ids = cluster_questions(questions, threshold)
+
+    group_representative: dict[int, int] = {}
+    cluster_representatives: dict[int, list[int]] = defaultdict(list)
+    sources = []
+    for idx, (group, cluster) in enumerate(zip(group_ids, cluster_ids)):
+        if group not in group_representative:
+            sampled = cluster_representatives[cluster]
+            if near_duplicate_sample <= 0 or len(sampled) < near_duplicate_sample:
+                sampled.append(idx)
+                group_representative[group] = idx
+            else:
+                group_representative[group] = sampled[0]
+        sources.append(group_representative[group])
+    return cluster_ids, sources
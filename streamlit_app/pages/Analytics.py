@@ -0,0 +1,76 @@
+import json
+from pathlib import Path
+
+import boto3
+import pandas as pd
+import streamlit as st
+
+# Written by feedback_analytics.py (or get_feedback_results.py with ANALYTICS_DIR set).
+LOCAL_VIEWS_PATH = Path(__file__).resolve().parents[2] / "feedback_analytics" / "views.json"
+
+
+@st.cache_data(ttl=300)
+def load_views() -> dict | None:
+    try:
+        s3_uri = st.secrets["analytics"]["s3_uri"]
+    except Exception:
+        s3_uri = None
+
+    if s3_uri:
+        bucket, key = s3_uri[len("s3://") :].split("/", 1)
+        s3_client = boto3.client(
+            service_name="s3",
+            region_name=st.secrets["aws"]["region"],
+            aws_access_key_id=st.secrets["aws"]["access_key_id"],
+            aws_secret_access_key=st.secrets["aws"]["secret_access_key"],
+        )
+        body = s3_client.get_object(Bucket=bucket, Key=key)["Body"].read()
+        return json.loads(body)
+
+    if LOCAL_VIEWS_PATH.exists():
+        return json.loads(LOCAL_VIEWS_PATH.read_text(encoding="utf-8"))
+    return None
+
+
+st.set_page_config(page_title="Analytics", page_icon="📊", layout="wide")
+
+if not st.session_state.get("authenticated"):
+    st.error("Bu sayfayı görüntülemek için ana sayfadan giriş yapınız.")
+    st.stop()
+
+st.title("Geri Bildirim Analizi")
+
+views = load_views()
+if not views:
+    st.info("Henüz hesaplanmış analiz bulunamadı.")
+    st.stop()
+
+st.caption(f"Son güncelleme: {views['generated_at']}")
+
+totals = views["totals"]
+col_answers, col_scored, col_average = st.columns(3)
+col_answers.metric("Cevap", totals["answers"])
+col_scored.metric("Puanlanan", totals["scored"])
+col_average.metric("Ortalama puan", totals["average_point"] if totals["average_point"] is not None else "-")
+
+st.subheader("Puan dağılımı")
+if views["score_distribution"]:
+    st.bar_chart(pd.DataFrame(views["score_distribution"]).set_index("point")["count"])
+
+st.subheader("Haftalık ortalama puan")
+if views["weeks"]:
+    st.line_chart(pd.DataFrame(views["weeks"]).set_index("week")[["average_point"]])
+
+st.subheader("Günlük cevap sayısı")
+if views["days"]:
+    st.bar_chart(pd.DataFrame(views["days"]).set_index("day")["answers"])
+
+low_score_threshold = views["low_score_threshold"]
+st.subheader(f"Düşük puanlı cevaplarda geçen belgeler (puan ≤ {low_score_threshold})")
+st.dataframe(pd.DataFrame(views["documents"]), use_container_width=True)
+
+st.subheader(f"Düşük puanlı cevaplarda geçen metinler (puan ≤ {low_score_threshold})")
+st.dataframe(pd.DataFrame(views["chunks"]), use_container_width=True)
+
+st.subheader("Kullanıcı bazında cevap sayısı")
+st.dataframe(pd.DataFrame(views["users"]), use_container_width=True)
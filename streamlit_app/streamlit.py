@@ -1,12 +1,19 @@
 import uuid
 import hmac
 import hashlib
+import json
 from datetime import datetime, timezone
+from pathlib import Path
 import streamlit as st
 import boto3
 import logging
 from botocore.exceptions import ClientError
 
+# The evaluation harness sends the same retrieval filters as the app, and the
+# categories offered are the ones the knowledge-base sidecars carry.
+from ttkb_common.categories import category_for
+from ttkb_common.retrieval import build_session_state
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -24,6 +31,39 @@ NO_FEEDBACK_MESSAGES = {
     "Lütfen ilgili kapsamda sorunuzu giriniz.",
     "Chat cleared. How can I help?",
 }
+ALL_SCOPE = "Tümü"
+# Written by data_eng/extract_links/scraper_ec2.py.
+SCRAPE_MANIFEST_PATH = Path(__file__).resolve().parents[1] / "ttkb_mevzuat_full_data.json"
+# A scoped search covers a fraction of the corpus, so fewer chunks are enough.
+DEFAULT_SCOPED_NUMBER_OF_RESULTS = 5
+
+
+def _get_knowledge_base_id():
+    try:
+        return st.secrets["knowledge_base"]["id"]
+    except Exception:
+        return None
+
+
+def _get_scoped_number_of_results() -> int:
+    try:
+        return int(st.secrets["knowledge_base"]["scoped_number_of_results"])
+    except Exception:
+        return DEFAULT_SCOPED_NUMBER_OF_RESULTS
+
+
+@st.cache_data(ttl=3600)
+def load_category_tree() -> dict[str, int]:
+    """Document count per menu category (the level under "Mevzuat - KYS") in the scrape manifest."""
+    if not SCRAPE_MANIFEST_PATH.exists():
+        return {}
+    entries = json.loads(SCRAPE_MANIFEST_PATH.read_text(encoding="utf-8"))
+    tree: dict[str, int] = {}
+    for entry in entries:
+        category = category_for(entry.get("path_list") or [])
+        tree[category] = tree.get(category, 0) + 1
+    return tree
+
 
 def _get_user_store():
     try:
@@ -68,6 +108,11 @@ def check_password() -> bool:
 def init_chat_state() -> None:
     if "session_id" not in st.session_state:
         st.session_state.session_id = str(uuid.uuid4())
+    if "kb_categories" not in st.session_state:
+        try:
+            st.session_state.kb_categories = list(st.secrets["knowledge_base"]["default_categories"])
+        except Exception:
+            st.session_state.kb_categories = []
     if "messages" not in st.session_state:
         st.session_state.messages = [
             {
@@ -245,6 +290,9 @@ def _save_answer_to_dynamodb(
                 "sessionId": session_id,
                 "messageId": assistant_message_id,
                 "answerTimestamp": timestamp,
+                # updatedDate/updatedAt back the index incremental feedback exports query.
+                "updatedAt": timestamp,
+                "updatedDate": timestamp[:10],
                 "username": username or "anonymous",
                 "userQuestion": user_prompt,
                 "modelAnswer": assistant_answer,
@@ -263,6 +311,8 @@ def _save_feedback_to_dynamodb(
     point: int,
     feedback_note: str,
 ) -> None:
+    updated_at = datetime.now(timezone.utc).isoformat()
+
     try:
         dynamodb = boto3.resource(
             service_name="dynamodb",
@@ -273,16 +323,22 @@ def _save_feedback_to_dynamodb(
         table = dynamodb.Table(DYNAMODB_TABLE_NAME)
         table.update_item(
             Key={"sessionId": session_id, "messageId": message_id},
-            UpdateExpression="SET #point = :point, #feedbackNote = :feedback_note, #feedbackUpdatedAt = :feedback_updated_at",
+            UpdateExpression=(
+                "SET #point = :point, #feedbackNote = :feedback_note, #feedbackUpdatedAt = :feedback_updated_at, "
+                "#updatedAt = :feedback_updated_at, #updatedDate = :updated_date"
+            ),
             ExpressionAttributeNames={
                 "#point": "point",
                 "#feedbackNote": "feedbackNote",
                 "#feedbackUpdatedAt": "feedbackUpdatedAt",
+                "#updatedAt": "updatedAt",
+                "#updatedDate": "updatedDate",
             },
             ExpressionAttributeValues={
                 ":point": point,
                 ":feedback_note": feedback_note,
-                ":feedback_updated_at": datetime.now(timezone.utc).isoformat(),
+                ":feedback_updated_at": updated_at,
+                ":updated_date": updated_at[:10],
             },
         )
     except Exception:
@@ -291,14 +347,23 @@ def _save_feedback_to_dynamodb(
 
 def stream_agent_response(prompt: str):
     try:
-        response = client.invoke_agent(
-            agentId=AGENT_ID,
-            agentAliasId=AGENT_ALIAS_ID,
-            sessionId=st.session_state.session_id,
-            inputText=prompt,
-            enableTrace=True,
-            streamingConfigurations={"streamFinalResponse": True},
+        request = {
+            "agentId": AGENT_ID,
+            "agentAliasId": AGENT_ALIAS_ID,
+            "sessionId": st.session_state.session_id,
+            "inputText": prompt,
+            "enableTrace": True,
+            "streamingConfigurations": {"streamFinalResponse": True},
+        }
+        categories = st.session_state.get("kb_categories", [])
+        session_state = build_session_state(
+            _get_knowledge_base_id(),
+            categories,
+            _get_scoped_number_of_results() if categories else None,
         )
+        if session_state:
+            request["sessionState"] = session_state
+        response = client.invoke_agent(**request)
 
         # The 'completion' key contains the EventStream
         event_stream = response.get("completion")
@@ -353,6 +418,19 @@ with st.sidebar:
             }
         ]
 
+    category_tree = load_category_tree()
+    if _get_knowledge_base_id() and category_tree:
+        scopes = [ALL_SCOPE, *category_tree]
+        current_scope = next((c for c in st.session_state.kb_categories if c in category_tree), ALL_SCOPE)
+        scope = st.radio(
+            "Arama kapsamı",
+            scopes,
+            index=scopes.index(current_scope),
+            format_func=lambda option: option if option == ALL_SCOPE else f"{option} ({category_tree[option]})",
+            help="Sorunuzun ilgili olduğu bölümü seçerseniz yalnızca o bölümdeki belgelerde arama yapılır.",
+        )
+        st.session_state.kb_categories = [] if scope == ALL_SCOPE else [scope]
+
 for message_idx, message in enumerate(st.session_state.messages):
     with st.chat_message(message["role"]):
         st.markdown(message["content"])
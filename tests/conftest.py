@@ -0,0 +1,13 @@
+import os
+import sys
+
+# The scripts import their siblings by module name, as when run from their own folder.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ("", "data_eng/extract_links", "data_eng/silver_to_gold"):
+    path = os.path.join(ROOT, folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
@@ -0,0 +1,71 @@
+import json
+import threading
+
+import pytest
+
+pytest.importorskip("selenium")
+
+import browser_pool
+from selenium.common.exceptions import SessionNotCreatedException
+
+
+class _FakeDriver:
+    def __init__(self, path):
+        self.path = path
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def driver_cache(tmp_path, monkeypatch):
+    cache_file = tmp_path / "chromedriver.json"
+    old = tmp_path / "old-chromedriver"
+    old.write_text("")
+    cache_file.write_text(json.dumps({"path": str(old)}))
+    monkeypatch.setattr(browser_pool, "DRIVER_CACHE_FILE", str(cache_file))
+    monkeypatch.setattr(browser_pool, "_driver_path", None)
+    monkeypatch.delenv("CHROMEDRIVER_PATH", raising=False)
+    chrome_manager = pytest.importorskip("webdriver_manager.chrome")
+    installs = []
+
+    class _Manager:
+        def install(self):
+            installs.append(1)
+            return str(tmp_path / "new-chromedriver")
+
+    monkeypatch.setattr(chrome_manager, "ChromeDriverManager", _Manager)
+    return cache_file, str(old), installs
+
+
+def test_incompatible_cached_driver_is_reinstalled_once(driver_cache, monkeypatch):
+    cache_file, old, installs = driver_cache
+
+    def chrome(service, options):
+        if service.path == old:
+            raise SessionNotCreatedException("This version of ChromeDriver only supports Chrome version 120")
+        return _FakeDriver(service.path)
+
+    monkeypatch.setattr(browser_pool.webdriver, "Chrome", chrome)
+    with browser_pool.BrowserPool(size=3) as pool:
+        assert {driver.path for driver in pool.drivers} == {json.loads(cache_file.read_text())["path"]}
+    assert len(installs) == 1
+
+
+def test_pool_quits_started_drivers_when_one_fails(monkeypatch):
+    monkeypatch.setattr(browser_pool, "_driver_path", "/usr/bin/chromedriver")
+    started = []
+    lock = threading.Lock()
+
+    def new_driver(headless):
+        with lock:
+            if len(started) == 2:
+                raise RuntimeError("chrome crashed")
+            started.append(_FakeDriver("/usr/bin/chromedriver"))
+            return started[-1]
+
+    monkeypatch.setattr(browser_pool, "new_driver", new_driver)
+    with pytest.raises(RuntimeError, match="chrome crashed"):
+        browser_pool.BrowserPool(size=3)
+    assert len(started) == 2 and all(driver.quit_called for driver in started)
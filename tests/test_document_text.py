@@ -0,0 +1,105 @@
+import io
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import boto3
+import pytest
+from moto import mock_aws
+
+pytest.importorskip("pypdf")
+docx = pytest.importorskip("docx")
+
+import prepare_for_gold
+from document_text import transform_document
+
+BUCKET = "gold-test"
+ARTICLES = ("MADDE 1 Bu yönergenin amacı denklik işlemlerini düzenlemektir.", "MADDE 2 Yürürlük tarihi.")
+# An OLE2 header is all detect_format needs to route a body to the DOC extractor.
+LEGACY_DOC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + b"\x00" * 504
+
+
+def _pdf(lines):
+    """A one-page PDF whose text layer holds `lines` (ASCII only, base-14 font)."""
+    stream = b"BT /F1 12 Tf 72 720 Td 14 TL " + b" ".join(b"(%s) '" % line.encode() for line in lines) + b" ET"
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R"
+        b" /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    out.write(b"".join(b"%010d 00000 n \n" % offset for offset in offsets))
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def _docx(paragraphs):
+    document = docx.Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def test_pdf_and_docx_are_chunked_in_worker_processes(tmp_path):
+    # Large objects reach the pool as spooled paths, small ones as bytes.
+    spooled = tmp_path / "spooled.docx"
+    spooled.write_bytes(_docx(ARTICLES))
+    metadata = {"url": "https://ttkb.meb.gov.tr/y.pdf", "path_list": ["Mevzuat - KYS", "TTKB Mevzuatı"]}
+    pdf_lines = ("MADDE 1 Bu yonergenin amaci denklik islemlerini duzenlemektir.", "MADDE 2 Yururluk tarihi.")
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        pdf = pool.submit(transform_document, "silver/y.pdf", _pdf(pdf_lines), metadata, 40, 1).result()
+        document = pool.submit(transform_document, "silver/y.docx", str(spooled), None, 40, 1).result()
+
+    assert pdf[1] == document[1] == "application/x-ndjson; charset=utf-8"
+    assert (pdf[2], document[2]) == ("PDF", "DOCX")
+    pdf_chunks = [json.loads(line) for line in pdf[0].decode("utf-8").splitlines()]
+    docx_chunks = [json.loads(line) for line in document[0].decode("utf-8").splitlines()]
+    assert " ".join(chunk["text"] for chunk in pdf_chunks) == " ".join(pdf_lines)
+    assert " ".join(chunk["text"] for chunk in docx_chunks) == " ".join(ARTICLES)
+    assert [chunk["heading"] for chunk in docx_chunks] == ["MADDE 1", "MADDE 1", "MADDE 2"]
+    assert all(chunk["path_list"] == metadata["path_list"] for chunk in pdf_chunks)
+
+
+def test_legacy_doc_without_antiword_is_skipped_and_logged(tmp_path, monkeypatch, caplog):
+    # No antiword or catdoc on PATH; the pool's processes start with this environment.
+    monkeypatch.setenv("PATH", str(tmp_path))
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket=BUCKET)
+        s3.put_object(Bucket=BUCKET, Key="silver/yonerge.docx", Body=_docx(ARTICLES))
+        s3.put_object(Bucket=BUCKET, Key="silver/eski.doc", Body=LEGACY_DOC)
+
+        def run():
+            return prepare_for_gold.process_bucket(
+                BUCKET,
+                "silver/",
+                "gold/",
+                parse_processes=1,
+                manifest_key="manifests/test_gold_manifest.json",
+                scrape_manifest_key=None,
+            )
+
+        with caplog.at_level(logging.WARNING):
+            summary = run()
+        gold = [item["Key"] for item in s3.list_objects_v2(Bucket=BUCKET, Prefix="gold/")["Contents"]]
+
+        assert (summary["objects"], summary["failed"], summary["unparsed"]) == (1, 0, 1)
+        assert "antiword" in summary["unparsed_keys"]["silver/eski.doc"]
+        assert "Skipped silver/eski.doc" in caplog.text
+        assert gold == ["gold/yonerge.docx.jsonl"]
+        # Not recorded as done: a later run retries it.
+        again = run()
+        assert (again["skipped"], again["unparsed"]) == (1, 1)
@@ -0,0 +1,168 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import boto3
+import pytest
+from boto3.s3.transfer import TransferConfig
+from moto import mock_aws
+
+from download_documents import LocalDestination, RunState, S3Destination, download_documents, select_from_delta
+from http_cache import HttpCache
+from http_fetcher import PoliteFetcher
+from legislation_chunker import silver_name_for_url
+from manifest_diff import diff_manifests
+
+PDF = b"%PDF-1.4 fixture body"
+LIMIT = 64 * 1024
+
+
+class _Handler(BaseHTTPRequestHandler):
+    hits: dict = {}
+
+    def do_GET(self):
+        _Handler.hits[self.path] = _Handler.hits.get(self.path, 0) + 1
+        if self.path == "/doc.pdf":
+            self.send_response(200)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", str(len(PDF)))
+            self.end_headers()
+            self.wfile.write(PDF)
+        elif self.path == "/declared.pdf":
+            self.send_response(200)
+            self.send_header("Content-Length", str(LIMIT * 4))
+            self.end_headers()
+            self.wfile.write(b"%PDF" + b"0" * (LIMIT * 4 - 4))
+        elif self.path == "/undeclared.pdf":
+            # No Content-Length: only the streamed byte count can stop it.
+            self.send_response(200)
+            self.end_headers()
+            try:
+                self.wfile.write(b"%PDF" + b"0" * (LIMIT * 4))
+            except OSError:
+                pass
+            self.close_connection = True
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.hits = {}
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _run(base, destination, tmp_path, paths, run_id="run"):
+    fetcher = PoliteFetcher(rate_per_host=0, max_attempts=1)
+    try:
+        return download_documents(
+            [{"url": f"{base}{path}", "data_type": "PDF"} for path in paths],
+            destination,
+            fetcher,
+            HttpCache(str(tmp_path / "cache")),
+            RunState(str(tmp_path / "runs"), run_id),
+            workers=2,
+            max_bytes=LIMIT,
+        )
+    finally:
+        fetcher.close()
+
+
+def test_resume_refetches_documents_missing_at_the_destination(server, tmp_path):
+    destination = LocalDestination(str(tmp_path / "silver"))
+    assert _run(server, destination, tmp_path, ["/doc.pdf"])["downloaded"] == 1
+    assert _run(server, destination, tmp_path, ["/doc.pdf"])["resumed"] == 1
+    assert _Handler.hits["/doc.pdf"] == 1
+
+    (tmp_path / "silver" / silver_name_for_url(f"{server}/doc.pdf", "PDF")).unlink()
+    summary = _run(server, destination, tmp_path, ["/doc.pdf"])
+    assert summary["resumed"] == 0 and summary["downloaded"] == 1
+    assert (tmp_path / "silver" / silver_name_for_url(f"{server}/doc.pdf", "PDF")).read_bytes() == PDF
+
+
+def test_resume_checks_s3_objects(server, tmp_path):
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket="silver-test")
+        destination = S3Destination(s3, "silver-test", "silver/", TransferConfig())
+        assert _run(server, destination, tmp_path, ["/doc.pdf"])["downloaded"] == 1
+
+        key = f"silver/{silver_name_for_url(f'{server}/doc.pdf', 'PDF')}"
+        assert s3.get_object(Bucket="silver-test", Key=key)["Body"].read() == PDF
+        assert _run(server, destination, tmp_path, ["/doc.pdf"])["resumed"] == 1
+
+        s3.delete_object(Bucket="silver-test", Key=key)
+        assert _run(server, destination, tmp_path, ["/doc.pdf"])["downloaded"] == 1
+
+
+def test_oversized_bodies_are_abandoned(server, tmp_path):
+    destination = LocalDestination(str(tmp_path / "silver"))
+    summary = _run(server, destination, tmp_path, ["/declared.pdf", "/undeclared.pdf"])
+
+    assert summary["failed"] == 2
+    assert "exceeds limit" in summary["failures"][f"{server}/declared.pdf"]
+    assert f"more than {LIMIT} bytes" in summary["failures"][f"{server}/undeclared.pdf"]
+    assert list((tmp_path / "silver").iterdir()) == []
+    assert not [path for path in (tmp_path / "cache").rglob("*") if path.is_file()]
+
+
+def test_delta_selects_added_and_changed_documents_and_removes_dropped_ones(tmp_path):
+    def record(url, sha="a", path=("Mevzuat",)):
+        return {"url": url, "data_type": "PDF", "title": url, "path_list": list(path), "content_sha256": sha}
+
+    previous = [
+        record("https://x/kept.pdf"),
+        record("https://x/changed.pdf"),
+        record("https://x/gone.pdf"),
+        record("https://x/moved.pdf"),
+    ]
+    current = [
+        record("https://x/kept.pdf"),
+        record("https://x/changed.pdf", sha="b"),
+        record("https://x/new.pdf"),
+        record("https://x/moved.pdf", path=("Mevzuat", "Yönetmelikler")),
+        {"url": "https://x/page", "data_type": "HTML", "title": "page", "path_list": []},
+    ]
+
+    fetch, remove = select_from_delta(current, diff_manifests(previous, current), ("PDF",))
+    assert sorted(doc["url"] for doc in fetch) == ["https://x/changed.pdf", "https://x/new.pdf"]
+    assert [doc["url"] for doc in remove] == ["https://x/gone.pdf"]
+
+    destination = LocalDestination(str(tmp_path))
+    gone = tmp_path / silver_name_for_url("https://x/gone.pdf", "PDF")
+    gone.write_bytes(PDF)
+    destination.delete(gone.name)
+    destination.delete(gone.name)
+    assert not gone.exists()
+
+
+def test_s3_destination_uploads_with_the_transfer_config(tmp_path):
+    calls = []
+
+    class Client:
+        def upload_file(self, path, bucket, key, ExtraArgs=None, Config=None):
+            calls.append((path, bucket, key, ExtraArgs, Config))
+
+    config = TransferConfig(multipart_threshold=8 * 1024 * 1024, max_concurrency=3)
+    body = tmp_path / "body"
+    body.write_bytes(PDF)
+    S3Destination(Client(), "silver-test", "silver/", config).write(
+        "a.pdf", str(body), "application/pdf", "abc", "https://x/a.pdf"
+    )
+
+    assert calls == [
+        (
+            str(body),
+            "silver-test",
+            "silver/a.pdf",
+            {"ContentType": "application/pdf", "Metadata": {"sha256": "abc", "source-url": "https://x/a.pdf"}},
+            config,
+        )
+    ]
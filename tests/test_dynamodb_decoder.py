@@ -0,0 +1,78 @@
+import math
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+from boto3.dynamodb.types import Binary, TypeDeserializer
+
+from dynamodb_decoder import decode_item, items_to_frame
+
+_deserializer = TypeDeserializer()
+
+# One item per shape; the fast path handles the first group, the rest fall back.
+FAST_ITEMS = [
+    {"sessionId": {"S": "s1"}, "messageId": {"S": "m1"}, "userQuestion": {"S": "Öğretmen izni kaç gün?"}},
+    {"sessionId": {"S": "s1"}, "messageId": {"S": "m2"}, "point": {"N": "7"}, "feedbackNote": {"NULL": True}},
+    {"sessionId": {"S": "s2"}, "messageId": {"S": "m3"}, "point": {"N": "2.50"}, "archived": {"BOOL": False}},
+    {"sessionId": {"S": "s2"}, "messageId": {"S": "m4"}, "point": {"N": "-1E+2"}, "consultedDocuments": {"L": []}},
+    {"sessionId": {"S": "s3"}, "messageId": {"S": "m5"}, "consultedDocuments": {"L": [{"S": "a.pdf"}, {"S": "b"}]}},
+    {"sessionId": {"S": "s3"}, "messageId": {"S": "m6"}, "point": {"N": "4.0"}},
+    # Missing attributes: only the key.
+    {"sessionId": {"S": "s3"}, "messageId": {"S": "m7"}},
+]
+FALLBACK_ITEMS = [
+    {"sessionId": {"S": "s4"}, "messageId": {"S": "m8"}, "retrievedChunks": {"L": [{"S": "x"}, {"N": "3"}]}},
+    {"sessionId": {"S": "s4"}, "messageId": {"S": "m9"}, "extra": {"M": {"source": {"S": "legacy"}, "n": {"N": "1"}}}},
+    {"sessionId": {"S": "s5"}, "messageId": {"S": "m10"}, "tags": {"SS": ["a", "b"]}, "scores": {"NS": ["1", "2.5"]}},
+    {"sessionId": {"S": "s5"}, "messageId": {"S": "m11"}, "blob": {"B": b"\x00\x01"}, "ok": {"BOOL": True}},
+]
+
+
+def _plain(value):
+    """Generic and fast output compared by value: Decimal as its number, Binary as bytes."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, Binary):
+        return value.value
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if isinstance(value, set):
+        return {_plain(item) for item in value}
+    return value
+
+
+def _generic(raw_item):
+    return {key: _deserializer.deserialize(value) for key, value in raw_item.items()}
+
+
+@pytest.mark.parametrize("raw_item", FAST_ITEMS + FALLBACK_ITEMS, ids=lambda item: item["messageId"]["S"])
+def test_decoded_item_matches_type_deserializer(raw_item):
+    decoded = decode_item(raw_item)
+    expected = _plain(_generic(raw_item))
+
+    assert _plain(decoded) == expected
+    # Same Python types as well as equal values (4 == 4.0 would hide an int/float mix-up).
+    assert {key: type(value) for key, value in _plain(decoded).items()} == {
+        key: type(value) for key, value in expected.items()
+    }
+
+
+def _normalized(frame):
+    # Column order and the missing-value marker (None or NaN) are not part of the data.
+    def cell(value):
+        return None if isinstance(value, float) and math.isnan(value) else _plain(value)
+
+    return {column: [cell(value) for value in frame[column]] for column in frame.columns}
+
+
+@pytest.mark.parametrize("raw_items", [FAST_ITEMS, FAST_ITEMS + FALLBACK_ITEMS], ids=["fast", "fallback"])
+def test_frame_matches_type_deserializer_frame(raw_items):
+    expected = pd.json_normalize([_generic(raw_item) for raw_item in raw_items])
+
+    assert _normalized(items_to_frame(raw_items)) == _normalized(expected)
+
+
+def test_empty_batch_gives_an_empty_frame():
+    assert items_to_frame([]).empty
@@ -0,0 +1,65 @@
+import gzip
+import io
+import json
+import time
+
+import pytest
+
+from dynamodb_export_reader import _iter_json_values, iter_raw_items, read_export_frame
+
+# Strings holding brackets, quotes and backslashes, so a cut can land inside any of them.
+RECORDS = [
+    {"Item": {"sessionId": {"S": "s1"}, "messageId": {"S": "m1"}, "userQuestion": {"S": 'İzin {gün} "kaç" [?]'}}},
+    {"Item": {"sessionId": {"S": "s1"}, "messageId": {"S": "m2"}, "modelAnswer": {"S": "C:\\yol\\ \\\" } ]"}}},
+    {"Item": {"sessionId": {"S": "s2"}, "messageId": {"S": "m3"}, "consultedDocuments": {"L": [{"S": "a.pdf"}]}}},
+]
+
+
+def _jsonl(records):
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 16, 1 << 16])
+@pytest.mark.parametrize(
+    "text",
+    [_jsonl(RECORDS), json.dumps(RECORDS, ensure_ascii=False, indent=1)],
+    ids=["jsonl", "array"],
+)
+def test_records_split_across_chunk_boundaries(text, chunk_size):
+    assert list(_iter_json_values(io.StringIO(text), chunk_size)) == RECORDS
+
+
+def test_truncated_record_raises():
+    text = _jsonl(RECORDS)[:-10]
+    with pytest.raises(json.JSONDecodeError):
+        list(_iter_json_values(io.StringIO(text), 8))
+
+
+def test_gzip_jsonl_and_plain_array_files(tmp_path):
+    export = tmp_path / "export"
+    export.mkdir()
+    with gzip.open(export / "part-0.json.gz", "wt", encoding="utf-8") as f:
+        f.write(_jsonl(RECORDS[:2]))
+    # A console dump like test.json: an array of {"M": ...} records.
+    (export / "part-1.json").write_text(json.dumps([{"M": RECORDS[2]["Item"]}]), encoding="utf-8")
+    (export / "manifest-summary.md").write_text("not an export", encoding="utf-8")
+
+    items = list(iter_raw_items([str(export)]))
+
+    assert items == [record["Item"] for record in RECORDS]
+    frame = read_export_frame([str(export)], batch_size=2)
+    assert list(frame["messageId"]) == ["m1", "m2", "m3"]
+
+
+def test_long_record_is_scanned_once():
+    # About 4 MB in one record, read 1 KB at a time: re-decoding the partial
+    # record on every chunk would rescan megabytes thousands of times.
+    long_answer = 'Öğretmenlere yıllık izin yirmi gündür. {"madde": [7, "\\\\"]} ' * 70_000
+    record = {"Item": {"messageId": {"S": "long"}, "modelAnswer": {"S": long_answer}}}
+    text = _jsonl([RECORDS[0], record, RECORDS[1]])
+
+    started = time.perf_counter()
+    values = list(_iter_json_values(io.StringIO(text), 1024))
+
+    assert values == [RECORDS[0], record, RECORDS[1]]
+    assert time.perf_counter() - started < 5
@@ -0,0 +1,99 @@
+import json
+
+from feedback_analytics import STATE_FILE, _empty_state, apply_items, build_views, load_state, update_analytics
+
+CHUNK_A = "MADDE 7 – (1) Öğretmenlere her yıl yirmi gün yıllık izin verilir. " * 5
+CHUNK_B = "MADDE 12 – (1) Rehberlik hizmetleri okul rehberlik servisince yürütülür. " * 5
+CHUNK_C = "MADDE 3 – (1) Bu Yönerge yayımı tarihinde yürürlüğe girer."
+
+
+def _answer(message_id, day, username, documents, chunks, point=None):
+    item = {
+        "sessionId": "s1",
+        "messageId": message_id,
+        "answerTimestamp": f"{day}T10:00:00+00:00",
+        "username": username,
+        "consultedDocuments": documents,
+        "retrievedChunks": chunks,
+    }
+    if point is not None:
+        item["point"] = point
+    return item
+
+
+# Each run holds what the export fetched: new answers, and answers whose feedback changed.
+RUNS = [
+    [
+        _answer("m1", "2026-01-05", "ayse", ["izin.pdf"], [CHUNK_A]),
+        _answer("m2", "2026-01-05", "mehmet", ["rehberlik.pdf"], [CHUNK_B, CHUNK_C]),
+    ],
+    [
+        _answer("m1", "2026-01-05", "ayse", ["izin.pdf"], [CHUNK_A], point=3),
+        _answer("m3", "2026-01-12", "ayse", ["izin.pdf", "rehberlik.pdf"], [CHUNK_A, CHUNK_B], point=9),
+    ],
+    [
+        # Feedback revised upwards, and the only answer citing CHUNK_C re-scored.
+        _answer("m1", "2026-01-05", "ayse", ["izin.pdf"], [CHUNK_A], point=8),
+        _answer("m2", "2026-01-05", "mehmet", ["rehberlik.pdf"], [CHUNK_B, CHUNK_C], point=2.5),
+        _answer("m3", "2026-01-12", "ayse", ["izin.pdf", "rehberlik.pdf"], [CHUNK_A, CHUNK_B], point=9),
+    ],
+]
+
+
+def _latest(runs):
+    latest = {}
+    for run in runs:
+        for item in run:
+            latest[item["messageId"]] = item
+    return list(latest.values())
+
+
+def _without_timestamp(views):
+    return {key: value for key, value in views.items() if key != "generated_at"}
+
+
+def test_incremental_runs_match_a_full_recompute(tmp_path):
+    analytics_dir = str(tmp_path / "analytics")
+    for run in RUNS:
+        views = update_analytics(analytics_dir, run)
+
+    full = _empty_state()
+    apply_items(full, _latest(RUNS))
+
+    assert load_state(analytics_dir) == json.loads(json.dumps(full))
+    assert _without_timestamp(views) == _without_timestamp(build_views(full))
+    assert views["totals"] == {"answers": 3, "scored": 3, "average_point": 6.5}
+    assert {row["chunk"]: row["answers"] for row in views["chunks"]} == {
+        CHUNK_A[:160]: 2,
+        CHUNK_B[:160]: 2,
+        CHUNK_C[:160]: 1,
+    }
+
+
+def test_state_stores_chunk_text_once_per_chunk(tmp_path):
+    analytics_dir = tmp_path / "analytics"
+    update_analytics(str(analytics_dir), _latest(RUNS))
+
+    state = json.loads((analytics_dir / STATE_FILE).read_text(encoding="utf-8"))
+    contributions = json.dumps(state["contributions"], ensure_ascii=False)
+    assert "MADDE" not in contributions
+    assert all(len(chunk) == 40 for contribution in state["contributions"].values() for chunk in contribution["chunks"])
+    assert sorted(stats["preview"] for stats in state["chunks"].values()) == sorted(
+        chunk[:160] for chunk in (CHUNK_A, CHUNK_B, CHUNK_C)
+    )
+
+
+def test_state_written_with_chunk_previews_per_contribution_still_updates(tmp_path):
+    analytics_dir = tmp_path / "analytics"
+    update_analytics(str(analytics_dir), RUNS[0])
+    # The earlier layout kept {hash: preview} in every contribution.
+    state = json.loads((analytics_dir / STATE_FILE).read_text(encoding="utf-8"))
+    for contribution in state["contributions"].values():
+        contribution["chunks"] = {chunk: state["chunks"][chunk]["preview"] for chunk in contribution["chunks"]}
+    (analytics_dir / STATE_FILE).write_text(json.dumps(state), encoding="utf-8")
+
+    views = update_analytics(str(analytics_dir), RUNS[1] + RUNS[2])
+
+    full = _empty_state()
+    apply_items(full, _latest(RUNS))
+    assert _without_timestamp(views) == _without_timestamp(build_views(full))
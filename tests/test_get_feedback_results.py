@@ -0,0 +1,217 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from feedback_store import load_watermark, read_store
+from get_feedback_results import (
+    UPDATED_AT_INDEX_NAME,
+    export_incremental,
+    export_table_stream,
+    fetch_items_updated_since,
+    scan_table_items,
+)
+
+TABLE = "feedback-test"
+
+
+def _item(message_id: str, point: str) -> dict:
+    return {
+        "sessionId": {"S": "s1"},
+        "messageId": {"S": message_id},
+        "userQuestion": {"S": f"soru {message_id}"},
+        "consultedDocuments": {"L": [{"S": "a.pdf"}]},
+        "point": {"N": point},
+    }
+
+
+@pytest.fixture
+def table():
+    with mock_aws():
+        client = boto3.client("dynamodb", region_name="us-east-1")
+        client.create_table(
+            TableName=TABLE,
+            KeySchema=[{"AttributeName": "sessionId", "KeyType": "HASH"}, {"AttributeName": "messageId", "KeyType": "RANGE"}],
+            AttributeDefinitions=[
+                {"AttributeName": "sessionId", "AttributeType": "S"},
+                {"AttributeName": "messageId", "AttributeType": "S"},
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        yield client
+
+
+def test_parquet_export_coerces_point_from_every_decoder_path(table, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    table.put_item(TableName=TABLE, Item=_item("m1", "4"))
+    table.put_item(TableName=TABLE, Item=_item("m2", "2.5"))
+    # A map attribute sends this item through the TypeDeserializer fallback,
+    # which returns point as Decimal.
+    odd = _item("m3", "5")
+    odd["extra"] = {"M": {"source": {"S": "legacy"}}}
+    table.put_item(TableName=TABLE, Item=odd)
+
+    output = tmp_path / "feedback.parquet"
+    rows = export_table_stream(str(output), table_name=TABLE, region_name="us-east-1")
+
+    assert rows == 3
+    written = pq.read_table(output)
+    assert str(written.schema.field("point").type) == "double"
+    points = dict(zip(written.column("messageId").to_pylist(), written.column("point").to_pylist()))
+    assert points == {"m1": 4.0, "m2": 2.5, "m3": 5.0}
+    others = dict(zip(written.column("messageId").to_pylist(), written.column("otherAttributes").to_pylist()))
+    assert others["m3"] == '{"extra": {"source": "legacy"}}'
+
+
+class _SlowScans:
+    """The moto table with a fixed round trip per Scan page, like a remote table."""
+
+    def __init__(self, client, latency: float):
+        self.client = client
+        self.latency = latency
+
+    def scan(self, **kwargs):
+        time.sleep(self.latency)
+        return self.client.scan(**kwargs)
+
+
+def test_segmented_scan_reads_the_same_items_faster(table):
+    for i in range(200):
+        # Segments split the table by partition key, so every item gets its own session.
+        table.put_item(TableName=TABLE, Item={**_item(f"m{i:03d}", str(i % 10)), "sessionId": {"S": f"s{i}"}})
+    slow = _SlowScans(table, latency=0.05)
+    pages = {"Limit": 10}
+
+    started = time.perf_counter()
+    serial = scan_table_items(slow, TABLE, 1, pages)
+    serial_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    parallel = scan_table_items(slow, TABLE, 8, pages)
+    parallel_seconds = time.perf_counter() - started
+
+    def message_ids(items):
+        return sorted(item["messageId"]["S"] for item in items)
+
+    assert len(serial) == 200
+    assert message_ids(parallel) == message_ids(serial)
+    # 20 sequential pages against about 3 pages per segment run side by side.
+    assert parallel_seconds < serial_seconds / 2
+
+
+@pytest.fixture
+def indexed_table(table):
+    table.update_table(
+        TableName=TABLE,
+        AttributeDefinitions=[
+            {"AttributeName": "updatedDate", "AttributeType": "S"},
+            {"AttributeName": "updatedAt", "AttributeType": "S"},
+        ],
+        GlobalSecondaryIndexUpdates=[
+            {
+                "Create": {
+                    "IndexName": UPDATED_AT_INDEX_NAME,
+                    "KeySchema": [
+                        {"AttributeName": "updatedDate", "KeyType": "HASH"},
+                        {"AttributeName": "updatedAt", "KeyType": "RANGE"},
+                    ],
+                    "Projection": {"ProjectionType": "ALL"},
+                }
+            }
+        ],
+    )
+    return table
+
+
+def _answered(message_id: str, at: datetime) -> dict:
+    # As streamlit_app/streamlit.py writes an answer.
+    timestamp = at.isoformat()
+    return {
+        **_item(message_id, "0"),
+        "answerTimestamp": {"S": timestamp},
+        "updatedAt": {"S": timestamp},
+        "updatedDate": {"S": timestamp[:10]},
+    }
+
+
+def _give_feedback(client, message_id: str, point: str, at: datetime) -> None:
+    timestamp = at.isoformat()
+    client.update_item(
+        TableName=TABLE,
+        Key={"sessionId": {"S": "s1"}, "messageId": {"S": message_id}},
+        UpdateExpression="SET #point = :point, #feedbackUpdatedAt = :at, #updatedAt = :at, #updatedDate = :day",
+        ExpressionAttributeNames={
+            "#point": "point",
+            "#feedbackUpdatedAt": "feedbackUpdatedAt",
+            "#updatedAt": "updatedAt",
+            "#updatedDate": "updatedDate",
+        },
+        ExpressionAttributeValues={":point": {"N": point}, ":at": {"S": timestamp}, ":day": {"S": timestamp[:10]}},
+    )
+
+
+class _RecordingQueries:
+    def __init__(self, client):
+        self.client = client
+        self.days = []
+
+    def query(self, **kwargs):
+        self.days.append(kwargs["ExpressionAttributeValues"][":day"]["S"])
+        return self.client.query(**kwargs)
+
+
+def test_index_query_covers_every_day_since_the_watermark_and_excludes_it(indexed_table):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    since = now - timedelta(days=2)
+    for message_id, at in [
+        ("before", since - timedelta(days=1)),
+        ("at-watermark", since),
+        ("just-after", since + timedelta(seconds=1)),
+        ("yesterday", now - timedelta(days=1)),
+        ("today", now),
+    ]:
+        indexed_table.put_item(TableName=TABLE, Item=_answered(message_id, at))
+    recording = _RecordingQueries(indexed_table)
+
+    items = fetch_items_updated_since(recording, TABLE, since.isoformat())
+
+    assert sorted(item["messageId"]["S"] for item in items) == ["just-after", "today", "yesterday"]
+    assert recording.days == [(since + timedelta(days=offset)).date().isoformat() for offset in range(3)]
+
+
+def test_incremental_export_starts_with_a_full_read_and_advances_the_watermark(indexed_table, tmp_path, capsys):
+    store = str(tmp_path / "store")
+    start = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(hours=1)
+    indexed_table.put_item(TableName=TABLE, Item=_answered("m1", start))
+    indexed_table.put_item(TableName=TABLE, Item=_answered("m2", start + timedelta(minutes=1)))
+    # Written before the index existed: only the first run's full read can see it.
+    legacy = _item("m0", "3")
+    legacy["answerTimestamp"] = {"S": (start - timedelta(days=30)).isoformat()}
+    indexed_table.put_item(TableName=TABLE, Item=legacy)
+
+    def run():
+        frame = export_incremental(store, table_name=TABLE, region_name="us-east-1")
+        return frame, capsys.readouterr().out
+
+    assert load_watermark(store) is None
+    frame, out = run()
+    assert "since watermark None: 3" in out
+    assert sorted(frame["messageId"]) == ["m0", "m1", "m2"]
+    assert load_watermark(store) == (start + timedelta(minutes=1)).isoformat()
+
+    # Feedback moves m1 past the watermark; m2 sits inside the overlap window and is
+    # read again, m0 (older than the window) is not.
+    feedback_at = start + timedelta(minutes=20)
+    _give_feedback(indexed_table, "m1", "5", feedback_at)
+    frame, out = run()
+    assert out.startswith(f"Items fetched since watermark {(start + timedelta(minutes=1)).isoformat()}: 2")
+    assert load_watermark(store) == feedback_at.isoformat()
+    points = {item["messageId"]: item["point"] for item in read_store(store)}
+    assert points == {"m0": 3, "m1": 5, "m2": 0}
+
+    # Nothing new: only the overlap is re-read, and the watermark stays where it was.
+    frame, out = run()
+    assert out.startswith(f"Items fetched since watermark {feedback_at.isoformat()}: 1")
+    assert load_watermark(store) == feedback_at.isoformat()
+    assert len(frame) == 3
@@ -0,0 +1,139 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from http_cache import HttpCache
+from http_fetcher import CircuitOpenError, PoliteFetcher
+
+CHUNK = b"x" * 1024
+CHUNKS = 5
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+    hits: dict = {}
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.hits[self.path] = cls.hits.get(self.path, 0) + 1
+            hit = cls.hits[self.path]
+        if self.path.startswith("/flaky") and hit == 1:
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path.startswith("/down"):
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        with cls.lock:
+            cls.in_flight += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+        try:
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(CHUNK) * CHUNKS))
+            self.end_headers()
+            # A slow body: the transfer, not the headers, is what takes time.
+            for _ in range(CHUNKS):
+                self.wfile.write(CHUNK)
+                self.wfile.flush()
+                time.sleep(0.04)
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.in_flight = _Handler.peak = 0
+    _Handler.hits = {}
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_host_limit_covers_streamed_bodies(server, tmp_path):
+    fetcher = PoliteFetcher(max_per_host=2, rate_per_host=0, backoff=0)
+    cache = HttpCache(str(tmp_path / "cache"))
+    try:
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            responses = list(executor.map(lambda i: cache.fetch(fetcher, f"{server}/doc{i}.pdf"), range(6)))
+    finally:
+        fetcher.close()
+
+    assert all(response.size == len(CHUNK) * CHUNKS for response in responses)
+    assert _Handler.peak == 2
+
+
+def test_slot_is_released_when_a_streamed_response_is_closed(server):
+    fetcher = PoliteFetcher(max_per_host=1, rate_per_host=0)
+    try:
+        with fetcher.get(f"{server}/a.pdf", stream=True) as response:
+            assert len(response.content) == len(CHUNK) * CHUNKS
+        # Would block forever if the first response still held the only slot.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            second = executor.submit(fetcher.get, f"{server}/b.pdf")
+            assert second.result(timeout=5).status_code == 200
+    finally:
+        fetcher.close()
+
+
+def test_retries_then_opens_the_circuit(server):
+    fetcher = PoliteFetcher(rate_per_host=0, backoff=0, max_attempts=2, breaker_threshold=2, breaker_cooldown=60)
+    try:
+        with fetcher.get(f"{server}/flaky.pdf", stream=True) as response:
+            assert response.status_code == 200
+        assert fetcher.stats["retries"] == 1
+
+        assert fetcher.get(f"{server}/down").status_code == 500
+        with pytest.raises(CircuitOpenError):
+            fetcher.get(f"{server}/down")
+        assert fetcher.stats["short_circuited"] == 1
+    finally:
+        fetcher.close()
+
+
+def test_half_open_circuit_lets_a_single_probe_through(server):
+    fetcher = PoliteFetcher(rate_per_host=0, backoff=0, max_attempts=1, breaker_threshold=2, breaker_cooldown=0.2)
+    try:
+        for _ in range(2):
+            assert fetcher.get(f"{server}/down").status_code == 500
+        time.sleep(0.25)
+
+        # The probe's body takes 0.2 s; the other callers arrive while it is in flight.
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(fetcher.get, f"{server}/probe.pdf")]
+            time.sleep(0.05)
+            futures += [executor.submit(fetcher.get, f"{server}/probe.pdf") for _ in range(3)]
+            outcomes = [future.exception() or future.result().status_code for future in futures]
+
+        assert outcomes[0] == 200
+        assert all(isinstance(outcome, CircuitOpenError) for outcome in outcomes[1:])
+        assert _Handler.hits["/probe.pdf"] == 1
+        # The successful probe closed the circuit.
+        assert fetcher.get(f"{server}/probe.pdf").status_code == 200
+
+        # A failed probe reopens it straight away.
+        for _ in range(2):
+            fetcher.get(f"{server}/down")
+        time.sleep(0.25)
+        assert fetcher.get(f"{server}/down").status_code == 500
+        with pytest.raises(CircuitOpenError):
+            fetcher.get(f"{server}/probe.pdf")
+    finally:
+        fetcher.close()
@@ -0,0 +1,34 @@
+import json
+
+import boto3
+from moto import mock_aws
+
+from kb_metadata import DEFAULT_SCRAPE_MANIFEST_KEY, category_for, generate_sidecars
+from legislation_chunker import silver_name_for_url
+
+URL = "https://mevzuat.meb.gov.tr/dosyalar/yonetmelik.pdf"
+
+
+def test_category_for():
+    assert category_for(["Mevzuat - KYS", "TTKB Mevzuatı", "Yönetmelikler"]) == "TTKB Mevzuatı"
+    assert category_for(["Duyurular"]) == "Duyurular"
+    assert category_for([]) == "Mevzuat - KYS"
+
+
+def test_generate_sidecars_replaces_stale_ones():
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket="kb-test")
+        manifest = [{"url": URL, "data_type": "PDF", "text": "Yönetmelik", "path_list": ["Mevzuat - KYS", "TTKB Mevzuatı"]}]
+        s3.put_object(Bucket="kb-test", Key=DEFAULT_SCRAPE_MANIFEST_KEY, Body=json.dumps(manifest).encode("utf-8"))
+        document_key = f"gold/{silver_name_for_url(URL, 'PDF')}.jsonl"
+        s3.put_object(Bucket="kb-test", Key=document_key, Body=b"{}\n")
+        s3.put_object(Bucket="kb-test", Key="gold/removed.jsonl.metadata.json", Body=b"{}")
+
+        summary = generate_sidecars("kb-test", "gold/")
+
+        keys = {item["Key"] for item in s3.list_objects_v2(Bucket="kb-test", Prefix="gold/")["Contents"]}
+        assert keys == {document_key, f"{document_key}.metadata.json"}
+        assert summary["sidecars_deleted"] == 1
+        sidecar = json.loads(s3.get_object(Bucket="kb-test", Key=f"{document_key}.metadata.json")["Body"].read())
+        assert sidecar["metadataAttributes"]["categories"] == ["TTKB Mevzuatı"]
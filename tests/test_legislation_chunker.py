@@ -0,0 +1,133 @@
+from legislation_chunker import (
+    build_manifest_index,
+    chunk_document,
+    chunk_units,
+    metadata_for_key,
+    silver_name_for_url,
+    split_units,
+)
+
+REGULATION = """BİRİNCİ BÖLÜM
+Amaç
+MADDE 1 – (1) Bu Yönetmeliğin amacı, ders kitaplarının
+incelenmesine ilişkin usul ve esasları düzenlemektir.
+Kapsam
+MADDE 2 – (1) Bu Yönetmelik;
+a) Ders kitaplarını,
+b) Eğitim araçlarını kapsar.
+İKİNCİ BÖLÜM
+GEÇİCİ MADDE 1 – (1) Mevcut kitaplar 2026 yılı sonuna kadar kullanılır."""
+
+
+def test_units_follow_chapters_articles_and_clauses():
+    units = split_units([(1, REGULATION)])
+
+    assert [unit["kind"] for unit in units] == [
+        "chapter",
+        "section",
+        "article",
+        "section",
+        "article",
+        "bent",
+        "bent",
+        "chapter",
+        "article",
+    ]
+    # A wrapped PDF line stays on its article; the section heading titles the article under it.
+    assert units[2]["text"] == (
+        "MADDE 1 – (1) Bu Yönetmeliğin amacı, ders kitaplarının "
+        "incelenmesine ilişkin usul ve esasları düzenlemektir."
+    )
+    assert units[2]["heading"] == "BİRİNCİ BÖLÜM > Amaç > MADDE 1"
+    assert units[5]["heading"] == "BİRİNCİ BÖLÜM > Kapsam > MADDE 2"
+    # A new chapter drops the previous chapter's section.
+    assert units[8]["heading"] == "İKİNCİ BÖLÜM > GEÇİCİ MADDE 1"
+
+
+def test_flattened_procedure_is_split_before_steps_and_clauses():
+    text = (
+        "Amaç Bu prosedürün amacı denklik işlemlerini tanımlamaktır. "
+        "Uygulama 1. Başvuru alınır. 2. Belgeler incelenir: (1) Diploma kontrol edilir."
+    )
+    units = split_units([(3, text)])
+
+    assert [(unit["kind"], unit["text"]) for unit in units] == [
+        ("section", "Amaç Bu prosedürün amacı denklik işlemlerini tanımlamaktır."),
+        # A heading keeps the first step it is run into.
+        ("section", "Uygulama 1. Başvuru alınır."),
+        ("step", "2. Belgeler incelenir:"),
+        ("fikra", "(1) Diploma kontrol edilir."),
+    ]
+    assert {unit["page"] for unit in units} == {3}
+    assert units[-1]["heading"] == "Uygulama"
+
+
+def test_chunks_respect_max_chars_and_split_long_articles_at_sentence_ends():
+    article = "MADDE 5 – " + " ".join(f"Kurul kararının {i}. bendi yazılı olarak bildirilir." for i in range(12))
+    units = split_units([(1, article + "\nMADDE 6 – Yürürlük.")])
+
+    chunks = chunk_units(units, max_chars=200, min_chars=50)
+
+    assert all(len(chunk["text"]) <= 200 for chunk in chunks)
+    assert " ".join(chunk["text"] for chunk in chunks[:-1]) == article
+    # Sentence-end cuts only, and every piece keeps the article's heading.
+    assert all(chunk["text"].endswith(".") for chunk in chunks)
+    assert [chunk["heading"] for chunk in chunks] == ["MADDE 5"] * (len(chunks) - 1) + ["MADDE 6"]
+
+
+def test_short_articles_are_merged_until_min_chars():
+    pages = [
+        (1, "MADDE 1 – Kısa.\nMADDE 2 – Kısa.\nMADDE 3 – " + "Uzun bir madde metni. " * 10),
+        (2, "MADDE 4 – Son."),
+    ]
+
+    chunks = chunk_units(split_units(pages), max_chars=1000, min_chars=100)
+
+    # Articles 1-3 fit under min_chars together; article 4 starts its own chunk on its page.
+    assert [(chunk["heading"], chunk["page"]) for chunk in chunks] == [("MADDE 1", 1), ("MADDE 4", 2)]
+    assert chunks[0]["text"].split("\n")[:2] == ["MADDE 1 – Kısa.", "MADDE 2 – Kısa."]
+
+
+def test_word_longer_than_max_chars_is_hard_cut():
+    word = "abcdefghij" + "klmnopqrst" + "uvwxy"
+    chunks = chunk_units(split_units([(1, word)]), max_chars=10, min_chars=1)
+    assert [chunk["text"] for chunk in chunks] == ["abcdefghij", "klmnopqrst", "uvwxy"]
+
+
+def test_repeated_chunk_texts_are_emitted_once():
+    header = "T.C. MİLLÎ EĞİTİM BAKANLIĞI"
+    pages = [(1, f"{header}\nMADDE 1 – Bir."), (2, f"{header}\nMADDE 2 – İki."), (3, header)]
+
+    chunks = chunk_units(split_units(pages), max_chars=30, min_chars=1)
+
+    assert [chunk["text"] for chunk in chunks].count(header) == 1
+
+
+def test_every_chunk_carries_the_scrape_metadata():
+    url = "https://ttkb.meb.gov.tr/www/kurum-hakkinda/icerik/491"
+    entries = [
+        {
+            "text": "1 Sayılı Cumhurbaşkanlığı Kararnamesi",
+            "url": url,
+            "data_type": "HTML",
+            "path_list": ["Mevzuat - KYS", "TTKB Mevzuatı"],
+        }
+    ]
+    silver_key = f"silver/{silver_name_for_url(url, 'HTML')}"
+    metadata = metadata_for_key(silver_key, build_manifest_index(entries))
+
+    records = chunk_document(silver_key, "HTML", [(1, REGULATION)], metadata, max_chars=120, min_chars=1)
+
+    assert metadata == {
+        "title": "1 Sayılı Cumhurbaşkanlığı Kararnamesi",
+        "source_url": url,
+        "data_type": "HTML",
+        "path_list": ["Mevzuat - KYS", "TTKB Mevzuatı"],
+        "path_string": "Mevzuat - KYS > TTKB Mevzuatı",
+    }
+    assert [record["chunk_index"] for record in records] == list(range(len(records)))
+    assert len(records) > 1
+    for record in records:
+        assert record["source_key"] == silver_key and record["format"] == "HTML"
+        assert {key: record[key] for key in metadata} == metadata
+    assert metadata_for_key("silver/unknown.pdf", build_manifest_index(entries)) == {}
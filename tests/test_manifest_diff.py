@@ -0,0 +1,42 @@
+import json
+
+from manifest_diff import diff_manifests, publish_incremental
+
+
+def _records(count: int) -> list[dict]:
+    return [{"url": f"https://example.org/{i}.pdf", "text": f"Belge {i}", "path": ["Mevzuat"]} for i in range(count)]
+
+
+def _publish(tmp_path, records, force=False):
+    uploads = []
+    output = tmp_path / "links.json"
+    delta = publish_incremental(records, str(output), "", "", lambda body, bucket, key: uploads.append(key), force)
+    return delta, uploads, output
+
+
+def test_empty_crawl_keeps_the_baseline(tmp_path):
+    _publish(tmp_path, _records(10))
+    delta, uploads, output = _publish(tmp_path, [])
+
+    assert delta == {} and uploads == []
+    assert len(json.loads(output.read_text(encoding="utf-8"))) == 10
+
+
+def test_shrunken_crawl_needs_force(tmp_path):
+    _publish(tmp_path, _records(10))
+    _, uploads, _ = _publish(tmp_path, _records(3))
+    assert uploads == []
+
+    delta, uploads, output = _publish(tmp_path, _records(3), force=True)
+    assert delta["summary"]["removed"] == 7
+    assert len(uploads) == 2
+    assert len(json.loads(output.read_text(encoding="utf-8"))) == 3
+
+
+def test_content_change_needs_a_hash_on_both_sides():
+    previous = [{"url": "u", "text": "t", "path": ["a"], "content_sha256": "1"}, {"url": "f.pdf", "text": "f", "path": ["a"]}]
+    current = [{"url": "u", "text": "t", "path": ["a"], "content_sha256": "2"}, {"url": "f.pdf", "text": "f", "path": ["a"]}]
+
+    delta = diff_manifests(previous, current)
+    assert [change["url"] for change in delta["content_changed"]] == ["u"]
+    assert delta["summary"]["unchanged"] == 1
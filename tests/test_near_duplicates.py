@@ -0,0 +1,31 @@
+from dedup_gold import deduplicate
+from question_clustering import cluster_questions
+from ttkb_common.near_duplicates import normalize_question
+
+ARTICLE = (
+    "Madde 1 Bu yönetmeliğin amacı öğretmenlerin atama ve yer değiştirme işlemlerine ilişkin usul ve esasları "
+    "belirlemektir. Madde 2 Bu yönetmelik Millî Eğitim Bakanlığına bağlı okul ve kurumlarda görev yapan "
+    "öğretmenleri kapsar. Madde 3 Bu yönetmelik ilgili kanun hükümlerine dayanılarak hazırlanmıştır."
+)
+
+
+def test_turkish_folding():
+    assert normalize_question("İZİN Süresi, ÖĞRETMEN?") == "izin suresi ogretmen"
+
+
+def test_questions_and_documents_share_the_clustering():
+    _, clusters = cluster_questions(["Öğretmen izni kaç gün?", "ogretmen izni kac gun", "Okul servisi ücreti nedir?"])
+    assert clusters == [1, 1, 2]
+
+    def chunk(key, text):
+        return {"gold_key": key, "text": text, "source_key": key}
+
+    documents = {
+        "a.jsonl": [chunk("a.jsonl", ARTICLE)],
+        "b.jsonl": [chunk("b.jsonl", ARTICLE.upper())],
+        "c.jsonl": [chunk("c.jsonl", "Okul servis araçlarında uyulacak kurallar bu yönergede düzenlenmiştir.")],
+    }
+    kept, report = deduplicate(documents)
+    assert sorted(kept) == ["a.jsonl", "c.jsonl"]
+    assert report["exact_duplicate_documents"] == 1
+    assert [source["source_key"] for source in kept["a.jsonl"][0]["sources"]] == ["a.jsonl", "b.jsonl"]
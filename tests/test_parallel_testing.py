@@ -0,0 +1,100 @@
+from datetime import datetime, timezone
+
+import pandas as pd
+import pytest
+
+import parallel_testing
+
+
+@pytest.fixture
+def replay(tmp_path, monkeypatch):
+    monkeypatch.setattr(parallel_testing, "CASSETTE_DIR", str(tmp_path / "cassettes"))
+    monkeypatch.setattr(parallel_testing, "CASSETTE_MODE", "replay")
+    return tmp_path / "cassettes"
+
+
+EVENTS = [
+    {
+        "trace": {
+            "eventTime": datetime(2026, 1, 9, 15, 23, tzinfo=timezone.utc),
+            "trace": {
+                "orchestrationTrace": {
+                    "observation": {
+                        "knowledgeBaseLookupOutput": {
+                            "retrievedReferences": [
+                                {
+                                    "content": {"text": "MADDE 7 – Öğretmenlere yıllık izin yirmi gündür."},
+                                    "location": {"s3Location": {"uri": "s3://kb/gold/izin_yonetmeligi.pdf.jsonl"}},
+                                    "metadata": {"categories": ["TTKB Mevzuatı"]},
+                                }
+                            ]
+                        }
+                    }
+                }
+            },
+        }
+    },
+    {"chunk": {"bytes": "Yıllık izin ".encode("utf-8")}},
+    {"chunk": {"bytes": "yirmi gündür.".encode("utf-8")}},
+]
+SCOPED = {"knowledgeBaseConfigurations": [{"knowledgeBaseId": "KB1"}]}
+
+
+class _Agent:
+    def __init__(self):
+        self.requests = []
+
+    def invoke_agent(self, **request):
+        self.requests.append(request)
+        return {"completion": iter(EVENTS)}
+
+
+def test_recorded_cassette_replays_the_same_answer(replay, monkeypatch):
+    agent = _Agent()
+    monkeypatch.setattr(parallel_testing, "CASSETTE_MODE", "record")
+    recorded, latency = parallel_testing.fetch_agent_events(agent, "Öğretmen izni kaç gün?", SCOPED)
+    assert recorded == EVENTS and latency is not None
+    assert agent.requests[0]["sessionState"] == SCOPED
+
+    monkeypatch.setattr(parallel_testing, "CASSETTE_MODE", "replay")
+    # Surrounding whitespace does not change the recording a question maps to.
+    replayed, replayed_latency = parallel_testing.fetch_agent_events(None, " Öğretmen izni kaç gün? ", SCOPED)
+
+    assert replayed_latency == latency
+    # Bytes come back as bytes; timestamps as their ISO form.
+    assert replayed[1:] == EVENTS[1:]
+    assert replayed[0]["trace"]["eventTime"] == "2026-01-09T15:23:00+00:00"
+    assert parallel_testing.parse_agent_events(replayed) == parallel_testing.parse_agent_events(EVENTS)
+    assert parallel_testing.parse_agent_events(replayed)[:2] == (
+        "Yıllık izin yirmi gündür.",
+        ["s3://kb/gold/izin_yonetmeligi.pdf.jsonl"],
+    )
+    assert len(agent.requests) == 1
+
+
+def test_replay_without_a_cassette_raises(replay, monkeypatch):
+    monkeypatch.setattr(parallel_testing, "CASSETTE_MODE", "record")
+    parallel_testing.fetch_agent_events(_Agent(), "Öğretmen izni kaç gün?", SCOPED)
+    monkeypatch.setattr(parallel_testing, "CASSETTE_MODE", "replay")
+
+    # The unscoped run of the same question is a different recording.
+    with pytest.raises(FileNotFoundError, match="No cassette recorded"):
+        parallel_testing.fetch_agent_events(None, "Öğretmen izni kaç gün?")
+    with pytest.raises(FileNotFoundError, match="No cassette recorded"):
+        parallel_testing.ask_agent(None, "Rehberlik yönergesi nerede?", SCOPED)
+    # Only finished cassettes are left behind, never temp files.
+    assert [path.name.endswith(".json.gz") for path in replay.rglob("*") if path.is_file()] == [True]
+
+
+def test_variant_whose_every_call_failed_still_summarises(replay):
+    rows = [
+        {"variant": "default", "row": idx, **parallel_testing.measure_question(question, None, ["TTKB Mevzuatı"], None)}
+        for idx, question in enumerate(["Öğretmen izni kaç gün?", "Rehberlik yönergesi nerede?"])
+    ]
+    results = pd.DataFrame(rows)
+    assert results["error"].str.contains("No cassette recorded").all()
+
+    summary = parallel_testing.summarize_variants(results)
+    assert summary.loc[0, "errors"] == 2
+    assert summary.loc[0, "latency_median"] is None
+    assert parallel_testing.recommend_setting(summary) is None
@@ -0,0 +1,158 @@
+import io
+import json
+import os
+import time
+
+import boto3
+import pytest
+from moto import mock_aws
+
+import prepare_for_gold
+
+BUCKET = "gold-test"
+HTML = (
+    "<html><body><h1>Yönetmelik {i}</h1>"
+    "<p>MADDE 1 Bu yönetmeliğin amacı {i} numaralı kurumun işleyişini düzenlemektir.</p>"
+    "<p>MADDE 2 Bu yönetmelik yayımı tarihinde yürürlüğe girer.</p></body></html>"
+)
+DOCUMENTS = 24
+LATENCY = 0.05
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket=BUCKET)
+        for i in range(DOCUMENTS):
+            s3.put_object(Bucket=BUCKET, Key=f"silver/doc{i:02d}.html", Body=HTML.format(i=i).encode("utf-8"))
+
+        # A fixed round trip per GET and PUT, as against S3 from another host.
+        read, write = prepare_for_gold.read_object_bytes, prepare_for_gold.write_object_bytes
+
+        def slow_read(*args, **kwargs):
+            time.sleep(LATENCY)
+            return read(*args, **kwargs)
+
+        def slow_write(*args, **kwargs):
+            time.sleep(LATENCY)
+            return write(*args, **kwargs)
+
+        monkeypatch.setattr(prepare_for_gold, "read_object_bytes", slow_read)
+        monkeypatch.setattr(prepare_for_gold, "write_object_bytes", slow_write)
+        yield s3
+
+
+def _gold(s3, prefix):
+    keys = sorted(item["Key"] for item in s3.list_objects_v2(Bucket=BUCKET, Prefix=prefix)["Contents"])
+    return {key[len(prefix) :]: s3.get_object(Bucket=BUCKET, Key=key)["Body"].read() for key in keys}
+
+
+def _run(gold_prefix, workers, manifest_key):
+    return prepare_for_gold.process_bucket(
+        BUCKET,
+        "silver/",
+        gold_prefix,
+        download_workers=workers,
+        transform_workers=workers,
+        upload_workers=workers,
+        parse_processes=2,
+        manifest_key=manifest_key,
+        scrape_manifest_key=None,
+    )
+
+
+def test_pipelined_run_matches_a_serial_run_and_is_faster(bucket):
+    serial = _run("gold-serial/", 1, None)
+    pipelined = _run("gold/", 8, "manifests/test_gold_manifest.json")
+
+    assert serial["failed"] == pipelined["failed"] == 0
+    assert serial["objects"] == pipelined["objects"] == DOCUMENTS
+    assert _gold(bucket, "gold-serial/") == _gold(bucket, "gold/")
+    # Each document costs two round trips one after another in the serial run.
+    assert pipelined["seconds"] < serial["seconds"] / 2
+
+    again = _run("gold/", 8, "manifests/test_gold_manifest.json")
+    assert again["objects"] == 0 and again["skipped"] == DOCUMENTS
+
+
+def test_document_moved_in_the_menu_is_rebuilt(bucket):
+    from kb_metadata import DEFAULT_SCRAPE_MANIFEST_KEY
+    from legislation_chunker import silver_name_for_url
+
+    url = "https://ttkb.meb.gov.tr/icerik/491"
+    silver_key = f"silver/{silver_name_for_url(url)}"
+    bucket.put_object(Bucket=BUCKET, Key=silver_key, Body=HTML.format(i=491).encode("utf-8"))
+
+    def publish_menu(path_list):
+        manifest = [{"url": url, "text": "Genelgeler", "data_type": "", "path_list": path_list}]
+        bucket.put_object(Bucket=BUCKET, Key=DEFAULT_SCRAPE_MANIFEST_KEY, Body=json.dumps(manifest).encode("utf-8"))
+
+    def run():
+        return prepare_for_gold.process_bucket(
+            BUCKET, "silver/", "gold/", parse_processes=1, manifest_key="manifests/test_gold_manifest.json"
+        )
+
+    sidecar = f"gold/{silver_name_for_url(url)}.jsonl.metadata.json"
+    publish_menu(["Mevzuat - KYS", "TTKB Mevzuatı", "Genelgeler"])
+    assert run()["objects"] == DOCUMENTS + 1
+    assert run()["objects"] == 0
+
+    publish_menu(["Mevzuat - KYS", "Kalite Yönetim Sistemi", "Genelgeler"])
+    assert run()["objects"] == 1
+    attributes = json.loads(bucket.get_object(Bucket=BUCKET, Key=sidecar)["Body"].read())["metadataAttributes"]
+    assert attributes["categories"] == ["Kalite Yönetim Sistemi"]
+    gold = bucket.get_object(Bucket=BUCKET, Key=f"gold/{silver_name_for_url(url)}.jsonl")["Body"].read().decode("utf-8")
+    assert "Kalite Yönetim Sistemi" in gold and "TTKB Mevzuatı" not in gold
+
+
+class _RecordingClient:
+    """Records the S3 calls the transfer helpers make; transfers write `body`."""
+
+    def __init__(self, body=b"", fail=False):
+        self.body = body
+        self.fail = fail
+        self.calls = []
+
+    def get_object(self, **kwargs):
+        self.calls.append(("get_object", kwargs))
+        return {"Body": io.BytesIO(self.body)}
+
+    def put_object(self, **kwargs):
+        self.calls.append(("put_object", kwargs))
+
+    def download_fileobj(self, bucket, key, fileobj, Config=None):
+        self.calls.append(("download_fileobj", {"Bucket": bucket, "Key": key, "Config": Config}))
+        if self.fail:
+            raise OSError("connection reset")
+        fileobj.write(self.body)
+
+    def upload_fileobj(self, fileobj, bucket, key, ExtraArgs=None, Config=None):
+        self.calls.append(("upload_fileobj", {"Bucket": bucket, "Key": key, "ExtraArgs": ExtraArgs, "Config": Config}))
+        assert fileobj.read() == self.body
+
+
+def test_transfer_config_thresholds_and_concurrency_reach_the_client(tmp_path):
+    config = prepare_for_gold.build_transfer_config(part_size_mb=5, part_concurrency=6)
+    part = 5 * 1024 * 1024
+    assert (config.multipart_threshold, config.multipart_chunksize, config.max_concurrency) == (part, part, 6)
+
+    small = _RecordingClient(b"%PDF small")
+    assert prepare_for_gold.download_object(small, BUCKET, "silver/a.pdf", part, config) == b"%PDF small"
+    prepare_for_gold.write_object_bytes(small, BUCKET, "gold/a.pdf.jsonl", b"x" * part, "application/x-ndjson", config)
+    assert [name for name, _ in small.calls] == ["get_object", "put_object"]
+
+    large = _RecordingClient(b"x" * (part + 1))
+    spooled = prepare_for_gold.download_object(large, BUCKET, "silver/b.pdf", part + 1, config, str(tmp_path))
+    prepare_for_gold.write_object_bytes(large, BUCKET, "gold/b.pdf.jsonl", large.body, "application/x-ndjson", config)
+    (download, kwargs), (upload, upload_kwargs) = large.calls
+    assert (download, kwargs["Key"], kwargs["Config"]) == ("download_fileobj", "silver/b.pdf", config)
+    assert (upload, upload_kwargs["Key"], upload_kwargs["Config"]) == ("upload_fileobj", "gold/b.pdf.jsonl", config)
+    assert upload_kwargs["ExtraArgs"] == {"ContentType": "application/x-ndjson"}
+    assert spooled.endswith(".pdf") and open(spooled, "rb").read() == large.body
+    os.remove(spooled)
+
+    broken = _RecordingClient(fail=True)
+    with pytest.raises(OSError):
+        prepare_for_gold.download_object(broken, BUCKET, "silver/c.pdf", part + 1, config, str(tmp_path))
+    assert os.listdir(tmp_path) == []
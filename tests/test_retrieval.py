@@ -0,0 +1,17 @@
+from ttkb_common.retrieval import build_session_state
+
+
+def test_unscoped_defaults_send_no_session_state():
+    assert build_session_state("KB", []) is None
+    assert build_session_state("", ["TTKB Mevzuatı"], 5) is None
+
+
+def test_filter_shape():
+    single = build_session_state("KB", ["TTKB Mevzuatı"], 5)
+    search = single["knowledgeBaseConfigurations"][0]["retrievalConfiguration"]["vectorSearchConfiguration"]
+    assert search == {"numberOfResults": 5, "filter": {"listContains": {"key": "categories", "value": "TTKB Mevzuatı"}}}
+
+    several = build_session_state("KB", ["A", "B"], search_type="HYBRID")
+    search = several["knowledgeBaseConfigurations"][0]["retrievalConfiguration"]["vectorSearchConfiguration"]
+    assert search["overrideSearchType"] == "HYBRID"
+    assert [condition["listContains"]["value"] for condition in search["filter"]["orAll"]] == ["A", "B"]
@@ -0,0 +1,183 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+pytest.importorskip("bs4")
+
+import scraper_ec2
+from http_cache import HttpCache
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+# ttkb.meb.gov.tr's home page menu, and the MENU records Selenium scraped from it.
+HOME_PAGE = os.path.join(FIXTURES, "ttkb_home_menu.html")
+SELENIUM_RECORDS = os.path.join(FIXTURES, "ttkb_menu_selenium_records.json")
+PAGE = b'<html><body><a href="/dosyalar/yonetmelik.pdf">Yonetmelik</a></body></html>'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    user_agents: list = []
+
+    def do_GET(self):
+        _Handler.user_agents.append(self.headers.get("User-Agent"))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    _Handler.user_agents = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_cached_page_fetch_without_fetcher_sends_timeout_and_user_agent(server, tmp_path, monkeypatch):
+    timeouts = []
+    real_get = requests.get
+
+    def get(url, **kwargs):
+        timeouts.append(kwargs.get("timeout"))
+        return real_get(url, **kwargs)
+
+    monkeypatch.setattr(scraper_ec2.requests, "get", get)
+    item = {"url": f"{server}/icerik/491", "path_list": ["Mevzuat - KYS", "TTKB Mevzuatı"]}
+    files = scraper_ec2.scrape_content_page(item, cache=HttpCache(str(tmp_path / "cache")))
+
+    assert [record["url"] for record in files] == [f"{server}/dosyalar/yonetmelik.pdf"]
+    assert timeouts == [10]
+    assert _Handler.user_agents == [scraper_ec2.USER_AGENT]
+
+
+class _SavedPage:
+    status_code = 200
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.content = f.read()
+
+    def raise_for_status(self):
+        pass
+
+
+def test_http_menu_matches_the_recorded_selenium_records(monkeypatch):
+    with open(SELENIUM_RECORDS, "r", encoding="utf-8") as f:
+        selenium_records = json.load(f)
+    monkeypatch.setattr(scraper_ec2.requests, "get", lambda url, **kwargs: _SavedPage(HOME_PAGE))
+
+    assert scraper_ec2.scrape_menu_links_http() == selenium_records
+    assert scraper_ec2.check_menu_parity(selenium_records)
+    assert not scraper_ec2.check_menu_parity(selenium_records[:-1])
+
+
+def _breadcrumb_path_list(element, root_element):
+    """The per-link climb iter_menu_links replaced, kept as the reference."""
+    path = []
+    current = element.parent
+    while current and current != root_element:
+        if current.name == "ul":
+            prev = current.find_previous_sibling()
+            if prev and prev.name in ["span", "a", "div"]:
+                text = scraper_ec2.clean_text(prev.get_text())
+                if text and text not in path:
+                    path.insert(0, text)
+        if current.name == "li":
+            direct_text = ""
+            for child in current.find_all(["span", "a"], recursive=False):
+                if child != element and (not child.has_attr("href") or child["href"] in ["#", ""]):
+                    direct_text = scraper_ec2.clean_text(child.get_text())
+                    break
+            if direct_text and direct_text not in path:
+                path.insert(0, direct_text)
+        current = current.parent
+    if not path or path[0] != "Mevzuat - KYS":
+        path.insert(0, "Mevzuat - KYS")
+    return path
+
+
+def _baseline_menu_items(html):
+    """Menu records as extracted before iter_menu_links: full html.parser tree, climb per link."""
+    target_li = scraper_ec2.find_menu_container(scraper_ec2.BeautifulSoup(html, "html.parser"))
+    menu_items = []
+    for link in target_li.find_all("a", href=True):
+        href = link["href"]
+        text = scraper_ec2.clean_text(link.get_text())
+        if not text or href in ["#", "javascript:void(0)", ""] or "Mevzuat - KYS" in text:
+            continue
+        full_url = scraper_ec2.urljoin(scraper_ec2.BASE_URL, href)
+        path_list = _breadcrumb_path_list(link, target_li)
+        item = {
+            "text": text,
+            "url": full_url,
+            "path_list": path_list,
+            "path_string": " > ".join(path_list),
+            "data_type": scraper_ec2.get_data_type(full_url),
+            "source": "MENU",
+        }
+        if not any(x["url"] == full_url for x in menu_items):
+            menu_items.append(item)
+    return menu_items
+
+
+# Headings repeated along a path (li text and the ul's preceding sibling, and
+# again deeper down), div/span/'#' headings, a URL listed twice under
+# different paths and a link that is itself a submenu heading.
+NESTED_MENU = """
+<ul><li><span>Mevzuat - KYS</span>
+  <ul>
+    <li><a href="#">Yönetmelikler</a>
+      <ul>
+        <li><a href="/y/1.pdf">Birinci</a></li>
+        <li><span>Yönetmelikler</span>
+          <ul>
+            <li><a href="/y/2.pdf">İkinci</a></li>
+            <li><div>Ekler</div><ul><li><a href="/y/ek.docx">Ek</a></li></ul></li>
+          </ul>
+        </li>
+        <li><a href="/y/3.pdf">Üçüncü</a></li>
+      </ul>
+    </li>
+    <li><a href="">Genelgeler</a>
+      <ul>
+        <li><a href="/y/1.pdf">Birinci (tekrar)</a></li>
+        <li><a href="/g/1">Genelge</a><ul><li><a href="/g/1/ek.xlsx">Genelge eki</a></li></ul></li>
+      </ul>
+    </li>
+    <li><a href="/sertifikalar">Sertifikalar</a></li>
+  </ul>
+</li></ul>
+"""
+
+
+@pytest.mark.parametrize("html_path", [HOME_PAGE, None])
+def test_single_pass_menu_paths_match_the_per_link_climb(html_path):
+    if html_path:
+        with open(html_path, "rb") as f:
+            html = f.read()
+    else:
+        html = NESTED_MENU
+    soup = scraper_ec2.BeautifulSoup(html, scraper_ec2.HTML_PARSER, parse_only=scraper_ec2.MENU_STRAINER)
+    items = scraper_ec2.extract_menu_items(scraper_ec2.find_menu_container(soup))
+
+    assert items == _baseline_menu_items(html)
+    if html_path is None:
+        assert [(item["text"], item["path_list"]) for item in items] == [
+            ("Birinci", ["Mevzuat - KYS", "Yönetmelikler"]),
+            ("İkinci", ["Mevzuat - KYS", "Yönetmelikler"]),
+            ("Ek", ["Mevzuat - KYS", "Yönetmelikler", "Ekler"]),
+            ("Üçüncü", ["Mevzuat - KYS", "Yönetmelikler"]),
+            ("Genelge", ["Mevzuat - KYS", "Genelgeler"]),
+            ("Genelge eki", ["Mevzuat - KYS", "Genelgeler", "Genelge"]),
+            ("Sertifikalar", ["Mevzuat - KYS"]),
+        ]
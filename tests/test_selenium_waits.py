@@ -0,0 +1,140 @@
+import os
+import time
+
+import pytest
+
+pytest.importorskip("selenium")
+lxml_html = pytest.importorskip("lxml.html")
+
+import selenium_waits
+from selenium_waits import WaitStats, hover, visible_link_count, wait_for_page_load, wait_for_submenu
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "mevzuat_kys_menu.html")
+# The sleeps the crawler used before condition waits (working_ec2_scraper.py).
+PAGE_LOAD_SLEEP = 3.0
+SUBMENU_SLEEP = 2.0
+
+
+class FixtureDriver:
+    """
+    Replays the saved menu page the way a browser renders it: the page
+    finishes loading after `load_delay`, and a hovered item's submenu
+    starts opening after `reveal_delay`, showing one more link every
+    `link_step` seconds. Only the scripts selenium_waits sends are answered.
+    """
+
+    def __init__(self, load_delay=0.2, reveal_delay=0.3, link_step=0.05):
+        self.document = lxml_html.parse(FIXTURE).getroot()
+        self.started = time.perf_counter()
+        self.loaded_at = load_delay
+        self.reveal_delay = reveal_delay
+        self.link_step = link_step
+        self.opened: dict = {}
+        self.observer_installed_at = None
+
+    def now(self) -> float:
+        return time.perf_counter() - self.started
+
+    def item(self, item_id: str):
+        return self.document.get_element_by_id(item_id)
+
+    def hovered(self, element) -> None:
+        for submenu in element.iterchildren("ul"):
+            self.opened.setdefault(submenu, self.now() + self.reveal_delay)
+
+    def _link_visible(self, link, now: float) -> bool:
+        for menu in link.iterancestors("ul"):
+            if menu.get("data-hidden") != "true":
+                continue
+            opened_at = self.opened.get(menu)
+            position = [a for a in menu.iter("a") if a.get("href")].index(link)
+            if opened_at is None or now < opened_at + position * self.link_step:
+                return False
+        return True
+
+    def _last_mutation(self, now: float) -> float:
+        changes = [self.loaded_at]
+        for menu, opened_at in self.opened.items():
+            links = [a for a in menu.iter("a") if a.get("href")]
+            changes.extend(opened_at + position * self.link_step for position in range(len(links)))
+        return max([change for change in changes if change <= now] + [self.observer_installed_at])
+
+    def execute_script(self, script, *args):
+        now = self.now()
+        if script == "return document.readyState":
+            return "complete" if now >= self.loaded_at else "interactive"
+        if script == selenium_waits._OBSERVE_JS:
+            if self.observer_installed_at is None:
+                self.observer_installed_at = now
+            # performance.now() counts milliseconds, as in a browser.
+            quiet_ms = (now - self._last_mutation(now)) * 1000
+            return quiet_ms / 1000 if "/ 1000" in script else quiet_ms
+        if script == selenium_waits._VISIBLE_LINKS_JS:
+            root = args[0] if args and args[0] is not None else self.document
+            return sum(1 for link in root.iter("a") if link.get("href") and self._link_visible(link, now))
+        raise AssertionError(f"unexpected script: {script[:40]}")
+
+
+class FixtureActions:
+    def __init__(self, driver: FixtureDriver):
+        self.driver = driver
+        self.target = None
+
+    def move_to_element(self, element):
+        self.target = element
+        return self
+
+    def perform(self):
+        self.driver.hovered(self.target)
+
+
+@pytest.fixture(autouse=True)
+def stats(monkeypatch):
+    stats = WaitStats()
+    monkeypatch.setattr(selenium_waits, "STATS", stats)
+    return stats
+
+
+def test_page_load_resolves_once_the_dom_is_quiet(stats):
+    driver = FixtureDriver(load_delay=0.2)
+    started = time.perf_counter()
+    assert wait_for_page_load(driver, fixed_sleep=PAGE_LOAD_SLEEP)
+    elapsed = time.perf_counter() - started
+
+    assert 0.2 <= elapsed < 1.0
+    assert stats.waits == 1 and stats.timeouts == 0
+    # Only the top-level links (Ana Sayfa and the Mevzuat toggle) are visible before any hover.
+    assert visible_link_count(driver) == 2
+
+
+def test_hover_waits_for_the_whole_submenu(stats):
+    driver = FixtureDriver(load_delay=0.0)
+    actions = FixtureActions(driver)
+    wait_for_page_load(driver)
+
+    assert hover(actions, driver, driver.item("mevzuat"), fixed_sleep=SUBMENU_SLEEP)
+    # The dropdown shows its two nested toggles and Duyurular.
+    assert visible_link_count(driver, driver.item("mevzuat")) == 4
+
+    started = time.perf_counter()
+    assert hover(actions, driver, driver.item("ttkb-mevzuati"), fixed_sleep=SUBMENU_SLEEP)
+    elapsed = time.perf_counter() - started
+    # Three links open 0.05s apart after 0.3s; the wait must not stop at the first one.
+    assert visible_link_count(driver, driver.item("ttkb-mevzuati")) == 4
+    assert visible_link_count(driver, driver.item("kys")) == 1
+    assert 0.4 <= elapsed < SUBMENU_SLEEP
+    assert stats.timeouts == 0
+    assert stats.waited_seconds < stats.fixed_sleep_seconds
+
+
+def test_hover_that_opens_nothing_stops_after_the_grace_period(stats):
+    driver = FixtureDriver(load_delay=0.0)
+    wait_for_page_load(driver)
+    home = next(driver.document.iter("li"))
+
+    started = time.perf_counter()
+    assert hover(FixtureActions(driver), driver, home, fixed_sleep=SUBMENU_SLEEP)
+    elapsed = time.perf_counter() - started
+    assert selenium_waits.NO_CHANGE_GRACE_SECONDS <= elapsed < SUBMENU_SLEEP
+    assert visible_link_count(driver) == 2
+
@@ -0,0 +1,8 @@
+ROOT_CATEGORY = "Mevzuat - KYS"
+
+
+def category_for(path_list: list[str]) -> str:
+    """Top-level section under the Mevzuat - KYS menu, e.g. "TTKB Mevzuatı" or "Kalite Yönetim Sistemi"."""
+    if len(path_list) > 1:
+        return path_list[1]
+    return path_list[0] if path_list else ROOT_CATEGORY
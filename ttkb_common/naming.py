@@ -0,0 +1,18 @@
+import hashlib
+import os
+from urllib.parse import urlparse
+
+
+def silver_name_for_url(url: str, data_type: str = "") -> str:
+    """
+    File name the document downloader gives a scraped URL in silver/.
+
+    The URL hash keeps pages such as ".../icerik/491" and "mevzuat?MevzuatNo=..."
+    apart; the readable tail keeps keys recognisable.
+    """
+    path = urlparse(url).path.rstrip("/")
+    tail = os.path.basename(path) or "index"
+    if not os.path.splitext(tail)[1]:
+        tail = f"{tail}.{(data_type or 'html').lower()}"
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:10]
+    return f"{digest}_{tail}"
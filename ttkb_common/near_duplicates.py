@@ -0,0 +1,82 @@
+import hashlib
+import random
+import re
+from collections import defaultdict
+
+import numpy as np
+
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+# Questions are often typed without a Turkish keyboard, so diacritics are folded.
+_TURKISH_FOLD = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+
+_rng = random.Random(1)
+# a, b < 2**32 and 32-bit shingle hashes keep a * h + b inside uint64.
+_PERM_A = np.array([_rng.randint(1, (1 << 32) - 1) for _ in range(NUM_PERMUTATIONS)], dtype=np.uint64)
+_PERM_B = np.array([_rng.randint(0, (1 << 32) - 1) for _ in range(NUM_PERMUTATIONS)], dtype=np.uint64)
+
+
+def normalize_question(text: str) -> str:
+    # str.lower() maps "I" to "i" and "İ" to "i̇"; Turkish needs "ı" and "i".
+    lowered = text.replace("I", "ı").replace("İ", "i").lower().translate(_TURKISH_FOLD)
+    without_punctuation = _PUNCTUATION_RE.sub(" ", lowered)
+    return " ".join(without_punctuation.split())
+
+
+def word_shingles(normalized: str, size: int) -> set[str]:
+    """Shingles of `size` consecutive words, for texts longer than a question."""
+    words = normalized.split()
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(shingles: set[str]) -> np.ndarray:
+    hashed = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "big") for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    signature = np.full(NUM_PERMUTATIONS, np.iinfo(np.uint64).max, dtype=np.uint64)
+    # Blocks bound memory for book-length documents.
+    for start in range(0, len(hashed), 8192):
+        block = hashed[start : start + 8192, None]
+        signature = np.minimum(signature, ((block * _PERM_A + _PERM_B) % _MERSENNE_PRIME).min(axis=0))
+    return signature
+
+
+def estimated_similarity(left: np.ndarray, right: np.ndarray) -> float:
+    return float(np.mean(left == right))
+
+
+def near_duplicate_roots(signatures: list[np.ndarray], threshold: float) -> list[int]:
+    """
+    Union items whose estimated Jaccard similarity reaches `threshold`, using
+    LSH banding to only compare candidates. Each item maps to the lowest index
+    in its group, so the first item in input order is the canonical one.
+    """
+    parent = list(range(len(signatures)))
+
+    def find(node: int) -> int:
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    rows_per_band = NUM_PERMUTATIONS // LSH_BANDS
+    for band in range(LSH_BANDS):
+        buckets: dict[bytes, list[int]] = defaultdict(list)
+        start = band * rows_per_band
+        for idx, signature in enumerate(signatures):
+            buckets[signature[start : start + rows_per_band].tobytes()].append(idx)
+        for members in buckets.values():
+            for position, first in enumerate(members):
+                for other in members[position + 1 :]:
+                    root_first, root_other = find(first), find(other)
+                    if root_first == root_other:
+                        continue
+                    if estimated_similarity(signatures[first], signatures[other]) >= threshold:
+                        parent[max(root_first, root_other)] = min(root_first, root_other)
+    return [find(idx) for idx in range(len(signatures))]
@@ -0,0 +1,29 @@
+def build_session_state(
+    knowledge_base_id: str,
+    categories: list[str],
+    number_of_results: int | None = None,
+    search_type: str | None = None,
+) -> dict | None:
+    """
+    invoke_agent sessionState that filters knowledge-base retrieval by category
+    and optionally overrides the number of retrieved chunks and the search
+    type (SEMANTIC or HYBRID).
+    """
+    if not knowledge_base_id or not (categories or number_of_results or search_type):
+        return None
+    vector_search = {}
+    if number_of_results:
+        vector_search["numberOfResults"] = number_of_results
+    if search_type:
+        vector_search["overrideSearchType"] = search_type
+    if categories:
+        conditions = [{"listContains": {"key": "categories", "value": category}} for category in categories]
+        vector_search["filter"] = conditions[0] if len(conditions) == 1 else {"orAll": conditions}
+    return {
+        "knowledgeBaseConfigurations": [
+            {
+                "knowledgeBaseId": knowledge_base_id,
+                "retrievalConfiguration": {"vectorSearchConfiguration": vector_search},
+            }
+        ]
+    }